@@ -0,0 +1,145 @@
+"""
+Retry and rate limiting policy for Google API requests
+Every Sheets and Drive HTTP request made through http_transport passes
+through here. A token bucket per API keeps the request rate under quota,
+and rate-limit responses, 5xx errors and dropped connections are retried
+with exponential backoff and full jitter (or after the server's Retry-After)
+until the attempt limit or the call's deadline is reached.
+"""
+
+import http.client
+import random
+import socket
+import ssl
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+import config
+
+# Responses that are safe to retry for any request
+RATE_LIMIT_STATUS = {429}
+# Responses that are only retried for idempotent requests, since the
+# server may already have acted on them
+TRANSIENT_STATUS = {500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'}
+
+RETRYABLE_ERRORS = (
+    ConnectionError, TimeoutError, socket.timeout, ssl.SSLError, http.client.HTTPException,
+    requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+)
+# Failures before the request reached the server, retried for any request
+CONNECT_ERRORS = (requests.exceptions.ConnectTimeout,)
+
+
+class TokenBucket:
+    """Allows rate requests per second on average, in bursts of up to capacity"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline=None):
+        """Take a token, waiting for one if needed. False if none comes before deadline."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class RateLimitTimeout(Exception):
+    """No request slot became free before the call's deadline"""
+
+
+def retry_after_seconds(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by attempts and a deadline"""
+
+    def __init__(self, max_attempts, base_delay, max_delay, deadline):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self._lock = threading.Lock()
+        self.retries = {}
+
+    def backoff(self, attempt, retry_after=None):
+        """Delay before retry number attempt (1-based)"""
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def call(self, api, bucket, send, classify, idempotent, discard=None):
+        """Run send() under the policy and return its final result.
+
+        classify(result) returns (status, retry_after) for a response, with
+        quota errors reported as 429; discard(result) releases a response
+        that is about to be retried. A retryable result is returned as-is
+        once retries are exhausted; a retryable exception is re-raised.
+        """
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            if bucket is not None and not bucket.acquire(deadline):
+                raise RateLimitTimeout(f"{api}: no request slot free within {self.deadline}s")
+
+            attempt += 1
+            error = None
+            retry_after = None
+            try:
+                result = send()
+            except RETRYABLE_ERRORS as e:
+                if not idempotent and not isinstance(e, CONNECT_ERRORS):
+                    raise
+                error = e
+            else:
+                status, retry_after = classify(result)
+                if not (status in RATE_LIMIT_STATUS or (idempotent and status in TRANSIENT_STATUS)):
+                    return result
+
+            delay = self.backoff(attempt, retry_after)
+            if attempt >= self.max_attempts or time.monotonic() + delay > deadline:
+                if error is not None:
+                    raise error
+                return result
+
+            if error is None and discard is not None:
+                discard(result)
+            with self._lock:
+                self.retries[api] = self.retries.get(api, 0) + 1
+            time.sleep(delay)
+
+
+policy = RetryPolicy(config.API_RETRY_MAX_ATTEMPTS, config.API_RETRY_BASE_SECONDS,
+                     config.API_RETRY_MAX_DELAY_SECONDS, config.API_RETRY_DEADLINE_SECONDS)
+
+buckets = {
+    'sheets': TokenBucket(config.SHEETS_REQUESTS_PER_MINUTE / 60, config.SHEETS_REQUEST_BURST),
+    'drive': TokenBucket(config.DRIVE_REQUESTS_PER_MINUTE / 60, config.DRIVE_REQUEST_BURST),
+}
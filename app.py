@@ -11,7 +11,19 @@ from PIL.ExifTags import TAGS
 import hashlib
 import os
 import logging
+import atexit
+import shutil
+import tempfile
+import threading
+import time
 import config
+import api_retry
+import http_transport
+from drive_cache import DriveFileCache
+from event_journal import EventJournal
+from report_cache import ReportCache
+from report_jobs import ReportJobQueue
+from sheets_writer import SheetsWriteScheduler
 
 # Configure logging to show in console
 logging.basicConfig(
@@ -220,8 +232,9 @@ def init_google_services():
                 if os.path.exists('token.pickle'):
                     with open('token.pickle', 'rb') as token:
                         creds = pickle.load(token)
-                        sheets_client = gspread.authorize(creds)
-                        return sheets_client, drive_service, creds
+                        transport = http_transport.init_transport(creds)
+                        sheets_client = gspread.authorize(creds, session=transport.sheets_session)
+                        return sheets_client, transport.drive_service(), creds
 
         # Method 3: Try local credentials.json file (service account)
         if not creds and os.path.exists(config.CREDENTIALS_FILE):
@@ -249,10 +262,11 @@ def init_google_services():
             except Exception as e:
                 print(f"Environment variable credentials failed: {e}")
 
-        # If we have credentials, create services
+        # If we have credentials, create services on the shared pooled transport
         if creds:
-            sheets_client = gspread.authorize(creds)
-            drive_service = build('drive', 'v3', credentials=creds)
+            transport = http_transport.init_transport(creds)
+            sheets_client = gspread.authorize(creds, session=transport.sheets_session)
+            drive_service = transport.drive_service()
             return sheets_client, drive_service, creds
 
         # No credentials found
@@ -267,56 +281,425 @@ def init_google_services():
         st.error(f"❌ Error initializing Google services: {str(e)}")
         return None, None, None
 
+# Column layout used when the sheets have to be created
+USERS_HEADERS = [
+    'Email', 'Name', 'Registration Date', 'Last Login', 'Total Events'
+]
+
+EVENTS_HEADERS = [
+    'Event ID', 'User Email', 'Academic Year', 'Quarter', 'Program Name',
+    'Program Type', 'Program Driven By', 'Activity Led By', 'Program Theme',
+    'Organizing Departments', 'Professional Society Club',
+    'SDG Goals', 'Program Outcomes',
+    'Duration (Hrs)', 'Event Level', 'Mode of Delivery', 'Start Date', 'End Date',
+    'Student Participants', 'Faculty Participants', 'External Participants',
+    'Expenditure Amount', 'Remark', 'Objective', 'Benefits',
+    'Speaker Names', 'Speaker Designation', 'Speaker Organization', 'Session Video URL',
+    'Brief Report', 'Geotag_Photo1_ID', 'Geotag_Photo2_ID', 'Geotag_Photo3_ID',
+    'Normal_Photo1_ID', 'Normal_Photo2_ID', 'Normal_Photo3_ID',
+    'Attendance_Report_ID', 'Feedback_Analysis_ID', 'Event_Agenda_ID',
+    'Chief_Guest_Biodata_ID', 'Permission_SOP_ID', 'Invitation_Brochure_ID',
+    'Other_Documents_ID', 'KPI_Report_ID', 'Generated_PDF_ID', 'Signed_PDF_ID',
+    'Twitter URL', 'Facebook URL', 'Instagram URL', 'LinkedIn URL',
+    'Created Date', 'Last Modified', 'Status', 'Admin_Approval_Status',
+    'Approval_Date', 'Approved_By', 'Rejection_Reason', 'Drive Folder URL'
+]
+
+# Spreadsheet/worksheet handles (cached, shared by all sessions in this process)
+@st.cache_resource(ttl=config.SHEETS_HANDLE_CACHE_TTL, show_spinner=False)
+def get_sheet_handles(_client, spreadsheet_id):
+    """Open the spreadsheet and its Users/Events worksheets once per TTL window"""
+    spreadsheet = _client.open_by_key(spreadsheet_id)
+
+    # Check if 'Users' sheet exists
+    try:
+        users_sheet = spreadsheet.worksheet('Users')
+    except gspread.exceptions.WorksheetNotFound:
+        users_sheet = spreadsheet.add_worksheet(title='Users', rows=1000, cols=10)
+        users_sheet.append_row(USERS_HEADERS)
+
+    # Check if 'Events' sheet exists
+    try:
+        events_sheet = spreadsheet.worksheet('Events')
+    except gspread.exceptions.WorksheetNotFound:
+        events_sheet = spreadsheet.add_worksheet(title='Events', rows=1000, cols=70)
+        events_sheet.append_row(EVENTS_HEADERS)
+
+    return {
+        'spreadsheet': spreadsheet,
+        'users': users_sheet,
+        'events': events_sheet,
+        # Header row the handles were validated against - a different header
+        # row on a later read means the schema changed under us
+        'events_headers': events_sheet.row_values(1),
+    }
+
+def invalidate_sheet_handles():
+    """Drop the cached spreadsheet handles so the next call reopens them"""
+    get_sheet_handles.clear()
+    get_events_cache().invalidate()
+    get_user_directory().invalidate()
+
+class EventsTableCache:
+    """In-memory snapshot of the Events sheet, shared by all sessions.
+
+    The snapshot is loaded with a single get_all_values() call and reused until
+    it is older than the TTL or explicitly invalidated. Writes made through
+    GoogleSheetsManager patch the affected rows in place, and every change bumps
+    ``version`` so callers can tell whether the data they hold is current.
+
+    Two indexes are built once per snapshot and kept current on writes:
+    Event ID -> sheet row number, and User Email -> sheet row numbers.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.version = 0
+        self._lock = threading.RLock()
+        self._headers = None
+        self._rows = []          # _rows[i] holds sheet row i + 2
+        self._records = None     # dicts built from _rows, rebuilt lazily
+        self._id_index = None    # Event ID -> sheet row number
+        self._email_index = None # User Email -> [sheet row numbers]
+        self._loaded_at = 0.0
+
+    def _is_fresh(self):
+        return self._headers is not None and (time.time() - self._loaded_at) < self.ttl
+
+    def _changed(self):
+        self._records = None
+        self.version += 1
+
+    def _refresh(self, load_values):
+        """Reload the table if stale (caller holds the lock)"""
+        if not self._is_fresh():
+            all_values = load_values()
+            self._headers = list(all_values[0]) if all_values else []
+            self._rows = [list(row) for row in all_values[1:]]
+            self._loaded_at = time.time()
+            self._id_index = None
+            self._email_index = None
+            self._changed()
+
+    def snapshot(self, load_values):
+        """Return (headers, rows) as copies, calling load_values() only when stale"""
+        with self._lock:
+            self._refresh(load_values)
+            return list(self._headers), [list(row) for row in self._rows]
+
+    def headers(self, load_values):
+        """Return a copy of the header row, calling load_values() only when stale"""
+        with self._lock:
+            self._refresh(load_values)
+            return list(self._headers)
+
+    def _column(self, header, default):
+        return self._headers.index(header) if header in self._headers else default
+
+    def _key(self, row, col):
+        return row[col] if len(row) > col else ''
+
+    def _build_indexes(self):
+        id_col = self._column('Event ID', 0)
+        email_col = self._column('User Email', 1)
+        self._id_index = {}
+        self._email_index = {}
+        for row_number, row in enumerate(self._rows, start=2):
+            self._index_row(row_number, row, id_col, email_col)
+
+    def _index_row(self, row_number, row, id_col, email_col):
+        # First occurrence wins for duplicate IDs, matching a top-down scan
+        event_id = self._key(row, id_col)
+        if row_number < self._id_index.get(event_id, row_number + 1):
+            self._id_index[event_id] = row_number
+        self._email_index.setdefault(self._key(row, email_col), []).append(row_number)
+
+    def _unindex_row(self, row_number, row, id_col, email_col):
+        event_id = self._key(row, id_col)
+        if self._id_index.get(event_id) == row_number:
+            del self._id_index[event_id]
+            # Fall back to a later duplicate, if any
+            for other_number, other in enumerate(self._rows, start=2):
+                if other_number != row_number and self._key(other, id_col) == event_id:
+                    self._id_index[event_id] = other_number
+                    break
+        email_rows = self._email_index.get(self._key(row, email_col), [])
+        if row_number in email_rows:
+            email_rows.remove(row_number)
+
+    def find_row(self, load_values, event_id):
+        """Return (row_number, row values) for event_id, or (None, None)"""
+        with self._lock:
+            self._refresh(load_values)
+            if self._id_index is None:
+                self._build_indexes()
+            row_number = self._id_index.get(event_id)
+            if row_number is None:
+                return None, None
+            return row_number, list(self._rows[row_number - 2])
+
+    def rows_for_email(self, load_values, email):
+        """Return [(row_number, row values)] for every event of a user (values are copies)"""
+        with self._lock:
+            self._refresh(load_values)
+            if self._id_index is None:
+                self._build_indexes()
+            return [(n, list(self._rows[n - 2])) for n in sorted(self._email_index.get(email, []))]
+
+    def records(self, load_values):
+        """Return the snapshot as a list of event dicts (copies, safe to modify)"""
+        with self._lock:
+            self._refresh(load_values)
+            if self._records is None:
+                self._records = [dict(zip(self._headers, row)) for row in self._rows]
+            return [dict(record) for record in self._records]
+
+    def invalidate(self):
+        """Force the next read to reload the sheet"""
+        with self._lock:
+            self._headers = None
+            self._rows = []
+            self._id_index = None
+            self._email_index = None
+            self._changed()
+
+    def replace_row(self, row_number, values):
+        """Replace sheet row ``row_number`` after a full-row write"""
+        with self._lock:
+            if self._headers is None:
+                return
+            if not 2 <= row_number <= len(self._rows) + 1:
+                self.invalidate()
+                return
+            if self._id_index is not None:
+                id_col = self._column('Event ID', 0)
+                email_col = self._column('User Email', 1)
+                self._unindex_row(row_number, self._rows[row_number - 2], id_col, email_col)
+                self._index_row(row_number, values, id_col, email_col)
+                self._email_index[self._key(values, email_col)].sort()
+            self._rows[row_number - 2] = list(values)
+            self._changed()
+
+    def append_row(self, values, row_number):
+        """Record a row appended at ``row_number`` (None if unknown)"""
+        with self._lock:
+            if self._headers is None:
+                return
+            if row_number != len(self._rows) + 2:
+                # Sheets put the row somewhere we did not expect - reload
+                self.invalidate()
+                return
+            self._rows.append(list(values))
+            if self._id_index is not None:
+                self._index_row(row_number, values, self._column('Event ID', 0), self._column('User Email', 1))
+            self._changed()
+
+    def delete_row(self, row_number):
+        """Drop sheet row ``row_number``; later rows shift up by one"""
+        with self._lock:
+            if self._headers is None:
+                return
+            if not 2 <= row_number <= len(self._rows) + 1:
+                self.invalidate()
+                return
+            if self._id_index is not None:
+                id_col = self._column('Event ID', 0)
+                email_col = self._column('User Email', 1)
+                self._unindex_row(row_number, self._rows[row_number - 2], id_col, email_col)
+            del self._rows[row_number - 2]
+            if self._id_index is not None:
+                # Every row below the deleted one moves up by one
+                self._id_index = {k: (n - 1 if n > row_number else n) for k, n in self._id_index.items()}
+                self._email_index = {k: [n - 1 if n > row_number else n for n in v]
+                                     for k, v in self._email_index.items()}
+            self._changed()
+
+    def check_rows(self, rows):
+        """Reload on next access if {event_id: row number or None} disagrees with the snapshot"""
+        with self._lock:
+            if self._headers is None:
+                return
+            if self._id_index is None:
+                self._build_indexes()
+            if any(self._id_index.get(event_id) != row for event_id, row in rows.items()):
+                self.invalidate()
+
+    def update_cells(self, row_number, updates):
+        """Apply {header: value} to sheet row ``row_number``"""
+        with self._lock:
+            if self._headers is None:
+                return
+            if not 2 <= row_number <= len(self._rows) + 1 or any(h not in self._headers for h in updates):
+                self.invalidate()
+                return
+            if self._id_index is not None and ('Event ID' in updates or 'User Email' in updates):
+                # Keys changed - cheapest to rebuild on next lookup
+                self._id_index = None
+                self._email_index = None
+            row = self._rows[row_number - 2]
+            for header, value in updates.items():
+                col = self._headers.index(header)
+                if len(row) <= col:
+                    row.extend([''] * (col + 1 - len(row)))
+                row[col] = str(value) if value is not None else ''
+            self._changed()
+
+@st.cache_resource(show_spinner=False)
+def get_events_cache():
+    """Process-wide Events table snapshot"""
+    return EventsTableCache(config.EVENTS_CACHE_TTL)
+
+class UserDirectory:
+    """In-memory Users directory (email -> sheet row), shared by all sessions.
+
+    Loaded with a single col_values(1) call and reused until it is older than
+    the TTL. Last Login stamps are not written on login: they are buffered
+    here by email and a background thread hands them to flush(users_sheet,
+    {email: timestamp}) every flush_interval seconds, so a login storm costs
+    one batched update instead of one write per login.
+    """
+
+    def __init__(self, ttl, flush_interval, flush):
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self._flush = flush
+        self._lock = threading.Lock()
+        self._rows = None        # lowercased email -> sheet row number
+        self._loaded_at = 0.0
+        self._last_login = {}    # users_sheet -> {email: timestamp} waiting to be written
+        self._flusher = None
+
+    def find(self, load_emails, email):
+        """Sheet row of email (lowercased), or None; load_emails() returns column A"""
+        with self._lock:
+            if self._rows is None or (time.time() - self._loaded_at) >= self.ttl:
+                self._rows = {}
+                for row_number, value in enumerate(load_emails()[1:], start=2):  # Skip header
+                    # First occurrence wins, matching a top-down scan
+                    self._rows.setdefault(value.lower(), row_number)
+                self._loaded_at = time.time()
+            return self._rows.get(email)
+
+    def add(self, email, row_number):
+        """Record a user appended at row_number (None if unknown)"""
+        with self._lock:
+            if self._rows is None:
+                return
+            if row_number is None:
+                self._rows = None
+                return
+            self._rows.setdefault(email, row_number)
+
+    def invalidate(self):
+        """Force the next lookup to reload the email column"""
+        with self._lock:
+            self._rows = None
+
+    def stamp_last_login(self, users_sheet, email, timestamp):
+        """Buffer a Last Login stamp; later stamps for the same user replace earlier ones"""
+        with self._lock:
+            self._last_login.setdefault(users_sheet, {})[email] = timestamp
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._run_flusher, name='last-login-flush', daemon=True)
+                self._flusher.start()
+
+    def pending(self):
+        """Number of Last Login stamps waiting to be written"""
+        with self._lock:
+            return sum(len(stamps) for stamps in self._last_login.values())
+
+    def flush(self):
+        """Write the buffered Last Login stamps now"""
+        with self._lock:
+            buffered, self._last_login = self._last_login, {}
+        for users_sheet, stamps in buffered.items():
+            try:
+                self._flush(users_sheet, stamps)
+            except Exception:
+                logging.exception("Writing Last Login stamps failed")
+                with self._lock:
+                    # Keep them for the next flush unless newer stamps arrived meanwhile
+                    pending = self._last_login.setdefault(users_sheet, {})
+                    for email, timestamp in stamps.items():
+                        pending.setdefault(email, timestamp)
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+def _write_last_logins(users_sheet, stamps):
+    """Send buffered Last Login stamps (column 4) through the write scheduler and wait"""
+    writer = get_sheets_writer()
+    futures = [writer.submit(GoogleSheetsManager._write_user_cells, users_sheet, email, {4: timestamp})
+               for email, timestamp in stamps.items()]
+    for future in futures:
+        future.result()
+
+@st.cache_resource(show_spinner=False)
+def get_user_directory():
+    """Process-wide Users directory and Last Login buffer"""
+    directory = UserDirectory(config.USERS_CACHE_TTL, config.LAST_LOGIN_FLUSH_SECONDS, _write_last_logins)
+    # Best effort: write stamps still buffered when the server shuts down
+    atexit.register(directory.flush)
+    return directory
+
+def replicate_journaled_events(batch):
+    """Write saves from the event journal to the Events sheet (see get_event_journal)"""
+    sheets_client, _, _ = init_google_services()
+    if sheets_client is None:
+        # Raised rather than shown: this runs on the journal's replicator thread
+        raise RuntimeError("No Google credentials - journaled event saves cannot be replicated")
+    GoogleSheetsManager(sheets_client).replicate_events(batch)
+
+@st.cache_resource(show_spinner=False)
+def get_event_journal():
+    """Process-wide journal that event saves are committed to before they reach the sheet"""
+    return EventJournal(config.EVENT_JOURNAL_DIR, replicate_journaled_events, config.EVENT_JOURNAL_BATCH,
+                        config.EVENT_JOURNAL_INTERVAL_SECONDS, config.EVENT_JOURNAL_RETRY_SECONDS,
+                        retention=config.EVENT_JOURNAL_RETENTION_DAYS * 86400)
+
+@st.cache_resource(show_spinner=False)
+def get_sheets_writer():
+    """Process-wide scheduler all spreadsheet writes go through"""
+    return SheetsWriteScheduler(config.SHEETS_WRITES_PER_MINUTE / 60, config.SHEETS_WRITE_BURST,
+                                config.SHEETS_WRITE_BATCH_ROWS)
+
 # Google Sheets Manager
 class GoogleSheetsManager:
     def __init__(self, client):
         self.client = client
 
     def setup_spreadsheet(self):
-        """Setup spreadsheet with required sheets and headers"""
+        """Return (spreadsheet, users_sheet, events_sheet), creating missing sheets"""
         try:
-            spreadsheet = self.client.open_by_key(config.SPREADSHEET_ID)
-
-            # Check if 'Users' sheet exists
-            try:
-                users_sheet = spreadsheet.worksheet('Users')
-            except:
-                users_sheet = spreadsheet.add_worksheet(title='Users', rows=1000, cols=10)
-                users_sheet.append_row([
-                    'Email', 'Name', 'Registration Date', 'Last Login', 'Total Events'
-                ])
-
-            # Check if 'Events' sheet exists
-            try:
-                events_sheet = spreadsheet.worksheet('Events')
-            except:
-                events_sheet = spreadsheet.add_worksheet(title='Events', rows=1000, cols=70)
-                events_sheet.append_row([
-                    'Event ID', 'User Email', 'Academic Year', 'Quarter', 'Program Name',
-                    'Program Type', 'Program Driven By', 'Activity Led By', 'Program Theme',
-                    'Organizing Departments', 'Professional Society Club',
-                    'SDG Goals', 'Program Outcomes',
-                    'Duration (Hrs)', 'Event Level', 'Mode of Delivery', 'Start Date', 'End Date',
-                    'Student Participants', 'Faculty Participants', 'External Participants',
-                    'Expenditure Amount', 'Remark', 'Objective', 'Benefits',
-                    'Speaker Names', 'Speaker Designation', 'Speaker Organization', 'Session Video URL',
-                    'Brief Report', 'Geotag_Photo1_ID', 'Geotag_Photo2_ID', 'Geotag_Photo3_ID',
-                    'Normal_Photo1_ID', 'Normal_Photo2_ID', 'Normal_Photo3_ID',
-                    'Attendance_Report_ID', 'Feedback_Analysis_ID', 'Event_Agenda_ID',
-                    'Chief_Guest_Biodata_ID', 'Permission_SOP_ID', 'Invitation_Brochure_ID',
-                    'Other_Documents_ID', 'KPI_Report_ID', 'Generated_PDF_ID', 'Signed_PDF_ID',
-                    'Twitter URL', 'Facebook URL', 'Instagram URL', 'LinkedIn URL',
-                    'Created Date', 'Last Modified', 'Status', 'Admin_Approval_Status',
-                    'Approval_Date', 'Approved_By', 'Rejection_Reason', 'Drive Folder URL'
-                ])
-
-            return spreadsheet, users_sheet, events_sheet
+            handles = get_sheet_handles(self.client, config.SPREADSHEET_ID)
+            return handles['spreadsheet'], handles['users'], handles['events']
         except Exception as e:
+            invalidate_sheet_handles()
             st.error(f"Error setting up spreadsheet:")
             st.error(f"Details: {str(e)}")
             st.info("Try refreshing the page or re-authenticating")
             return None, None, None
 
+    def _check_events_headers(self, headers):
+        """Invalidate the cached handles if the Events header row has changed"""
+        try:
+            handles = get_sheet_handles(self.client, config.SPREADSHEET_ID)
+        except Exception:
+            return
+        if handles['events_headers'] != headers:
+            invalidate_sheet_handles()
+
+    def _handle_sheet_error(self, error):
+        """Invalidate the cached handles when a worksheet has gone missing"""
+        if isinstance(error, gspread.exceptions.WorksheetNotFound):
+            invalidate_sheet_handles()
+        elif isinstance(error, gspread.exceptions.APIError):
+            # A deleted/renamed worksheet surfaces as 400 (unparseable range) or 404
+            if getattr(error, 'code', None) in (400, 404):
+                invalidate_sheet_handles()
+
     def verify_user(self, email, is_admin_login=False):
         """Verify if user exists in the Users sheet or auto-register if from allowed domain"""
         try:
@@ -329,12 +712,12 @@ class GoogleSheetsManager:
 
             spreadsheet, users_sheet, _ = self.setup_spreadsheet()
             if users_sheet:
-                emails = [e.lower() for e in users_sheet.col_values(1)[1:]]  # Skip header, lowercase
+                directory = get_user_directory()
+                row_index = directory.find(lambda: users_sheet.col_values(1), email)
 
-                if email in emails:
-                    # User exists - update last login
-                    row_index = emails.index(email) + 2
-                    users_sheet.update_cell(row_index, 4, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+                if row_index:
+                    # User exists - last login is written later with other logins
+                    directory.stamp_last_login(users_sheet, email, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
                     return True, False  # Valid user, not admin
 
                 # Check if email is from allowed domain - auto-register
@@ -342,12 +725,18 @@ class GoogleSheetsManager:
                     if email.endswith(f"@{config.ALLOWED_EMAIL_DOMAIN}"):
                         # Auto-register new user
                         now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        users_sheet.append_row([email, now, 'Active', now])
+                        row_index = get_sheets_writer().submit(
+                            GoogleSheetsManager._append_user_rows, users_sheet, email,
+                            {1: email, 2: now, 3: 'Active', 4: now}
+                        ).result()
+                        directory.add(email, row_index)
                         st.success(f"Welcome! Your account has been automatically created.")
                         return True, False  # New user registered
 
             return False, False
         except Exception as e:
+            self._handle_sheet_error(e)
+            get_user_directory().invalidate()
             st.error(f"Error verifying user: {str(e)}")
             return False, False
 
@@ -361,24 +750,313 @@ class GoogleSheetsManager:
         except:
             return False
 
-    def get_all_events(self):
-        """Get all events (for admin)"""
+    def _events_headers(self, events_sheet):
+        """Return a copy of the Events header row from the shared snapshot"""
+        cache = get_events_cache()
+        version = cache.version
+        headers = cache.headers(events_sheet.get_all_values)
+        if cache.version != version:
+            # Freshly loaded - make sure the cached handles still match the schema
+            self._check_events_headers(headers)
+        return headers
+
+    def _find_event_row(self, events_sheet, event_id):
+        """Return the sheet row number holding event_id (index lookup), or None"""
+        idx, _ = get_events_cache().find_row(events_sheet.get_all_values, event_id)
+        return idx
+
+    def _batch_write_events(self, events_sheet, updates, add_missing_columns=False, priority=False):
+        """Write {event_id: {header: value}} through the write scheduler.
+
+        Rows queued together are sent as one values.batchUpdate call. Returns
+        the list of event IDs that were found and written. Headers that do not
+        exist are skipped, or appended to the header row in the same call when
+        add_missing_columns is set.
+        """
+        headers = self._events_headers(events_sheet)
+        writer = get_sheets_writer()
+        journal = get_event_journal()
+        journaled = []
+        futures = {}
+        for event_id, fields in updates.items():
+            if not add_missing_columns:
+                fields = {h: v for h, v in fields.items() if h in headers}
+            if journal.update(event_id, fields):
+                # Saved but not replicated yet - the row the journal writes now carries this change too
+                journaled.append(event_id)
+                continue
+            futures[event_id] = writer.submit(
+                GoogleSheetsManager._write_event_cells, events_sheet, event_id, fields, priority=priority
+            )
+        return [event_id for event_id in updates
+                if event_id in journaled or (event_id in futures and futures[event_id].result())]
+
+    @staticmethod
+    def _current_rows(events_sheet, headers, event_ids):
+        """{event_id: sheet row number or None}, from a fresh read of the Event ID column.
+
+        Snapshot row numbers can be up to EVENTS_CACHE_TTL old, and rows may
+        have been inserted or deleted since (by hand, another app process or
+        batch_regenerate_reports), so scheduled writes resolve rows here
+        instead. The snapshot is reloaded on next access if any row moved.
+        """
+        id_col = headers.index('Event ID') + 1 if 'Event ID' in headers else 1
+        current = {}
+        for row_number, value in enumerate(events_sheet.col_values(id_col)[1:], start=2):
+            # First occurrence wins, matching the snapshot's index
+            current.setdefault(value, row_number)
+        rows = {event_id: current.get(event_id) for event_id in event_ids}
+        get_events_cache().check_rows(rows)
+        return rows
+
+    @staticmethod
+    def _write_event_cells(events_sheet, updates):
+        """Scheduled write of {event_id: {header: value}} in one values.batchUpdate call.
+
+        Missing headers are appended to the header row in the same call.
+        Returns {event_id: True} for the events that were found and written.
+        """
+        cache = get_events_cache()
+        headers = cache.headers(events_sheet.get_all_values)
+
+        new_headers = []
+        for fields in updates.values():
+            for header in fields:
+                if header not in headers and header not in new_headers:
+                    new_headers.append(header)
+        columns = {header: col for col, header in enumerate(headers + new_headers, start=1)}
+
+        data = [{'range': gspread.utils.rowcol_to_a1(1, columns[header]), 'values': [[header]]}
+                for header in new_headers]
+        rows = GoogleSheetsManager._current_rows(events_sheet, headers, updates)
+        written = []
+        for event_id, fields in updates.items():
+            idx = rows[event_id]
+            if not idx:
+                continue
+            for header, value in fields.items():
+                data.append({
+                    'range': gspread.utils.rowcol_to_a1(idx, columns[header]),
+                    'values': [[value]]
+                })
+            written.append((event_id, idx, fields))
+
+        if not written:
+            return {}
+
+        events_sheet.batch_update(data, value_input_option='USER_ENTERED')
+
+        if new_headers:
+            # Schema changed - reload handles and snapshot on next access
+            invalidate_sheet_handles()
+        else:
+            for _, idx, fields in written:
+                cache.update_cells(idx, fields)
+        return {event_id: True for event_id, _, _ in written}
+
+    @staticmethod
+    def _write_event_rows(events_sheet, rows):
+        """Scheduled write of whole Events rows, {event_id: {header: value}}.
+
+        Existing events are overwritten with one values.batchUpdate call and
+        new ones added with one append call. Headers that do not exist yet
+        (from updates folded into a journaled save) are appended to the
+        header row in the same batchUpdate. Returns {event_id: True}.
+        """
+        cache = get_events_cache()
+        headers = cache.headers(events_sheet.get_all_values)
+
+        new_headers = []
+        for fields in rows.values():
+            for header in fields:
+                if header not in headers and header not in new_headers:
+                    new_headers.append(header)
+        columns = headers + new_headers
+
+        data = [{'range': gspread.utils.rowcol_to_a1(1, col), 'values': [[header]]}
+                for col, header in enumerate(new_headers, start=len(headers) + 1)]
+        current_rows = GoogleSheetsManager._current_rows(events_sheet, headers, rows)
+        updated, appended = [], []
+        for event_id, fields in rows.items():
+            # Values must match header order
+            values = [fields.get(header, '') for header in columns]
+            idx = current_rows[event_id]
+            if idx:
+                updated.append((idx, values))
+                data.append({'range': f'{idx}:{idx}', 'values': [values]})
+            else:
+                appended.append(values)
+
+        if data:
+            events_sheet.batch_update(data, value_input_option='RAW')
+        if appended:
+            response = events_sheet.append_rows(appended, value_input_option='RAW')
+            first_row = GoogleSheetsManager._appended_row_number(response)
+
+        if new_headers:
+            # Schema changed - reload handles and snapshot on next access
+            invalidate_sheet_handles()
+            return {event_id: True for event_id in rows}
+        for idx, values in updated:
+            cache.replace_row(idx, [str(v) for v in values])
+        for offset, values in enumerate(appended):
+            cache.append_row([str(v) for v in values], first_row + offset if first_row else None)
+        return {event_id: True for event_id in rows}
+
+    @staticmethod
+    def _delete_event_rows(events_sheet, event_ids):
+        """Scheduled delete of the rows holding event_ids, in one spreadsheet batchUpdate call"""
+        cache = get_events_cache()
+        headers = cache.headers(events_sheet.get_all_values)
+        rows = {event_id: idx for event_id, idx in
+                GoogleSheetsManager._current_rows(events_sheet, headers, event_ids).items() if idx}
+        if not rows:
+            return {}
+
+        # Bottom-up, so each deletion leaves the row numbers above it unchanged
+        row_numbers = sorted(set(rows.values()), reverse=True)
+        events_sheet.spreadsheet.batch_update({'requests': [
+            {'deleteDimension': {'range': {
+                'sheetId': events_sheet.id, 'dimension': 'ROWS', 'startIndex': idx - 1, 'endIndex': idx
+            }}}
+            for idx in row_numbers
+        ]})
+        for idx in row_numbers:
+            cache.delete_row(idx)
+        return {event_id: True for event_id in rows}
+
+    @staticmethod
+    def _write_user_cells(users_sheet, updates):
+        """Scheduled write of {email: {column number: value}} to the Users sheet.
+
+        Rows are looked up in a fresh read of the email column, since the
+        sheet may have been edited after the directory was loaded. Returns
+        {email: True} for the users that were found and written.
+        """
+        rows = {}
+        for row_number, value in enumerate(users_sheet.col_values(1)[1:], start=2):
+            rows.setdefault(value.lower(), row_number)
+        data = [
+            {'range': gspread.utils.rowcol_to_a1(rows[email], col), 'values': [[value]]}
+            for email, fields in updates.items() if email in rows
+            for col, value in fields.items()
+        ]
+        if data:
+            users_sheet.batch_update(data, value_input_option='USER_ENTERED')
+        missing = [email for email in updates if email not in rows]
+        if missing:
+            logging.warning("Users no longer in the sheet were not stamped: %s", ', '.join(missing))
+        return {email: True for email in updates if email in rows}
+
+    @staticmethod
+    def _append_user_rows(users_sheet, users):
+        """Scheduled append of {email: {column number: value}} to the Users sheet.
+
+        Returns {email: sheet row number, or None if the response did not say}.
+        """
+        response = users_sheet.append_rows([
+            [fields.get(col, '') for col in range(1, max(fields) + 1)]
+            for fields in users.values()
+        ])
+        first_row = GoogleSheetsManager._appended_row_number(response)
+        return {email: first_row + offset if first_row else None for offset, email in enumerate(users)}
+
+    def update_events_bulk(self, updates):
+        """Update several events in one request: {event_id: {header: value}}.
+
+        Returns the list of event IDs that were updated.
+        """
         try:
             spreadsheet, _, events_sheet = self.setup_spreadsheet()
-            if events_sheet:
-                all_values = events_sheet.get_all_values()
-                if len(all_values) < 2:
+            if events_sheet and updates:
+                return self._batch_write_events(events_sheet, updates, add_missing_columns=True)
+            return []
+        except Exception as e:
+            self._handle_sheet_error(e)
+            get_events_cache().invalidate()
+            st.error(f"Error updating events: {str(e)}")
+            return []
+
+    def bulk_update_approval_status(self, decisions, approval_date, approved_by):
+        """Approve/reject many events in one request.
+
+        decisions maps event_id -> (status, rejection_reason). Returns the list
+        of event IDs that were updated.
+        """
+        updates = {
+            event_id: {
+                'Admin_Approval_Status': status,
+                'Approval_Date': approval_date,
+                'Approved_By': approved_by,
+                'Rejection_Reason': rejection_reason or '',
+            }
+            for event_id, (status, rejection_reason) in decisions.items()
+        }
+        try:
+            spreadsheet, _, events_sheet = self.setup_spreadsheet()
+            if events_sheet and updates:
+                headers = self._events_headers(events_sheet)
+                if 'Admin_Approval_Status' not in headers:
                     return []
+                # Approvals skip ahead of queued form submissions
+                return self._batch_write_events(events_sheet, updates, priority=True)
+            return []
+        except Exception as e:
+            self._handle_sheet_error(e)
+            get_events_cache().invalidate()
+            st.error(f"Error updating approval status: {str(e)}")
+            return []
 
-                headers = all_values[0]
-                all_events = []
-                for row_values in all_values[1:]:
-                    event_dict = dict(zip(headers, row_values))
-                    all_events.append(event_dict)
+    @staticmethod
+    def _with_journaled_saves(records):
+        """Apply saves still waiting in the event journal on top of records read from the sheet"""
+        journaled = get_event_journal().pending()
+        if not journaled:
+            return records
+        merged = []
+        for record in records:
+            event_id = record.get('Event ID')
+            if event_id not in journaled:
+                merged.append(record)
+            elif journaled[event_id] is not None:
+                merged.append(dict(record, **{h: str(v) for h, v in journaled[event_id].items()}))
+        present = {record.get('Event ID') for record in records}
+        merged.extend({h: str(v) for h, v in row.items()}
+                      for event_id, row in journaled.items() if row is not None and event_id not in present)
+        return merged
+
+    def replicate_events(self, batch):
+        """Write {event_id: row, or None to delete} from the event journal.
+
+        Runs on the journal's replicator thread, where st.error would show
+        nothing; raises if any write fails so the journal logs it and retries
+        the batch.
+        """
+        events_sheet = get_sheet_handles(self.client, config.SPREADSHEET_ID)['events']
+        writer = get_sheets_writer()
+        futures = [
+            writer.submit(GoogleSheetsManager._write_event_rows, events_sheet, event_id, row)
+            if row is not None else
+            writer.submit(GoogleSheetsManager._delete_event_rows, events_sheet, event_id, {})
+            for event_id, row in batch.items()
+        ]
+        try:
+            for future in futures:
+                future.result()
+        except Exception as e:
+            self._handle_sheet_error(e)
+            get_events_cache().invalidate()
+            raise
 
-                return all_events
+    def get_all_events(self):
+        """Get all events (for admin)"""
+        try:
+            spreadsheet, _, events_sheet = self.setup_spreadsheet()
+            if events_sheet:
+                return self._with_journaled_saves(get_events_cache().records(events_sheet.get_all_values))
             return []
         except Exception as e:
+            self._handle_sheet_error(e)
             st.error(f"Error loading all events: {str(e)}")
             return []
 
@@ -387,22 +1065,13 @@ class GoogleSheetsManager:
         try:
             spreadsheet, _, events_sheet = self.setup_spreadsheet()
             if events_sheet:
-                all_values = events_sheet.get_all_values()
-                if len(all_values) < 2:
-                    return []
-
-                headers = all_values[0]
-                user_email_col = headers.index('User Email') if 'User Email' in headers else 1
-
-                user_events = []
-                for row_values in all_values[1:]:
-                    if len(row_values) > user_email_col and row_values[user_email_col] == email:
-                        event_dict = dict(zip(headers, row_values))
-                        user_events.append(event_dict)
-
-                return user_events
+                headers = self._events_headers(events_sheet)
+                user_rows = get_events_cache().rows_for_email(events_sheet.get_all_values, email)
+                events = self._with_journaled_saves([dict(zip(headers, row_values)) for _, row_values in user_rows])
+                return [event for event in events if event.get('User Email') == email]
             return []
         except Exception as e:
+            self._handle_sheet_error(e)
             st.error(f"Error fetching user events: {str(e)}")
             return []
 
@@ -411,163 +1080,175 @@ class GoogleSheetsManager:
         try:
             spreadsheet, _, events_sheet = self.setup_spreadsheet()
             if events_sheet:
-                all_values = events_sheet.get_all_values()
-                if len(all_values) < 2:
-                    return None, None
-
-                headers = all_values[0]
-                event_id_col = headers.index('Event ID') if 'Event ID' in headers else 0
-
-                for idx, row_values in enumerate(all_values[1:], start=2):
-                    if len(row_values) > event_id_col and row_values[event_id_col] == event_id:
-                        event_dict = dict(zip(headers, row_values))
-                        return event_dict, idx  # Return event and row number
+                headers = self._events_headers(events_sheet)
+                idx, row_values = get_events_cache().find_row(events_sheet.get_all_values, event_id)
+                journaled = get_event_journal().pending()
+                if event_id in journaled:
+                    # Saved or deleted, but not replicated yet - the row number may still be None
+                    if journaled[event_id] is None:
+                        return None, None
+                    event_dict = dict(zip(headers, row_values or []))
+                    event_dict.update({h: str(v) for h, v in journaled[event_id].items()})
+                    return event_dict, idx
+                if idx:
+                    event_dict = dict(zip(headers, row_values))
+                    return event_dict, idx  # Return event and row number
 
             return None, None
         except Exception as e:
+            self._handle_sheet_error(e)
             st.error(f"Error fetching event: {str(e)}")
             return None, None
 
     def save_event(self, event_data):
-        """Save event data to Google Sheets"""
+        """Save event data to Google Sheets.
+
+        The save is committed to the local event journal and acknowledged
+        straight away; the journal's replicator writes it to the sheet.
+        """
         try:
             spreadsheet, _, events_sheet = self.setup_spreadsheet()
             if events_sheet:
                 event_id = event_data.get('Event ID')
+                headers = get_sheet_handles(self.client, config.SPREADSHEET_ID)['events_headers']
 
-                # Get all values instead of records to avoid duplicate header issue
-                all_values = events_sheet.get_all_values()
-
-                if len(all_values) < 1:
+                if not headers:
                     return False
 
-                headers = all_values[0]
-
-                # Check if event exists (for updates)
-                event_id_col = headers.index('Event ID') if 'Event ID' in headers else 0
-
-                for idx, row_values in enumerate(all_values[1:], start=2):  # Start from row 2
-                    if len(row_values) > event_id_col and row_values[event_id_col] == event_id:
-                        # Update existing event
-                        values = [event_data.get(header, '') for header in headers]
-
-                        # Update the entire row - use row notation
-                        events_sheet.update(f'{idx}:{idx}', [values], value_input_option='RAW')
-                        return True
-
-                # Add new event - ensure values match header order
-                values = [event_data.get(header, '') for header in headers]
-                events_sheet.append_row(values, value_input_option='RAW')
+                # Updates the existing row, or appends a new one, when replicated
+                get_event_journal().append(event_id, {header: event_data.get(header, '') for header in headers})
                 return True
             return False
         except Exception as e:
+            self._handle_sheet_error(e)
+            get_events_cache().invalidate()
             st.error(f"Error saving event: {str(e)}")
             import traceback
             traceback.print_exc()
             return False
 
+    @staticmethod
+    def _appended_row_number(response):
+        """Extract the row number from an append_row() response, or None"""
+        try:
+            updated_range = response['updates']['updatedRange']
+            first_cell = updated_range.split('!')[-1].split(':')[0]
+            return gspread.utils.a1_to_rowcol(first_cell)[0]
+        except (KeyError, TypeError, IndexError, gspread.exceptions.IncorrectCellLabel):
+            return None
+
     def delete_event(self, event_id):
         """Delete an event"""
         try:
             spreadsheet, _, events_sheet = self.setup_spreadsheet()
             if events_sheet:
-                all_data = events_sheet.get_all_records()
-                for idx, row in enumerate(all_data):
-                    if row.get('Event ID') == event_id:
-                        row_index = idx + 2
-                        events_sheet.delete_rows(row_index)
-                        return True
+                journal = get_event_journal()
+                if self._find_event_row(events_sheet, event_id) or journal.pending().get(event_id) is not None:
+                    # Journaled like saves, so it cannot overtake a save of the same event
+                    journal.append(event_id, None)
+                    return True
             return False
         except Exception as e:
+            self._handle_sheet_error(e)
+            get_events_cache().invalidate()
             st.error(f"Error deleting event: {str(e)}")
             return False
 
     def update_event_pdf_id(self, event_id, pdf_id):
-        """Update the PDF ID for an event (used for regeneration)"""
-        try:
-            spreadsheet, _, events_sheet = self.setup_spreadsheet()
-            if events_sheet:
-                headers = events_sheet.row_values(1)
-                pdf_col_idx = headers.index('Generated_PDF_ID') + 1 if 'Generated_PDF_ID' in headers else None
+        """Update the PDF ID for an event (used for regeneration).
 
-                if not pdf_col_idx:
-                    return False
+        Runs on report-job worker threads, so failures are logged rather than
+        shown with st.error.
+        """
+        try:
+            events_sheet = get_sheet_handles(self.client, config.SPREADSHEET_ID)['events']
+            headers = self._events_headers(events_sheet)
+            if 'Generated_PDF_ID' not in headers:
+                logging.error("Events sheet has no Generated_PDF_ID column - PDF ID for %s not saved", event_id)
+                return False
 
-                all_data = events_sheet.get_all_values()
-                for idx, row in enumerate(all_data[1:], start=2):
-                    event_id_col = headers.index('Event ID') if 'Event ID' in headers else 0
-                    if row[event_id_col] == event_id:
-                        events_sheet.update_cell(idx, pdf_col_idx, pdf_id)
-                        return True
-            return False
+            return bool(self._batch_write_events(events_sheet, {event_id: {'Generated_PDF_ID': pdf_id}}))
         except Exception as e:
-            st.error(f"Error updating PDF ID: {str(e)}")
+            logging.exception("Updating the PDF ID of event %s failed", event_id)
+            self._handle_sheet_error(e)
+            get_events_cache().invalidate()
             return False
 
     def update_approval_status(self, event_id, status, approval_date, approved_by, rejection_reason=''):
         """Update the approval status for an event"""
-        try:
-            spreadsheet, _, events_sheet = self.setup_spreadsheet()
-            if events_sheet:
-                headers = events_sheet.row_values(1)
-
-                # Get column indices
-                status_col = headers.index('Admin_Approval_Status') + 1 if 'Admin_Approval_Status' in headers else None
-                date_col = headers.index('Approval_Date') + 1 if 'Approval_Date' in headers else None
-                by_col = headers.index('Approved_By') + 1 if 'Approved_By' in headers else None
-                reason_col = headers.index('Rejection_Reason') + 1 if 'Rejection_Reason' in headers else None
-
-                if not status_col:
-                    return False
-
-                all_data = events_sheet.get_all_values()
-                for idx, row in enumerate(all_data[1:], start=2):
-                    event_id_col = headers.index('Event ID') if 'Event ID' in headers else 0
-                    if row[event_id_col] == event_id:
-                        events_sheet.update_cell(idx, status_col, status)
-                        if date_col:
-                            events_sheet.update_cell(idx, date_col, approval_date)
-                        if by_col:
-                            events_sheet.update_cell(idx, by_col, approved_by)
-                        if reason_col:
-                            events_sheet.update_cell(idx, reason_col, rejection_reason)
-                        return True
-            return False
-        except Exception as e:
-            st.error(f"Error updating approval status: {str(e)}")
-            return False
+        return event_id in self.bulk_update_approval_status(
+            {event_id: (status, rejection_reason)}, approval_date, approved_by
+        )
 
     def update_signed_pdf_id(self, event_id, signed_pdf_id):
         """Update the signed PDF ID for an event"""
         try:
             spreadsheet, _, events_sheet = self.setup_spreadsheet()
             if events_sheet:
-                headers = events_sheet.row_values(1)
-
-                # Check if Signed_PDF_ID column exists, if not add it
-                if 'Signed_PDF_ID' not in headers:
-                    # Add the column header
-                    next_col = len(headers) + 1
-                    events_sheet.update_cell(1, next_col, 'Signed_PDF_ID')
-                    headers.append('Signed_PDF_ID')
-
-                signed_col = headers.index('Signed_PDF_ID') + 1
-
-                all_data = events_sheet.get_all_values()
-                for idx, row in enumerate(all_data[1:], start=2):
-                    event_id_col = headers.index('Event ID') if 'Event ID' in headers else 0
-                    if row[event_id_col] == event_id:
-                        events_sheet.update_cell(idx, signed_col, signed_pdf_id)
-                        return True
+                # Adds the Signed_PDF_ID column in the same request if it is missing
+                return bool(self._batch_write_events(
+                    events_sheet, {event_id: {'Signed_PDF_ID': signed_pdf_id}}, add_missing_columns=True
+                ))
             return False
         except Exception as e:
+            self._handle_sheet_error(e)
+            get_events_cache().invalidate()
             st.error(f"Error updating signed PDF ID: {str(e)}")
             return False
 
+@st.cache_resource
+def get_drive_file_cache():
+    """Process-wide on-disk cache of downloaded Drive files"""
+    return DriveFileCache(config.DRIVE_CACHE_DIR, config.DRIVE_CACHE_MAX_MB * 1024 * 1024)
+
+@st.cache_resource
+def get_report_cache():
+    """Process-wide on-disk cache of rendered report PDFs"""
+    return ReportCache(config.REPORT_CACHE_DIR, config.REPORT_CACHE_MAX_MB * 1024 * 1024)
+
 # Google Drive Manager
 class GoogleDriveManager:
     def __init__(self, service):
         self.service = service
+        self._local = threading.local()
+        self._revision_meta = {}  # file_id -> metadata fetched by file_revision(), used once
+
+    def _thread_service(self):
+        """Drive service for the calling thread.
+
+        googleapiclient services share one httplib2 transport, which is not
+        thread-safe, so each thread uses its own: the long-lived one kept by
+        the shared http_transport, else one built from the same credentials.
+        Falls back to the shared service if the credentials cannot be
+        recovered.
+        """
+        transport = http_transport.get_transport()
+        if transport is not None:
+            return transport.drive_service()
+
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            credentials = getattr(getattr(self.service, '_http', None), 'credentials', None)
+            if credentials is None:
+                return self.service
+            service = build('drive', 'v3', credentials=credentials, cache_discovery=False)
+            self._local.service = service
+        return service
+
+    @property
+    def last_download_error(self):
+        """Error from the calling thread's most recent download_file() call"""
+        return getattr(self._local, 'last_download_error', None)
+
+    @last_download_error.setter
+    def last_download_error(self, value):
+        self._local.last_download_error = value
+
+    def _can_parallelize(self):
+        """True if worker threads can get their own Drive service"""
+        if http_transport.get_transport() is not None:
+            return True
+        return getattr(getattr(self.service, '_http', None), 'credentials', None) is not None
 
     def create_event_folder(self, event_name, parent_folder_id=None):
         """Create a folder for the event in Google Drive"""
@@ -606,7 +1287,6 @@ class GoogleDriveManager:
     def upload_to_imgbb(self, file_data, file_name):
         """Upload image to ImgBB (free image hosting - no Drive needed!)"""
         try:
-            import requests
             import base64
 
             if not config.IMGBB_API_KEY:
@@ -623,7 +1303,7 @@ class GoogleDriveManager:
                 "name": file_name
             }
 
-            response = requests.post(url, data=payload, timeout=30)
+            response = http_transport.web_session().post(url, data=payload, timeout=30)
 
             if response.status_code == 200:
                 result = response.json()
@@ -634,57 +1314,130 @@ class GoogleDriveManager:
         except Exception as e:
             return None
 
-    def upload_file(self, file_data, file_name, folder_id, mime_type):
-        """Upload file to Google Drive (works with OAuth2!)"""
-        try:
-            # If OAuth is enabled, upload directly to Google Drive
-            if config.USE_OAUTH:
-                import oauth_drive
-                from io import BytesIO
-
-                file_stream = BytesIO(file_data)
-                drive_url = oauth_drive.upload_to_drive_oauth(
-                    self.service,
-                    file_stream,
-                    file_name,
-                    folder_id
-                )
+    def _store_file(self, service, file_data, file_name, folder_id, mime_type):
+        """Upload/store a file without touching the UI.
 
-                if drive_url:
-                    st.success(f"✅ {file_name} uploaded to Google Drive!")
-                    return drive_url
-                else:
-                    st.error(f"❌ Failed to upload {file_name} to Drive")
-                    return None
+        file_data is bytes or a readable binary stream positioned at the start.
+        Returns (file_reference, destination) where destination is 'drive',
+        'imgbb' or 'local'. Raises RuntimeError if the Drive upload fails.
+        """
+        is_stream = hasattr(file_data, 'read')
 
-            # Fallback: Try ImgBB for images if API key is configured
-            elif mime_type.startswith('image/') and config.IMGBB_API_KEY:
-                imgbb_url = self.upload_to_imgbb(file_data, file_name)
-                if imgbb_url:
-                    st.success(f"✅ {file_name} uploaded to ImgBB!")
-                    return imgbb_url
-
-            # Last resort: Store locally
-            import os
-            backup_folder = "uploaded_files_backup"
-            if not os.path.exists(backup_folder):
-                os.makedirs(backup_folder)
-
-            file_path = os.path.join(backup_folder, file_name)
-            with open(file_path, 'wb') as f:
+        # If OAuth is enabled, upload directly to Google Drive
+        if config.USE_OAUTH:
+            import oauth_drive
+            from io import BytesIO
+
+            file_stream = file_data if is_stream else BytesIO(file_data)
+            drive_url, error = oauth_drive.upload_to_drive_oauth(
+                service,
+                file_stream,
+                file_name,
+                folder_id
+            )
+            if not drive_url:
+                raise RuntimeError(error or "Upload failed")
+            return drive_url, 'drive'
+
+        # Fallback: Try ImgBB for images if API key is configured
+        elif mime_type.startswith('image/') and config.IMGBB_API_KEY:
+            imgbb_url = self.upload_to_imgbb(file_data.read() if is_stream else file_data, file_name)
+            if imgbb_url:
+                return imgbb_url, 'imgbb'
+
+        # Last resort: Store locally
+        import os
+        backup_folder = "uploaded_files_backup"
+        os.makedirs(backup_folder, exist_ok=True)
+
+        file_path = os.path.join(backup_folder, file_name)
+        with open(file_path, 'wb') as f:
+            if is_stream:
+                file_data.seek(0)
+                shutil.copyfileobj(file_data, f)
+            else:
                 f.write(file_data)
 
-            st.warning(f"📁 {file_name} saved locally (accessible on server)")
-            return f"LOCAL:{file_path}"
+        return f"LOCAL:{file_path}", 'local'
+
+    def store_file(self, file_data, file_name, folder_id, mime_type):
+        """Upload/store a file from any thread without touching the UI.
+
+        Uses the calling thread's Drive service. Returns (file_reference,
+        destination) as _store_file() does, and raises if the Drive upload fails.
+        """
+        return self._store_file(self._thread_service(), file_data, file_name, folder_id, mime_type)
+
+    def upload_file(self, file_data, file_name, folder_id, mime_type):
+        """Upload file to Google Drive (works with OAuth2!)"""
+        try:
+            file_ref, destination = self._store_file(self.service, file_data, file_name, folder_id, mime_type)
+            self.show_upload_result(file_name, file_ref, destination)
+            return file_ref
 
         except Exception as e:
             st.error(f"Error uploading {file_name}: {str(e)}")
             return None
 
+    @staticmethod
+    def show_upload_result(file_name, file_ref, destination, error=None):
+        """Tell the user where a file ended up (or why it did not upload)"""
+        if not file_ref:
+            st.error(f"❌ Failed to upload {file_name}: {error or 'Upload failed'}")
+        elif destination == 'drive':
+            st.success(f"✅ {file_name} uploaded to Google Drive!")
+        elif destination == 'imgbb':
+            st.success(f"✅ {file_name} uploaded to ImgBB!")
+        else:
+            st.warning(f"📁 {file_name} saved locally (accessible on server)")
+
+    def upload_files(self, uploads, max_workers=None, progress_callback=None):
+        """Upload several files concurrently on a bounded thread pool.
+
+        uploads is a list of dicts with 'key', 'data', 'file_name', 'folder_id'
+        and 'mime_type'. Files are not retried here: the Drive transport already
+        retries failed requests, and repeating a create whose response was lost
+        would leave a duplicate file in the folder.
+        progress_callback(item, file_reference, destination, error, completed,
+        total) is called from the calling thread as each file finishes, so it
+        may use Streamlit; destination is 'drive', 'imgbb' or 'local' (None if
+        the upload failed). Returns {key: (file_reference, error)}.
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        def _upload(item):
+            try:
+                file_ref, destination = self.store_file(
+                    item['data'], item['file_name'], item['folder_id'], item['mime_type']
+                )
+                if file_ref:
+                    return file_ref, destination, None
+                return None, None, "Upload failed"
+            except Exception as e:
+                return None, None, str(e)[:100]
+
+        if not uploads:
+            return {}
+
+        max_workers = max_workers or config.DRIVE_UPLOAD_WORKERS
+        if not self._can_parallelize():
+            max_workers = 1
+        max_workers = max(1, min(max_workers, len(uploads)))
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_upload, item): item for item in uploads}
+            for completed, future in enumerate(as_completed(futures), start=1):
+                item = futures[future]
+                file_ref, destination, error = future.result()
+                results[item['key']] = (file_ref, error)
+                if progress_callback:
+                    progress_callback(item, file_ref, destination, error, completed, len(uploads))
+        return results
+
     def download_file(self, file_id_or_url):
-        """Download file from Google Drive by file ID or URL"""
+        """Download file from Google Drive by file ID or URL (safe to call from worker threads)"""
         import re
-        import requests
         import logging
         from io import BytesIO
         from googleapiclient.http import MediaIoBaseDownload
@@ -742,11 +1495,25 @@ class GoogleDriveManager:
 
             logger.info(f"Using file ID: {file_id}")
 
+            # Serve from the local cache if Drive still has the same revision.
+            # Metadata is only needed to revalidate an entry we already have.
+            file_cache = get_drive_file_cache()
+            try:
+                cached = file_cache.get(
+                    file_id,
+                    lambda: self._revision_meta.pop(file_id, None) or self._file_metadata(file_id)
+                )
+                if cached is not None:
+                    logger.info(f"Cache hit: {len(cached)} bytes for {file_id}")
+                    return cached
+            except Exception as meta_error:
+                logger.warning(f"Drive metadata lookup failed: {str(meta_error)[:100]}")
+
             # Method 1: Try Google Drive API
             api_error_msg = None
             try:
                 logger.info(f"Trying Drive API download for: {file_id}")
-                request = self.service.files().get_media(fileId=file_id)
+                request = self._thread_service().files().get_media(fileId=file_id)
                 file_data = BytesIO()
                 downloader = MediaIoBaseDownload(file_data, request)
 
@@ -759,6 +1526,8 @@ class GoogleDriveManager:
 
                 if content and len(content) > 0:
                     logger.info(f"Drive API success: {len(content)} bytes downloaded")
+                    # Drive's md5Checksum is the MD5 of the content, so no metadata request is needed
+                    file_cache.put(file_id, {'md5Checksum': hashlib.md5(content).hexdigest()}, content)
                     return content
                 else:
                     api_error_msg = "API returned empty content"
@@ -771,7 +1540,7 @@ class GoogleDriveManager:
             try:
                 download_url = f"https://drive.google.com/uc?export=download&id={file_id}"
                 logger.info(f"Trying direct URL download: {download_url}")
-                response = requests.get(download_url, timeout=30)
+                response = http_transport.web_session().get(download_url, timeout=30)
                 if response.status_code == 200 and len(response.content) > 100:
                     # Check if it's HTML (error page) instead of actual file
                     if not response.content[:20].startswith(b'<!'):
@@ -793,47 +1562,74 @@ class GoogleDriveManager:
             logger.error(f"Download exception: {str(e)[:100]}")
             return None
 
+    def _file_metadata(self, file_id):
+        """Drive md5Checksum/modifiedTime for a file ID (raises on API errors)"""
+        return self._thread_service().files().get(
+            fileId=file_id,
+            fields='md5Checksum, modifiedTime',
+            supportsAllDrives=True
+        ).execute()
+
+    def file_revision(self, file_id):
+        """Identifier of the file's current content, or None if unavailable"""
+        try:
+            file_id = str(file_id).strip()
+            meta = self._file_metadata(file_id)
+            # The download that usually follows can revalidate its cache entry with this
+            self._revision_meta[file_id] = meta
+            return meta.get('md5Checksum') or meta.get('modifiedTime')
+        except Exception:
+            return None
+
+    def document_info(self, file_id):
+        """Pre-flight details ({'kind', 'pages'}) recorded when the file was uploaded, if known"""
+        return get_drive_file_cache().info(str(file_id).strip())
+
+    def remember_upload(self, file_id, data, info):
+        """Seed the download cache with a file this app just uploaded, plus its pre-flight details"""
+        get_drive_file_cache().put(file_id, {'md5Checksum': hashlib.md5(data).hexdigest()}, data, info=info)
+
+    @staticmethod
+    def folder_id_from_url(folder_url):
+        """Drive folder ID from an event's 'Drive Folder URL', or '' if there is none"""
+        import re
+        match = re.search(r'folders/([a-zA-Z0-9_-]+)', folder_url or '')
+        return match.group(1) if match else ''
+
     def get_or_create_event_folder(self, event_name, event_id, parent_folder_id=None):
         """Get existing folder or create new one"""
-        import time
-
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # Search for existing folder by name
-                query = f"name='{event_name}' and mimeType='application/vnd.google-apps.folder'"
-                if parent_folder_id and parent_folder_id != "YOUR_DRIVE_FOLDER_ID_HERE":
-                    query += f" and '{parent_folder_id}' in parents"
-
-                results = self.service.files().list(
-                    q=query,
-                    spaces='drive',
-                    fields='files(id, webViewLink)',
-                    supportsAllDrives=True,
-                    includeItemsFromAllDrives=True
-                ).execute()
+        try:
+            # Search for existing folder by name
+            query = f"name='{event_name}' and mimeType='application/vnd.google-apps.folder'"
+            if parent_folder_id and parent_folder_id != "YOUR_DRIVE_FOLDER_ID_HERE":
+                query += f" and '{parent_folder_id}' in parents"
+
+            # Transient errors are retried by the shared transport (see api_retry)
+            results = self.service.files().list(
+                q=query,
+                spaces='drive',
+                fields='files(id, webViewLink)',
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True
+            ).execute()
 
-                folders = results.get('files', [])
+            folders = results.get('files', [])
 
-                if folders:
-                    # Return existing folder
-                    return folders[0]['id'], folders[0].get('webViewLink', '')
-                else:
-                    # Create new folder
-                    return self.create_event_folder(event_name, parent_folder_id)
+            if folders:
+                # Return existing folder
+                return folders[0]['id'], folders[0].get('webViewLink', '')
+            else:
+                # Create new folder
+                return self.create_event_folder(event_name, parent_folder_id)
 
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    st.warning(f"Retry {attempt + 1}/{max_retries} - Connection issue, retrying...")
-                    time.sleep(2)  # Wait 2 seconds before retry
-                else:
-                    st.error(f"Error with folder after {max_retries} attempts: {str(e)}")
-                    # Last resort - try to create folder
-                    try:
-                        return self.create_event_folder(event_name, parent_folder_id)
-                    except:
-                        # If all fails, return None
-                        return None, None
+        except Exception as e:
+            st.error(f"Error with folder: {str(e)}")
+            # Last resort - try to create folder
+            try:
+                return self.create_event_folder(event_name, parent_folder_id)
+            except:
+                # If all fails, return None
+                return None, None
 
 # Utility Functions
 class ValidationUtils:
@@ -995,6 +1791,26 @@ def main():
                         st.success("Cache cleared! Refresh page to re-authenticate.")
                         st.stop()
 
+        if st.session_state.authenticated and st.session_state.is_admin:
+            with st.expander("Connection Stats"):
+                connection_stats = http_transport.stats.snapshot()
+                if not connection_stats:
+                    st.caption("No requests yet")
+                for channel, counts in sorted(connection_stats.items()):
+                    st.caption(f"**{channel}**: {counts['requests']} requests, "
+                               f"{counts['connections']} connections opened, {counts['reused']} reused")
+                for api, retries in sorted(api_retry.policy.retries.items()):
+                    st.caption(f"**{api}**: {retries} retries after rate limits or errors")
+                sheets_writer = get_sheets_writer()
+                writes = sheets_writer.stats
+                st.caption(f"**sheet writes**: {writes['submitted']} rows queued, {writes['coalesced']} coalesced, "
+                           f"{writes['requests']} requests, {sheets_writer.pending()} waiting")
+                st.caption(f"**last login**: {get_user_directory().pending()} stamps buffered")
+                event_journal = get_event_journal()
+                st.caption(f"**event journal**: {len(event_journal.pending())} saves waiting for the sheet")
+                if event_journal.last_error:
+                    st.caption(f"Last replication error: {event_journal.last_error}")
+
     # Main content - Public landing page with tabs
     main_page(sheets_client, drive_service)
 
@@ -1869,6 +2685,322 @@ def show_admin_dashboard(sheets_client):
 
     st.markdown('</div>', unsafe_allow_html=True)
 
+def run_report_job(job):
+    """Render one event's report on a background worker (see get_report_jobs).
+
+    'upload' jobs upload the PDF to the event folder and record it as the
+    event's Generated_PDF_ID; 'download' jobs leave it in a result file, as
+    do 'compendium' jobs, which combine the reports of many events.
+    """
+    from pdf_generator import IICReportGenerator
+
+    sheets_client, drive_service, _ = init_google_services()
+    drive_manager = GoogleDriveManager(drive_service)
+    report_cache = get_report_cache()
+    payload = job['payload']
+
+    if job['kind'] == 'compendium':
+        result_path = get_report_jobs().result_path(job['id'])
+        _, status = IICReportGenerator.generate_compendium(
+            payload['events'], result_path, payload['title'], logo_path="logos",
+            drive_manager=drive_manager, cache=report_cache
+        )
+        return {'result_path': result_path, 'file_name': payload['file_name'], 'merge_status': status}
+
+    generator = IICReportGenerator(payload['event_data'], logo_path="logos", drive_manager=drive_manager)
+
+    if job['kind'] == 'download':
+        result_path = get_report_jobs().result_path(job['id'])
+        generator.generate_pdf(result_path, cache=report_cache)
+        return {'result_path': result_path, 'file_name': payload['file_name'],
+                'merge_status': generator.merge_status}
+
+    # Nothing changed since the PDF on record was uploaded
+    fingerprint = generator.fingerprint()
+    current_pdf_id = payload.get('current_pdf_id', '')
+    if current_pdf_id and report_cache.drive_id(fingerprint) == current_pdf_id:
+        return {'pdf_id': current_pdf_id, 'unchanged': True, 'merge_status': []}
+
+    with tempfile.SpooledTemporaryFile(max_size=config.PDF_SPOOL_MAX_BYTES) as pdf_buffer:
+        generator.generate_pdf(pdf_buffer, cache=report_cache)
+        pdf_id, _ = drive_manager.store_file(pdf_buffer, payload['file_name'], payload['folder_id'], 'application/pdf')
+    if not pdf_id:
+        raise RuntimeError("Failed to upload the generated PDF")
+
+    if not GoogleSheetsManager(sheets_client).update_event_pdf_id(job['event_id'], pdf_id):
+        raise RuntimeError(f"PDF uploaded ({pdf_id}) but the sheet could not be updated")
+    report_cache.set_drive_id(fingerprint, pdf_id)
+    return {'pdf_id': pdf_id, 'merge_status': generator.merge_status}
+
+@st.cache_resource
+def get_report_jobs():
+    """Process-wide background queue for report generation"""
+    return ReportJobQueue(config.REPORT_JOBS_DIR, run_report_job, config.REPORT_JOB_WORKERS,
+                          retention=config.REPORT_JOB_RETENTION_HOURS * 3600)
+
+def track_report_job(job):
+    """Remember a submitted job so this session keeps showing its status"""
+    if 'report_jobs' not in st.session_state:
+        st.session_state.report_jobs = {}
+    st.session_state.report_jobs[(job['kind'], job['event_id'])] = job['id']
+
+def show_report_jobs_for_event(kind, event_id):
+    """Status of this session's job, or of any job still running, for an event"""
+    job_id = st.session_state.get('report_jobs', {}).get((kind, event_id))
+    if not job_id:
+        job = get_report_jobs().latest(kind, event_id)
+        if not job or job['status'] not in ('queued', 'running'):
+            return
+        job_id = job['id']
+    show_report_job_status(job_id)
+
+def show_merge_status(statuses):
+    """Colour-coded PDF merge log"""
+    for status in statuses:
+        if "MERGED" in status or "TOTAL" in status:
+            st.success(status)
+        elif "FAILED" in status or "ERROR" in status:
+            st.error(status)
+        elif "SKIPPED" in status:
+            st.warning(status)
+        else:
+            st.info(status)
+
+def show_report_job_status(job_id):
+    """Status of a background report job; re-polled every few seconds only while it is unfinished"""
+    job = get_report_jobs().get(job_id)
+    if not job:
+        return
+
+    if job['status'] in ('queued', 'running'):
+        poll_report_job(job_id)
+        return
+    if job['status'] == 'failed':
+        st.error(f"PDF generation failed: {job['error']}")
+        return
+
+    result = job['result']
+    if result.get('merge_status'):
+        with st.expander("📋 PDF Merge Details"):
+            show_merge_status(result['merge_status'])
+
+    if job['kind'] == 'compendium':
+        try:
+            with open(result['result_path'], 'rb') as f:
+                st.download_button(
+                    label="⬇️ Download Compendium",
+                    data=f.read(),
+                    file_name=result['file_name'],
+                    mime="application/pdf",
+                    key=f"download_job_{job_id}",
+                    use_container_width=True
+                )
+        except OSError:
+            st.warning("The generated compendium has expired - please generate it again.")
+        return
+
+    if job['kind'] == 'download':
+        try:
+            with open(result['result_path'], 'rb') as f:
+                st.download_button(
+                    label="⬇️ Download Merged PDF",
+                    data=f.read(),
+                    file_name=result['file_name'],
+                    mime="application/pdf",
+                    key=f"download_job_{job_id}",
+                    use_container_width=True
+                )
+            st.success("✅ Merged PDF generated! Click the download button above to save it.")
+            st.info("Print this PDF, get required signatures, scan it, and upload as signed PDF below.")
+        except OSError:
+            st.warning("The generated PDF has expired - please generate it again.")
+        return
+
+    if result.get('unchanged'):
+        st.info("Report content is unchanged - keeping the existing PDF.")
+    else:
+        st.success("✅ PDF report generated and uploaded to Google Drive!")
+
+@st.fragment(run_every=config.REPORT_JOB_POLL_SECONDS)
+def poll_report_job(job_id):
+    """Progress of an unfinished report job; reruns the page once it finishes"""
+    job = get_report_jobs().get(job_id)
+    if job and job['status'] == 'queued':
+        st.info("⏳ PDF report queued...")
+    elif job and job['status'] == 'running':
+        st.info("⏳ Generating PDF report in the background...")
+    else:
+        # Finished - show the result (and any new PDF link) outside this fragment, so polling stops
+        st.rerun()
+
+def show_compendium_builder(events):
+    """Queue a single PDF combining every report of one quarter"""
+    from pdf_generator import report_event_data
+
+    with st.expander("📚 Quarterly Compendium"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            year = st.selectbox("Academic Year", config.ACADEMIC_YEARS, key="compendium_year")
+        with col2:
+            quarter = st.selectbox("Quarter", ["Quarter 1", "Quarter 2", "Quarter 3", "Quarter 4"],
+                                   key="compendium_quarter")
+        with col3:
+            approved_only = st.checkbox("Approved events only", value=True, key="compendium_approved")
+
+        selected = [
+            e for e in events
+            if e.get('Academic Year') == year and str(e.get('Quarter', '')).startswith(quarter)
+            and (not approved_only or e.get('Admin_Approval_Status') == 'Approved')
+        ]
+        selected = sorted(selected, key=lambda e: e.get('Start Date', ''))
+        st.write(f"**{len(selected)} events** will be included, in order of start date.")
+
+        compendium_id = f"{year} {quarter}"
+        if st.button("📚 Generate Compendium", key="compendium_generate", disabled=not selected):
+            job = get_report_jobs().submit('compendium', compendium_id, {
+                'events': [report_event_data(e) for e in selected],
+                'title': f"IIC Activities Compendium - {year}, {quarter}",
+                'file_name': f"IIC_Compendium_{year}_{quarter.replace(' ', '')}.pdf",
+            })
+            track_report_job(job)
+        show_report_jobs_for_event('compendium', compendium_id)
+
+def show_bulk_approval_queue(sheets_manager, drive_service, events):
+    """Queue approve/reject decisions for many events and apply them in one pass"""
+    queue = st.session_state.setdefault('bulk_approval_queue', {})
+
+    with st.expander(f"📋 Bulk Approve / Reject ({len(queue)} queued)", expanded=bool(queue)):
+        # Outcome of the last flush (shown after the rerun)
+        last_result = st.session_state.pop('bulk_approval_result', None)
+        if last_result:
+            if last_result['updated']:
+                st.success(f"✅ Applied {last_result['updated']} decision(s)")
+            for failure in last_result['failures']:
+                st.error(failure)
+
+        options = {
+            f"{e.get('Program Name', 'Unnamed Event')} - {e.get('User Email', 'Unknown')} [{e.get('Event ID')}]": e
+            for e in events if e.get('Event ID')
+        }
+        selected = st.multiselect("Select events", list(options.keys()), key="bulk_select_events")
+
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            decision = st.radio("Decision", ["Approve", "Reject"], horizontal=True, key="bulk_decision")
+        with col2:
+            reason = ''
+            if decision == "Reject":
+                reason = st.text_input("Rejection Reason", key="bulk_reject_reason")
+
+        signed_pdfs = st.file_uploader(
+            "Signed PDFs (optional)",
+            type=['pdf'],
+            accept_multiple_files=True,
+            key="bulk_signed_pdfs",
+            help="Each file is matched to an event by the Event ID in its file name"
+        )
+
+        if st.button("➕ Add to Queue", key="bulk_add_to_queue", disabled=not selected):
+            if decision == "Reject" and not reason:
+                st.error("Please enter a rejection reason")
+            else:
+                for label in selected:
+                    event = options[label]
+                    event_id = event.get('Event ID')
+                    signed = next((f for f in signed_pdfs or [] if event_id in f.name), None)
+                    queue[event_id] = {
+                        'name': event.get('Program Name', 'Unnamed Event'),
+                        'folder_name': event.get('Program Name', 'Event'),
+                        'folder_id': GoogleDriveManager.folder_id_from_url(event.get('Drive Folder URL')),
+                        'status': 'Approved' if decision == "Approve" else 'Rejected',
+                        'reason': reason,
+                        'signed_pdf': signed.getvalue() if signed else None,
+                    }
+                st.rerun()
+
+        if not queue:
+            return
+
+        st.markdown("**Queued decisions:**")
+        st.dataframe(pd.DataFrame([
+            {
+                'Event ID': event_id,
+                'Program Name': item['name'],
+                'Decision': item['status'],
+                'Reason': item['reason'],
+                'Signed PDF': '✓' if item['signed_pdf'] else '',
+            }
+            for event_id, item in queue.items()
+        ]), use_container_width=True, hide_index=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            apply_queue = st.button(f"✅ Apply {len(queue)} Decision(s)", key="bulk_apply",
+                                    type="primary", use_container_width=True)
+        with col2:
+            if st.button("🗑️ Clear Queue", key="bulk_clear", use_container_width=True):
+                queue.clear()
+                st.rerun()
+
+        if apply_queue:
+            with st.spinner(f"Applying {len(queue)} decision(s)..."):
+                drive_manager = GoogleDriveManager(drive_service)
+                failures = []
+
+                # One parallel upload pass for every queued signed PDF
+                uploads = []
+                for event_id, item in queue.items():
+                    if not item['signed_pdf']:
+                        continue
+                    folder_id = item['folder_id']
+                    if not folder_id:
+                        folder_id, _ = drive_manager.get_or_create_event_folder(
+                            item['folder_name'],
+                            event_id,
+                            config.DRIVE_FOLDER_ID if config.DRIVE_FOLDER_ID != "YOUR_DRIVE_FOLDER_ID_HERE" else None
+                        )
+                    uploads.append({
+                        'key': event_id,
+                        'data': item['signed_pdf'],
+                        'file_name': f"IICReport_SIGNED_{event_id}.pdf",
+                        'folder_id': folder_id,
+                        'mime_type': 'application/pdf',
+                    })
+                upload_results = drive_manager.upload_files(uploads)
+
+                # One batched, priority Sheets write for every decision
+                now = datetime.now().strftime("%Y-%m-%d %H:%M")
+                decisions = {}
+                signed_pdf_ids = {}
+                for event_id, item in queue.items():
+                    if item['signed_pdf']:
+                        signed_pdf_id, error = upload_results.get(event_id, (None, "Not uploaded"))
+                        if not signed_pdf_id:
+                            failures.append(f"❌ {item['name']}: signed PDF upload failed - {error}")
+                            continue
+                        signed_pdf_ids[event_id] = {'Signed_PDF_ID': signed_pdf_id}
+                    decisions[event_id] = (item['status'], item['reason'])
+
+                updated = sheets_manager.bulk_update_approval_status(
+                    decisions, now, st.session_state.user_email
+                ) if decisions else []
+                for event_id in decisions:
+                    if event_id not in updated:
+                        failures.append(f"❌ {queue[event_id]['name']}: event not found in sheet")
+                signed_pdf_ids = {event_id: fields for event_id, fields in signed_pdf_ids.items() if event_id in updated}
+                if signed_pdf_ids:
+                    recorded = sheets_manager.update_events_bulk(signed_pdf_ids)
+                    for event_id in signed_pdf_ids:
+                        if event_id not in recorded:
+                            failures.append(f"❌ {queue[event_id]['name']}: signed PDF uploaded but its ID was not saved")
+
+                # Keep only the decisions that failed so they can be retried
+                for event_id in updated:
+                    queue.pop(event_id, None)
+
+                st.session_state.bulk_approval_result = {'updated': len(updated), 'failures': failures}
+                st.rerun()
+
 def show_all_events_admin(sheets_client, drive_service):
     """Display all submitted reports for admin to view, edit, and regenerate"""
     st.markdown('<div class="form-container">', unsafe_allow_html=True)
@@ -1904,6 +3036,11 @@ def show_all_events_admin(sheets_client, drive_service):
         filtered_events = sorted(filtered_events, key=lambda x: x.get('Created Date', ''), reverse=True)
 
         st.write(f"**Showing {len(filtered_events)} events**")
+
+        if filtered_events:
+            show_bulk_approval_queue(sheets_manager, drive_service, filtered_events)
+        show_compendium_builder(all_events)
+
         st.markdown("---")
 
         if filtered_events:
@@ -1966,12 +3103,12 @@ def show_all_events_admin(sheets_client, drive_service):
                     with btn_col2:
                         if st.button(f"🔄 Regen PDF", key=f"admin_regen_{event.get('Event ID')}_{i}", use_container_width=True):
                             # Regenerate PDF
-                            with st.spinner("Regenerating PDF report..."):
+                            with st.spinner("Queuing PDF regeneration..."):
                                 try:
                                     drive_manager = GoogleDriveManager(drive_service)
 
                                     # Get folder ID
-                                    folder_id = event.get('Drive Folder ID', '')
+                                    folder_id = drive_manager.folder_id_from_url(event.get('Drive Folder URL'))
                                     if not folder_id:
                                         folder_id, _ = drive_manager.get_or_create_event_folder(
                                             event.get('Program Name', 'Event'),
@@ -1979,81 +3116,18 @@ def show_all_events_admin(sheets_client, drive_service):
                                             config.DRIVE_FOLDER_ID if config.DRIVE_FOLDER_ID != "YOUR_DRIVE_FOLDER_ID_HERE" else None
                                         )
 
-                                    # Generate PDF
-                                    from pdf_generator import IICReportGenerator
-                                    pdf_event_data = {
-                                        'Program Name': event.get('Program Name', ''),
-                                        'Academic Year': event.get('Academic Year', ''),
-                                        'Quarter': event.get('Quarter', ''),
-                                        'Start Date': event.get('Start Date', ''),
-                                        'End Date': event.get('End Date', ''),
-                                        'Program Theme': event.get('Program Theme', ''),
-                                        'Program Driven By': event.get('Program Driven By', ''),
-                                        'Activity Led By': event.get('Activity Led By', ''),
-                                        'Organizing Departments': event.get('Organizing Departments', ''),
-                                        'Professional Society Club': event.get('Professional Society Club', ''),
-                                        'SDG Goals': event.get('SDG Goals', ''),
-                                        'Program Outcomes': event.get('Program Outcomes', ''),
-                                        'Program Type': event.get('Program Type', ''),
-                                        'Mode of Delivery': event.get('Mode of Delivery', ''),
-                                        'Student Participants': event.get('Student Participants', ''),
-                                        'Faculty Participants': event.get('Faculty Participants', ''),
-                                        'External Participants': event.get('External Participants', ''),
-                                        'Event Level': event.get('Event Level', ''),
-                                        'Duration (Hrs)': event.get('Duration (Hrs)', ''),
-                                        'Expenditure Amount': event.get('Expenditure Amount', ''),
-                                        'Video URL': event.get('Video URL', ''),
-                                        'Objective': event.get('Objective', ''),
-                                        'Benefits': event.get('Benefits', ''),
-                                        'Brief Report': event.get('Brief Report', ''),
-                                        'Geotag_Photo1_ID': event.get('Geotag_Photo1_ID', ''),
-                                        'Geotag_Photo2_ID': event.get('Geotag_Photo2_ID', ''),
-                                        'Geotag_Photo3_ID': event.get('Geotag_Photo3_ID', ''),
-                                        'Normal_Photo1_ID': event.get('Normal_Photo1_ID', ''),
-                                        'Normal_Photo2_ID': event.get('Normal_Photo2_ID', ''),
-                                        'Normal_Photo3_ID': event.get('Normal_Photo3_ID', ''),
-                                        'Attendance_Report_ID': event.get('Attendance_Report_ID', ''),
-                                        'Feedback_Analysis_ID': event.get('Feedback_Analysis_ID', ''),
-                                        'Event_Agenda_ID': event.get('Event_Agenda_ID', ''),
-                                        'Chief_Guest_Biodata_ID': event.get('Chief_Guest_Biodata_ID', ''),
-                                        'KPI_Report_ID': event.get('KPI_Report_ID', ''),
-                                    }
-
-                                    pdf_generator = IICReportGenerator(pdf_event_data, logo_path="logos", drive_manager=drive_manager)
-                                    pdf_buffer = io.BytesIO()
-                                    pdf_generator.generate_pdf(pdf_buffer)
-
-                                    # Show merge status for debugging
-                                    if hasattr(pdf_generator, 'merge_status') and pdf_generator.merge_status:
-                                        with st.expander("PDF Merge Details", expanded=True):
-                                            for status in pdf_generator.merge_status:
-                                                if "MERGED" in status or "TOTAL" in status:
-                                                    st.success(status)
-                                                elif "FAILED" in status or "ERROR" in status:
-                                                    st.error(status)
-                                                elif "SKIPPED" in status:
-                                                    st.warning(status)
-                                                else:
-                                                    st.info(status)
-
-                                    pdf_buffer.seek(0)
-
-                                    # Upload to Drive
-                                    pdf_filename = f"IICReport_{event.get('Event ID')}-IC201912089.pdf"
-                                    pdf_report_id = drive_manager.upload_file(
-                                        pdf_buffer.read(),
-                                        pdf_filename,
-                                        folder_id,
-                                        'application/pdf'
-                                    )
-
-                                    # Update Google Sheets with new PDF ID
-                                    if pdf_report_id:
-                                        sheets_manager.update_event_pdf_id(event.get('Event ID'), pdf_report_id)
-                                        st.success(f"✅ PDF regenerated successfully!")
-                                        st.rerun()
-                                    else:
-                                        st.error("Failed to upload regenerated PDF")
+                                    # Report content
+                                    from pdf_generator import report_event_data
+                                    pdf_event_data = report_event_data(event)
+
+                                    # Render and upload in the background
+                                    job = get_report_jobs().submit('upload', event.get('Event ID'), {
+                                        'event_data': pdf_event_data,
+                                        'folder_id': folder_id,
+                                        'file_name': f"IICReport_{event.get('Event ID')}-IC201912089.pdf",
+                                        'current_pdf_id': event.get('Generated_PDF_ID', ''),
+                                    })
+                                    track_report_job(job)
 
                                 except Exception as e:
                                     st.error(f"Error regenerating PDF: {str(e)}")
@@ -2069,6 +3143,8 @@ def show_all_events_admin(sheets_client, drive_service):
                             pdf_url = f"https://drive.google.com/file/d/{pdf_id}/view"
                             st.markdown(f"[📄 View PDF]({pdf_url})")
 
+                    show_report_jobs_for_event('upload', event.get('Event ID'))
+
                     # Rejection reason input
                     if st.session_state.get(f'show_reject_{event.get("Event ID")}', False):
                         reject_reason = st.text_area("Rejection Reason:", key=f"reject_reason_{event.get('Event ID')}_{i}")
@@ -2088,95 +3164,24 @@ def show_all_events_admin(sheets_client, drive_service):
                     st.info("Generate and download the complete merged PDF with all uploaded documents (Attendance, Feedback, Agenda, Biodata, KPI) for printing and signing.")
 
                     if st.button(f"📄 Generate & Download Merged PDF", key=f"merge_download_{event.get('Event ID')}_{i}", use_container_width=True):
-                        with st.spinner("Generating merged PDF report with all documents..."):
+                        with st.spinner("Queuing merged PDF report..."):
                             try:
-                                drive_manager = GoogleDriveManager(drive_service)
-
-                                # Get folder ID
-                                folder_id = event.get('Drive Folder ID', '')
-                                if not folder_id:
-                                    folder_id, _ = drive_manager.get_or_create_event_folder(
-                                        event.get('Program Name', 'Event'),
-                                        event.get('Event ID'),
-                                        config.DRIVE_FOLDER_ID if config.DRIVE_FOLDER_ID != "YOUR_DRIVE_FOLDER_ID_HERE" else None
-                                    )
-
                                 # Prepare event data for PDF generation
-                                from pdf_generator import IICReportGenerator
-                                pdf_event_data = {
-                                    'Program Name': event.get('Program Name', ''),
-                                    'Academic Year': event.get('Academic Year', ''),
-                                    'Quarter': event.get('Quarter', ''),
-                                    'Start Date': event.get('Start Date', ''),
-                                    'End Date': event.get('End Date', ''),
-                                    'Program Theme': event.get('Program Theme', ''),
-                                    'Program Driven By': event.get('Program Driven By', ''),
-                                    'Activity Led By': event.get('Activity Led By', ''),
-                                    'Organizing Departments': event.get('Organizing Departments', ''),
-                                    'Professional Society Club': event.get('Professional Society Club', ''),
-                                    'SDG Goals': event.get('SDG Goals', ''),
-                                    'Program Outcomes': event.get('Program Outcomes', ''),
-                                    'Program Type': event.get('Program Type', ''),
-                                    'Mode of Delivery': event.get('Mode of Delivery', ''),
-                                    'Student Participants': event.get('Student Participants', ''),
-                                    'Faculty Participants': event.get('Faculty Participants', ''),
-                                    'External Participants': event.get('External Participants', ''),
-                                    'Event Level': event.get('Event Level', ''),
-                                    'Duration (Hrs)': event.get('Duration (Hrs)', ''),
-                                    'Expenditure Amount': event.get('Expenditure Amount', ''),
-                                    'Video URL': event.get('Video URL', ''),
-                                    'Objective': event.get('Objective', ''),
-                                    'Benefits': event.get('Benefits', ''),
-                                    'Brief Report': event.get('Brief Report', ''),
-                                    'Geotag_Photo1_ID': event.get('Geotag_Photo1_ID', ''),
-                                    'Geotag_Photo2_ID': event.get('Geotag_Photo2_ID', ''),
-                                    'Geotag_Photo3_ID': event.get('Geotag_Photo3_ID', ''),
-                                    'Normal_Photo1_ID': event.get('Normal_Photo1_ID', ''),
-                                    'Normal_Photo2_ID': event.get('Normal_Photo2_ID', ''),
-                                    'Normal_Photo3_ID': event.get('Normal_Photo3_ID', ''),
-                                    'Attendance_Report_ID': event.get('Attendance_Report_ID', ''),
-                                    'Feedback_Analysis_ID': event.get('Feedback_Analysis_ID', ''),
-                                    'Event_Agenda_ID': event.get('Event_Agenda_ID', ''),
-                                    'Chief_Guest_Biodata_ID': event.get('Chief_Guest_Biodata_ID', ''),
-                                    'KPI_Report_ID': event.get('KPI_Report_ID', ''),
-                                }
-
-                                # Generate the merged PDF
-                                pdf_generator = IICReportGenerator(pdf_event_data, logo_path="logos", drive_manager=drive_manager)
-                                pdf_buffer = io.BytesIO()
-                                pdf_generator.generate_pdf(pdf_buffer)
-
-                                # Show merge status
-                                if hasattr(pdf_generator, 'merge_status') and pdf_generator.merge_status:
-                                    with st.expander("📋 PDF Merge Details", expanded=True):
-                                        for status in pdf_generator.merge_status:
-                                            if "MERGED" in status or "TOTAL" in status:
-                                                st.success(status)
-                                            elif "FAILED" in status or "ERROR" in status:
-                                                st.error(status)
-                                            elif "SKIPPED" in status:
-                                                st.warning(status)
-                                            else:
-                                                st.info(status)
-
-                                pdf_buffer.seek(0)
-
-                                # Provide download button
-                                pdf_filename = f"IICReport_MERGED_{event.get('Event ID')}.pdf"
-                                st.download_button(
-                                    label="⬇️ Download Merged PDF",
-                                    data=pdf_buffer.getvalue(),
-                                    file_name=pdf_filename,
-                                    mime="application/pdf",
-                                    key=f"download_merged_{event.get('Event ID')}_{i}",
-                                    use_container_width=True
-                                )
-                                st.success("✅ Merged PDF generated! Click the download button above to save it.")
-                                st.info("Print this PDF, get required signatures, scan it, and upload as signed PDF below.")
+                                from pdf_generator import report_event_data
+                                pdf_event_data = report_event_data(event)
+
+                                # Generate the merged PDF in the background
+                                job = get_report_jobs().submit('download', event.get('Event ID'), {
+                                    'event_data': pdf_event_data,
+                                    'file_name': f"IICReport_MERGED_{event.get('Event ID')}.pdf",
+                                })
+                                track_report_job(job)
 
                             except Exception as e:
                                 st.error(f"Error generating merged PDF: {str(e)}")
 
+                    show_report_jobs_for_event('download', event.get('Event ID'))
+
                     # Signed PDF Upload and Approval Section
                     st.markdown("---")
                     existing_signed_pdf = event.get('Signed_PDF_ID', '')
@@ -2200,7 +3205,7 @@ def show_all_events_admin(sheets_client, drive_service):
                                     with st.spinner("Uploading signed PDF..."):
                                         try:
                                             drive_manager = GoogleDriveManager(drive_service)
-                                            folder_id = event.get('Drive Folder ID', '')
+                                            folder_id = drive_manager.folder_id_from_url(event.get('Drive Folder URL'))
                                             if not folder_id:
                                                 folder_id, _ = drive_manager.get_or_create_event_folder(
                                                     event.get('Program Name', 'Event'),
@@ -2242,7 +3247,7 @@ def show_all_events_admin(sheets_client, drive_service):
                                 with st.spinner("Uploading signed PDF and approving event..."):
                                     try:
                                         drive_manager = GoogleDriveManager(drive_service)
-                                        folder_id = event.get('Drive Folder ID', '')
+                                        folder_id = drive_manager.folder_id_from_url(event.get('Drive Folder URL'))
                                         if not folder_id:
                                             folder_id, _ = drive_manager.get_or_create_event_folder(
                                                 event.get('Program Name', 'Event'),
@@ -2286,6 +3291,64 @@ def show_all_events_admin(sheets_client, drive_service):
 
     st.markdown('</div>', unsafe_allow_html=True)
 
+@st.cache_resource
+def get_preflight_pool():
+    """Worker threads that check uploaded documents (see pdf_preflight)"""
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=config.PREFLIGHT_WORKERS, thread_name_prefix='preflight')
+
+def start_preflight(field, uploaded_file):
+    """Queue the pre-flight check of a newly uploaded document (once per upload)"""
+    from pdf_preflight import preflight_document
+
+    checks = st.session_state.setdefault('upload_preflight', {})
+    check = checks.get(field)
+    if check is None or check['file_id'] != uploaded_file.file_id:
+        checks[field] = {
+            'file_id': uploaded_file.file_id,
+            'future': get_preflight_pool().submit(preflight_document, uploaded_file.getvalue()),
+        }
+
+def preflight_result(field, timeout=None):
+    """Result of a document's pre-flight check, or None if it has not finished within timeout"""
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+
+    check = st.session_state.get('upload_preflight', {}).get(field)
+    if check is None:
+        return None
+    try:
+        return check['future'].result(timeout=timeout)
+    except FutureTimeoutError:
+        return None
+    except Exception as e:
+        return {'kind': None, 'pages': 0, 'data': None, 'notes': [], 'error': f"Check failed: {str(e)[:100]}"}
+
+def show_preflight_status(field):
+    """Outcome of a document's pre-flight check (re-polled only until it finishes)"""
+    result = preflight_result(field, timeout=0)
+    if result is None:
+        if st.session_state.get('upload_preflight', {}).get(field):
+            poll_preflight(field)
+        return
+    if result['error']:
+        st.error(f"❌ {result['error']}")
+        return
+    if result['kind'] == 'pdf':
+        st.success(f"✓ PDF checked: {result['pages']} page(s)")
+    else:
+        st.success("✓ Image checked")
+    for note in result['notes']:
+        st.info(f"🛠️ {note}")
+
+@st.fragment(run_every=config.PREFLIGHT_POLL_SECONDS)
+def poll_preflight(field):
+    """Progress of an unfinished pre-flight check; reruns the page once it finishes"""
+    if preflight_result(field, timeout=0) is None:
+        st.info("🔎 Checking document...")
+    else:
+        # Finished - show the outcome outside this fragment, so polling stops
+        st.rerun()
+
 def create_event_form(sheets_client, drive_service):
     """Create/Edit event form"""
     st.markdown('<div class="form-container">', unsafe_allow_html=True)
@@ -2708,6 +3771,8 @@ def create_event_form(sheets_client, drive_service):
                 st.error(f"⚠️ File size ({file_size_mb:.2f}MB) exceeds {config.MAX_PDF_FILE_SIZE_MB}MB limit")
             else:
                 st.info(f"New file: {file_size_mb:.2f}MB - will replace existing")
+                start_preflight('Attendance_Report_ID', attendance_report)
+                show_preflight_status('Attendance_Report_ID')
 
     with col2:
         if event_data.get('Feedback_Analysis_ID'):
@@ -2724,6 +3789,8 @@ def create_event_form(sheets_client, drive_service):
                 st.error(f"⚠️ File size ({file_size_mb:.2f}MB) exceeds {config.MAX_PDF_FILE_SIZE_MB}MB limit")
             else:
                 st.info(f"New file: {file_size_mb:.2f}MB - will replace existing")
+                start_preflight('Feedback_Analysis_ID', feedback_analysis)
+                show_preflight_status('Feedback_Analysis_ID')
 
     col1, col2 = st.columns(2)
     with col1:
@@ -2741,6 +3808,8 @@ def create_event_form(sheets_client, drive_service):
                 st.error(f"⚠️ File size ({file_size_mb:.2f}MB) exceeds {config.MAX_PDF_FILE_SIZE_MB}MB limit")
             else:
                 st.info(f"New file: {file_size_mb:.2f}MB - will replace existing")
+                start_preflight('Event_Agenda_ID', event_agenda)
+                show_preflight_status('Event_Agenda_ID')
 
     with col2:
         if event_data.get('Chief_Guest_Biodata_ID'):
@@ -2757,6 +3826,8 @@ def create_event_form(sheets_client, drive_service):
                 st.error(f"⚠️ File size ({file_size_mb:.2f}MB) exceeds {config.MAX_PDF_FILE_SIZE_MB}MB limit")
             else:
                 st.success(f"✓ File size: {file_size_mb:.2f}MB")
+                start_preflight('Chief_Guest_Biodata_ID', chief_guest_biodata)
+                show_preflight_status('Chief_Guest_Biodata_ID')
 
     # Permission SOP with Principal Signature
     st.markdown("### 📋 Permission SOP")
@@ -2776,6 +3847,8 @@ def create_event_form(sheets_client, drive_service):
                 st.error(f"⚠️ File size ({file_size_mb:.2f}MB) exceeds {config.MAX_PDF_FILE_SIZE_MB}MB limit")
             else:
                 st.success(f"✓ File size: {file_size_mb:.2f}MB")
+                start_preflight('Permission_SOP_ID', permission_sop)
+                show_preflight_status('Permission_SOP_ID')
 
     with col2:
         if event_data.get('Invitation_Brochure_ID'):
@@ -2792,6 +3865,8 @@ def create_event_form(sheets_client, drive_service):
                 st.error(f"⚠️ File size ({file_size_mb:.2f}MB) exceeds {config.MAX_PDF_FILE_SIZE_MB}MB limit")
             else:
                 st.success(f"✓ File size: {file_size_mb:.2f}MB")
+                start_preflight('Invitation_Brochure_ID', invitation_brochure)
+                show_preflight_status('Invitation_Brochure_ID')
 
     # Other Documents (UC, Bills, etc.) - Mandatory if finance involved
     st.markdown("### 📁 Other Documents (Finance Related)")
@@ -2811,6 +3886,8 @@ def create_event_form(sheets_client, drive_service):
             st.error(f"⚠️ File size ({file_size_mb:.2f}MB) exceeds {config.MAX_PDF_FILE_SIZE_MB}MB limit")
         else:
             st.success(f"✓ File size: {file_size_mb:.2f}MB")
+            start_preflight('Other_Documents_ID', other_documents)
+            show_preflight_status('Other_Documents_ID')
 
     if expenditure > 0 and not other_documents and not event_data.get('Other_Documents_ID'):
         st.warning("⚠️ Since expenditure is involved, uploading UC/Bill documents is mandatory")
@@ -2949,6 +4026,29 @@ def create_event_form(sheets_client, drive_service):
                 if expenditure > 0 and not other_documents and not event_data.get('Other_Documents_ID'):
                     errors.append("UC/Bill documents are required when expenditure is involved")
 
+        # Uploaded documents must have passed their pre-flight check
+        document_uploads = [
+            ('Attendance_Report_ID', "Attendance Report", attendance_report),
+            ('Feedback_Analysis_ID', "Feedback Analysis Report", feedback_analysis),
+            ('Event_Agenda_ID', "Event Agenda", event_agenda),
+            ('Chief_Guest_Biodata_ID', "Chief Guest Biodata", chief_guest_biodata),
+            ('Permission_SOP_ID', "Permission SOP", permission_sop),
+            ('Invitation_Brochure_ID', "Invitation/Brochure", invitation_brochure),
+            ('Other_Documents_ID', "Other Documents", other_documents),
+        ]
+        preflight = {}
+        for field, label, uploaded_file in document_uploads:
+            if not uploaded_file or len(uploaded_file.getvalue()) > config.MAX_PDF_FILE_SIZE_MB * 1024 * 1024:
+                continue
+            start_preflight(field, uploaded_file)
+            result = preflight_result(field, timeout=config.PREFLIGHT_TIMEOUT)
+            if result is None:
+                errors.append(f"{label} could not be checked in time - please try again")
+            elif result['error']:
+                errors.append(f"{label}: {result['error']}")
+            else:
+                preflight[field] = result
+
         if errors:
             for error in errors:
                 st.error(f"❌ {error}")
@@ -2966,317 +4066,145 @@ def create_event_form(sheets_client, drive_service):
                         config.DRIVE_FOLDER_ID if config.DRIVE_FOLDER_ID != "YOUR_DRIVE_FOLDER_ID_HERE" else None
                     )
 
+                # Uploaded files: (sheet column, uploader, file name prefix, kind)
+                # kind 'image' is always stored as JPEG, 'pdf' as PDF, 'any' by extension
+                upload_specs = [
+                    ('Geotag_Photo1_ID', geotag_photo1, 'geotag_photo1', 'image'),
+                    ('Geotag_Photo2_ID', geotag_photo2, 'geotag_photo2', 'image'),
+                    ('Geotag_Photo3_ID', geotag_photo3, 'geotag_photo3', 'image'),
+                    ('Normal_Photo1_ID', normal_photo1, 'normal_photo1', 'image'),
+                    ('Normal_Photo2_ID', normal_photo2, 'normal_photo2', 'image'),
+                    ('Normal_Photo3_ID', normal_photo3, 'normal_photo3', 'image'),
+                    ('Attendance_Report_ID', attendance_report, 'attendance_report', 'any'),
+                    ('Feedback_Analysis_ID', feedback_analysis, 'feedback_analysis', 'pdf'),
+                    ('Event_Agenda_ID', event_agenda, 'event_agenda', 'pdf'),
+                    ('Chief_Guest_Biodata_ID', chief_guest_biodata, 'chief_guest_biodata', 'pdf'),
+                    ('KPI_Report_ID', kpi_report, 'kpi_report', 'pdf'),  # Calendar Activity - legacy support
+                    ('Permission_SOP_ID', permission_sop, 'permission_sop', 'any'),
+                    ('Invitation_Brochure_ID', invitation_brochure, 'invitation_brochure', 'any'),
+                    ('Other_Documents_ID', other_documents, 'other_documents', 'any'),
+                ]
+
                 # Initialize file IDs - keep existing IDs if already uploaded
-                geotag_photo1_id = event_data.get('Geotag_Photo1_ID', '')
-                geotag_photo2_id = event_data.get('Geotag_Photo2_ID', '')
-                geotag_photo3_id = event_data.get('Geotag_Photo3_ID', '')
-                normal_photo1_id = event_data.get('Normal_Photo1_ID', '')
-                normal_photo2_id = event_data.get('Normal_Photo2_ID', '')
-                normal_photo3_id = event_data.get('Normal_Photo3_ID', '')
-                attendance_report_id = event_data.get('Attendance_Report_ID', '')
-                feedback_analysis_id = event_data.get('Feedback_Analysis_ID', '')
-                event_agenda_id = event_data.get('Event_Agenda_ID', '')
-                chief_guest_biodata_id = event_data.get('Chief_Guest_Biodata_ID', '')
-                permission_sop_id = event_data.get('Permission_SOP_ID', '')
-                invitation_brochure_id = event_data.get('Invitation_Brochure_ID', '')
-                other_documents_id = event_data.get('Other_Documents_ID', '')
+                file_ids = {field: event_data.get(field, '') for field, _, _, _ in upload_specs}
 
                 # Upload files to Drive - SMART UPLOAD: only upload NEW files
                 # If file already exists (has ID), keep it unless user provides a new file
-                with st.spinner("Uploading new files to Google Drive..."):
-                    upload_count = 0
-
-                    # Upload geotagged photos (only if NEW file provided by user)
-                    if geotag_photo1:
-                        new_id = drive_manager.upload_file(
-                            geotag_photo1.read(),
-                            f"geotag_photo1_{event_id}.jpg",
-                            folder_id,
-                            'image/jpeg'
-                        )
-                        if new_id:
-                            geotag_photo1_id = new_id
-                            upload_count += 1
-
-                    if geotag_photo2:
-                        new_id = drive_manager.upload_file(
-                            geotag_photo2.read(),
-                            f"geotag_photo2_{event_id}.jpg",
-                            folder_id,
-                            'image/jpeg'
-                        )
-                        if new_id:
-                            geotag_photo2_id = new_id
-                            upload_count += 1
-
-                    if geotag_photo3:
-                        new_id = drive_manager.upload_file(
-                            geotag_photo3.read(),
-                            f"geotag_photo3_{event_id}.jpg",
-                            folder_id,
-                            'image/jpeg'
-                        )
-                        if new_id:
-                            geotag_photo3_id = new_id
-                            upload_count += 1
-
-                    # Upload normal photos (only if NEW file provided)
-                    if normal_photo1:
-                        new_id = drive_manager.upload_file(
-                            normal_photo1.read(),
-                            f"normal_photo1_{event_id}.jpg",
-                            folder_id,
-                            'image/jpeg'
-                        )
-                        if new_id:
-                            normal_photo1_id = new_id
-                            upload_count += 1
-
-                    if normal_photo2:
-                        new_id = drive_manager.upload_file(
-                            normal_photo2.read(),
-                            f"normal_photo2_{event_id}.jpg",
-                            folder_id,
-                            'image/jpeg'
-                        )
-                        if new_id:
-                            normal_photo2_id = new_id
-                            upload_count += 1
-
-                    if normal_photo3:
-                        new_id = drive_manager.upload_file(
-                            normal_photo3.read(),
-                            f"normal_photo3_{event_id}.jpg",
-                            folder_id,
-                            'image/jpeg'
-                        )
-                        if new_id:
-                            normal_photo3_id = new_id
-                            upload_count += 1
-
-                    # Upload documents (only if NEW file provided)
-                    if attendance_report:
-                        file_ext = 'pdf' if attendance_report.name.endswith('.pdf') else 'jpg'
-                        mime_type = 'application/pdf' if file_ext == 'pdf' else 'image/jpeg'
-                        new_id = drive_manager.upload_file(
-                            attendance_report.read(),
-                            f"attendance_report_{event_id}.{file_ext}",
-                            folder_id,
-                            mime_type
-                        )
-                        if new_id:
-                            attendance_report_id = new_id
-                            upload_count += 1
-
-                    if feedback_analysis:
-                        new_id = drive_manager.upload_file(
-                            feedback_analysis.read(),
-                            f"feedback_analysis_{event_id}.pdf",
-                            folder_id,
-                            'application/pdf'
-                        )
-                        if new_id:
-                            feedback_analysis_id = new_id
-                            upload_count += 1
-
-                    if event_agenda:
-                        new_id = drive_manager.upload_file(
-                            event_agenda.read(),
-                            f"event_agenda_{event_id}.pdf",
-                            folder_id,
-                            'application/pdf'
-                        )
-                        if new_id:
-                            event_agenda_id = new_id
-                            upload_count += 1
-
-                    if chief_guest_biodata:
-                        new_id = drive_manager.upload_file(
-                            chief_guest_biodata.read(),
-                            f"chief_guest_biodata_{event_id}.pdf",
-                            folder_id,
-                            'application/pdf'
-                        )
-                        if new_id:
-                            chief_guest_biodata_id = new_id
-                            upload_count += 1
-
-                    # Upload KPI Report if provided (for Calendar Activity - legacy support)
-                    if kpi_report:
-                        new_id = drive_manager.upload_file(
-                            kpi_report.read(),
-                            f"kpi_report_{event_id}.pdf",
-                            folder_id,
-                            'application/pdf'
-                        )
-                        if new_id:
-                            kpi_report_id = new_id
-                            upload_count += 1
-
-                    # Upload Permission SOP with Principal Signature
-                    if permission_sop:
-                        file_ext = 'pdf' if permission_sop.name.endswith('.pdf') else 'jpg'
-                        mime_type = 'application/pdf' if file_ext == 'pdf' else 'image/jpeg'
-                        new_id = drive_manager.upload_file(
-                            permission_sop.read(),
-                            f"permission_sop_{event_id}.{file_ext}",
-                            folder_id,
-                            mime_type
-                        )
-                        if new_id:
-                            permission_sop_id = new_id
-                            upload_count += 1
-
-                    # Upload Invitation/Brochure
-                    if invitation_brochure:
-                        file_ext = 'pdf' if invitation_brochure.name.endswith('.pdf') else 'jpg'
-                        mime_type = 'application/pdf' if file_ext == 'pdf' else 'image/jpeg'
-                        new_id = drive_manager.upload_file(
-                            invitation_brochure.read(),
-                            f"invitation_brochure_{event_id}.{file_ext}",
-                            folder_id,
-                            mime_type
-                        )
-                        if new_id:
-                            invitation_brochure_id = new_id
-                            upload_count += 1
+                uploads = []
+                for field, uploaded_file, prefix, kind in upload_specs:
+                    if not uploaded_file:
+                        continue
+                    if kind == 'image':
+                        file_ext = 'jpg'
+                    elif kind == 'pdf':
+                        file_ext = 'pdf'
+                    else:
+                        file_ext = 'pdf' if uploaded_file.name.endswith('.pdf') else 'jpg'
+                    uploads.append({
+                        'key': field,
+                        # Documents are stored in their normalised, pre-flight checked form
+                        'data': preflight[field]['data'] if field in preflight else uploaded_file.getvalue(),
+                        'file_name': f"{prefix}_{event_id}.{file_ext}",
+                        'folder_id': folder_id,
+                        'mime_type': 'application/pdf' if file_ext == 'pdf' else 'image/jpeg',
+                    })
+
+                if uploads:
+                    with st.spinner(f"Uploading {len(uploads)} new file(s) to Google Drive..."):
+                        upload_progress = st.progress(0.0, text=f"Uploading {len(uploads)} file(s)...")
+
+                        def on_upload_done(item, file_ref, destination, error, completed, total):
+                            upload_progress.progress(completed / total, text=f"Uploaded {completed}/{total} file(s)")
+                            drive_manager.show_upload_result(item['file_name'], file_ref, destination, error)
+
+                        upload_results = drive_manager.upload_files(uploads, progress_callback=on_upload_done)
 
-                    # Upload Other Documents (UC/Bills)
-                    if other_documents:
-                        file_ext = 'pdf' if other_documents.name.endswith('.pdf') else 'jpg'
-                        mime_type = 'application/pdf' if file_ext == 'pdf' else 'image/jpeg'
-                        new_id = drive_manager.upload_file(
-                            other_documents.read(),
-                            f"other_documents_{event_id}.{file_ext}",
-                            folder_id,
-                            mime_type
-                        )
+                    upload_count = 0
+                    upload_data = {item['key']: item['data'] for item in uploads}
+                    for field, (new_id, _) in upload_results.items():
                         if new_id:
-                            other_documents_id = new_id
+                            file_ids[field] = new_id
                             upload_count += 1
+                            # Report merges can then use the checked file without re-inspecting it
+                            if field in preflight and not str(new_id).startswith(('LOCAL:', 'http')):
+                                drive_manager.remember_upload(new_id, upload_data[field], {
+                                    'kind': preflight[field]['kind'],
+                                    'pages': preflight[field]['pages'],
+                                })
+                    st.session_state.pop('upload_preflight', None)
 
                     if upload_count > 0:
                         st.success(f"Uploaded {upload_count} new file(s)")
 
+                geotag_photo1_id = file_ids['Geotag_Photo1_ID']
+                geotag_photo2_id = file_ids['Geotag_Photo2_ID']
+                geotag_photo3_id = file_ids['Geotag_Photo3_ID']
+                normal_photo1_id = file_ids['Normal_Photo1_ID']
+                normal_photo2_id = file_ids['Normal_Photo2_ID']
+                normal_photo3_id = file_ids['Normal_Photo3_ID']
+                attendance_report_id = file_ids['Attendance_Report_ID']
+                feedback_analysis_id = file_ids['Feedback_Analysis_ID']
+                event_agenda_id = file_ids['Event_Agenda_ID']
+                chief_guest_biodata_id = file_ids['Chief_Guest_Biodata_ID']
+                kpi_report_id = file_ids['KPI_Report_ID']
+                permission_sop_id = file_ids['Permission_SOP_ID']
+                invitation_brochure_id = file_ids['Invitation_Brochure_ID']
+                other_documents_id = file_ids['Other_Documents_ID']
+
                 # Generate PDF Report after save (only if not already generated OR if regenerate is requested)
                 pdf_report_id = event_data.get('Generated_PDF_ID', '')
+                pdf_job_payload = None
                 if not pdf_report_id or regenerate_pdf:
-                    spinner_message = "Regenerating PDF report with new template..." if regenerate_pdf else "Generating PDF report..."
-                    with st.spinner(spinner_message):
-                        try:
-                            from pdf_generator import IICReportGenerator
-                            from io import BytesIO
-
-                            # Debug: show what document IDs we have
-                            st.info(f"Merging documents: Attendance={bool(attendance_report_id)}, Feedback={bool(feedback_analysis_id)}, Agenda={bool(event_agenda_id)}, Biodata={bool(chief_guest_biodata_id)}, KPI={bool(kpi_report_id)}")
-
-                            # Prepare data for PDF with all fields
-                            pdf_event_data = {
-                                'Event ID': event_id,
-                                'Program Name': event_name,
-                                'Academic Year': academic_year,
-                                'Quarter': quarter,
-                                'Program Driven By': program_driven_by,
-                                'Activity Led By': activity_led_by,
-                                'Organizing Departments': ','.join(organizing_departments) if organizing_departments else '',
-                                'Professional Society Club': professional_society_club,
-                                'SDG Goals': ','.join(sdg_goals) if sdg_goals else '',
-                                'Program Outcomes': ','.join(program_outcomes) if program_outcomes else '',
-                                'Program Type': program_type,
-                                'Program Theme': program_theme,
-                                'Objective': objective,
-                                'Benefits': benefits,
-                                'Brief Report': brief_report,
-                                'Start Date': start_date.strftime('%Y-%m-%d'),
-                                'End Date': end_date.strftime('%Y-%m-%d'),
-                                'Duration (Hrs)': duration,
-                                'Event Level': level_number,
-                                'Mode of Delivery': mode_delivery,
-                                'Student Participants': student_participants,
-                                'Faculty Participants': faculty_participants,
-                                'External Participants': external_participants,
-                                'Expenditure Amount': expenditure,
-                                'Remark': remark or 'N/A',
-                                'Video URL': video_url or 'N/A',
-                                # Photo IDs
-                                'Geotag_Photo1_ID': geotag_photo1_id,
-                                'Geotag_Photo2_ID': geotag_photo2_id,
-                                'Geotag_Photo3_ID': geotag_photo3_id,
-                                'Normal_Photo1_ID': normal_photo1_id,
-                                'Normal_Photo2_ID': normal_photo2_id,
-                                'Normal_Photo3_ID': normal_photo3_id,
-                                # Document IDs
-                                'Attendance_Report_ID': attendance_report_id,
-                                'Feedback_Analysis_ID': feedback_analysis_id,
-                                'Event_Agenda_ID': event_agenda_id,
-                                'Chief_Guest_Biodata_ID': chief_guest_biodata_id,
-                                'KPI_Report_ID': kpi_report_id or ''
-                            }
-
-                            # Generate PDF with drive_manager for embedding photos
-                            pdf_buffer = BytesIO()
-
-                            # Show which documents will be merged
-                            doc_info = []
-                            if attendance_report_id:
-                                doc_info.append(f"Attendance: {str(attendance_report_id)[:40]}")
-                            if feedback_analysis_id:
-                                doc_info.append(f"Feedback: {str(feedback_analysis_id)[:40]}")
-                            if event_agenda_id:
-                                doc_info.append(f"Agenda: {str(event_agenda_id)[:40]}")
-                            if chief_guest_biodata_id:
-                                doc_info.append(f"Biodata: {str(chief_guest_biodata_id)[:40]}")
-                            if kpi_report_id:
-                                doc_info.append(f"KPI: {str(kpi_report_id)[:40]}")
-
-                            if doc_info:
-                                st.info(f"Documents to merge: {len(doc_info)} files")
-                                for d in doc_info:
-                                    st.caption(d)
-                            else:
-                                st.warning("No document IDs found to merge")
-
-                            generator = IICReportGenerator(pdf_event_data, logo_path="logos", drive_manager=drive_manager)
-
-                            # TEST: Try downloading one file to check if it works
-                            test_file_id = attendance_report_id or feedback_analysis_id or event_agenda_id
-                            if test_file_id:
-                                st.info(f"Testing download of: {test_file_id}")
-                                test_content = drive_manager.download_file(test_file_id)
-                                if test_content:
-                                    st.success(f"Download SUCCESS: {len(test_content)} bytes")
-                                else:
-                                    st.error(f"Download FAILED: {drive_manager.last_download_error}")
-
-                            generator.generate_pdf(pdf_buffer)
-
-                            # Show merge status - ALWAYS show to debug
-                            st.markdown("---")
-                            st.markdown("### PDF Merge Status:")
-                            if hasattr(generator, 'merge_status') and generator.merge_status:
-                                for status in generator.merge_status:
-                                    if "MERGED" in status or "TOTAL" in status:
-                                        st.success(status)
-                                    elif "FAILED" in status or "ERROR" in status:
-                                        st.error(status)
-                                    elif "SKIPPED" in status:
-                                        st.warning(status)
-                                    else:
-                                        st.info(status)
-                            else:
-                                st.error("No merge status available - merge may have been skipped")
-
-                            # Upload PDF to Drive
-                            pdf_buffer.seek(0)
-                            pdf_report_id = drive_manager.upload_file(
-                                pdf_buffer.read(),
-                                f"IICReport_{event_id}-IC201912089.pdf",
-                                folder_id,
-                                'application/pdf'
-                            )
-                        except Exception as pdf_error:
-                            st.warning(f"PDF generation skipped: {str(pdf_error)}")
-                            pdf_report_id = ''
+                    # Prepare data for PDF with all fields
+                    pdf_event_data = {
+                        'Event ID': event_id,
+                        'Program Name': event_name,
+                        'Academic Year': academic_year,
+                        'Quarter': quarter,
+                        'Program Driven By': program_driven_by,
+                        'Activity Led By': activity_led_by,
+                        'Organizing Departments': ','.join(organizing_departments) if organizing_departments else '',
+                        'Professional Society Club': professional_society_club,
+                        'SDG Goals': ','.join(sdg_goals) if sdg_goals else '',
+                        'Program Outcomes': ','.join(program_outcomes) if program_outcomes else '',
+                        'Program Type': program_type,
+                        'Program Theme': program_theme,
+                        'Objective': objective,
+                        'Benefits': benefits,
+                        'Brief Report': brief_report,
+                        'Start Date': start_date.strftime('%Y-%m-%d'),
+                        'End Date': end_date.strftime('%Y-%m-%d'),
+                        'Duration (Hrs)': duration,
+                        'Event Level': level_number,
+                        'Mode of Delivery': mode_delivery,
+                        'Student Participants': student_participants,
+                        'Faculty Participants': faculty_participants,
+                        'External Participants': external_participants,
+                        'Expenditure Amount': expenditure,
+                        'Remark': remark or 'N/A',
+                        'Video URL': session_video_url or 'N/A',
+                        # Photo IDs
+                        'Geotag_Photo1_ID': geotag_photo1_id,
+                        'Geotag_Photo2_ID': geotag_photo2_id,
+                        'Geotag_Photo3_ID': geotag_photo3_id,
+                        'Normal_Photo1_ID': normal_photo1_id,
+                        'Normal_Photo2_ID': normal_photo2_id,
+                        'Normal_Photo3_ID': normal_photo3_id,
+                        # Document IDs
+                        'Attendance_Report_ID': attendance_report_id,
+                        'Feedback_Analysis_ID': feedback_analysis_id,
+                        'Event_Agenda_ID': event_agenda_id,
+                        'Chief_Guest_Biodata_ID': chief_guest_biodata_id,
+                        'KPI_Report_ID': kpi_report_id or ''
+                    }
+
+                    # Rendered and uploaded in the background once the event is saved
+                    pdf_job_payload = {
+                        'event_data': pdf_event_data,
+                        'folder_id': folder_id,
+                        'file_name': f"IICReport_{event_id}-IC201912089.pdf",
+                        'current_pdf_id': pdf_report_id,
+                    }
 
                 # Prepare event data
                 now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -3345,11 +4273,12 @@ def create_event_form(sheets_client, drive_service):
                 if success:
                     st.success(f"✅ Event {'updated' if st.session_state.edit_mode else 'created'} and {'submitted' if submit_event else 'saved as draft'} successfully!")
 
-                    # Show PDF regeneration message if applicable
-                    if regenerate_pdf and pdf_report_id:
-                        st.success("📄 PDF report regenerated with new professional template including all logos and embedded photos!")
-                    elif pdf_report_id and not regenerate_pdf:
-                        st.success("📄 PDF report generated and uploaded to Google Drive!")
+                    # Queue the report now that the row exists for the job to attach its PDF ID to
+                    if pdf_job_payload:
+                        job = get_report_jobs().submit('upload', event_id, pdf_job_payload)
+                        track_report_job(job)
+                        st.info("📄 The PDF report is being generated in the background and will be attached to this event when ready.")
+                        show_report_job_status(job['id'])
 
                     st.balloons()
 
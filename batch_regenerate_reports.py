@@ -0,0 +1,324 @@
+"""
+Script to regenerate the PDF reports for many events at once.
+Run this locally after a report template change instead of clicking
+"Regen PDF" for every event in the admin panel.
+
+Examples:
+    python batch_regenerate_reports.py --year 2025-26 --quarter "Quarter 1"
+    python batch_regenerate_reports.py --approval Approved --workers 4
+    python batch_regenerate_reports.py --year 2025-26 --dry-run
+
+Reports are rendered in parallel worker processes and uploaded to each
+event's Drive folder. Progress is appended to a JSONL file, so an
+interrupted run can simply be started again with the same arguments; the
+new Generated_PDF_IDs are written back to the sheet in one batched update.
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import gspread
+from google.oauth2.service_account import Credentials
+from googleapiclient.http import MediaIoBaseDownload
+
+import config
+from http_transport import GoogleTransport
+from pdf_generator import IICReportGenerator, report_event_data
+
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+OUTPUT_DIR = "batch_reports"
+
+
+def get_credentials():
+    """Get credentials from local file"""
+    if os.path.exists(config.CREDENTIALS_FILE):
+        try:
+            creds = Credentials.from_service_account_file(
+                config.CREDENTIALS_FILE,
+                scopes=SCOPES
+            )
+            return creds
+        except Exception as e:
+            print(f"Service account failed: {e}")
+
+    # Try OAuth token.pickle
+    if os.path.exists('token.pickle'):
+        import pickle
+        with open('token.pickle', 'rb') as token:
+            creds = pickle.load(token)
+            return creds
+
+    return None
+
+
+class DriveDownloader:
+    """Minimal drive_manager for IICReportGenerator outside the Streamlit app.
+
+    Keeps one pooled Drive service per thread (see http_transport), since
+    the report generator prefetches files on a thread pool and httplib2 is
+    not thread-safe.
+    """
+
+    def __init__(self, credentials):
+        self.transport = GoogleTransport(credentials)
+        self._local = threading.local()
+
+    def service(self):
+        return self.transport.drive_service()
+
+    @property
+    def last_download_error(self):
+        return getattr(self._local, 'last_download_error', None)
+
+    @staticmethod
+    def file_id(file_id_or_url):
+        """Plain Drive file ID from an ID or a Drive sharing URL"""
+        file_id = str(file_id_or_url).strip()
+        for pattern in (r'/file/d/([a-zA-Z0-9_-]+)', r'/d/([a-zA-Z0-9_-]+)', r'id=([a-zA-Z0-9_-]+)'):
+            match = re.search(pattern, file_id)
+            if match:
+                return match.group(1)
+        return file_id
+
+    def file_revision(self, file_id):
+        try:
+            meta = self.service().files().get(
+                fileId=self.file_id(file_id),
+                fields='md5Checksum, modifiedTime',
+                supportsAllDrives=True
+            ).execute()
+            return meta.get('md5Checksum') or meta.get('modifiedTime')
+        except Exception:
+            return None
+
+    def download_file(self, file_id_or_url):
+        from io import BytesIO
+
+        self._local.last_download_error = None
+        try:
+            request = self.service().files().get_media(fileId=self.file_id(file_id_or_url))
+            file_data = BytesIO()
+            downloader = MediaIoBaseDownload(file_data, request)
+            done = False
+            while not done:
+                _, done = downloader.next_chunk()
+            return file_data.getvalue() or None
+        except Exception as e:
+            self._local.last_download_error = str(e)[:100]
+            return None
+
+
+# Set up once in each worker process by _init_worker
+_drive = None
+
+
+def _init_worker():
+    global _drive
+    _drive = DriveDownloader(get_credentials())
+
+
+def folder_id_for(event):
+    """Event's Drive folder (from its folder URL) or the portal's root folder, None if neither is set"""
+    match = re.search(r'folders/([a-zA-Z0-9_-]+)', event.get('Drive Folder URL', ''))
+    if match:
+        return match.group(1)
+    if config.DRIVE_FOLDER_ID and config.DRIVE_FOLDER_ID != "YOUR_DRIVE_FOLDER_ID_HERE":
+        return config.DRIVE_FOLDER_ID
+    return None
+
+
+def render_report(event, output_dir, upload):
+    """Render (and optionally upload) one event's report in a worker process"""
+    event_id = event['Event ID']
+    file_name = f"IICReport_{event_id}-IC201912089.pdf"
+    path = os.path.join(output_dir, file_name)
+    record = {'event_id': event_id, 'path': path, 'pdf_id': None, 'error': None}
+
+    try:
+        generator = IICReportGenerator(report_event_data(event), logo_path="logos", drive_manager=_drive)
+        generator.generate_pdf(path)
+        failures = [status for status in generator.merge_status if 'FAILED' in status or 'ERROR' in status]
+        if failures:
+            record['warnings'] = failures
+
+        if upload:
+            import oauth_drive
+            with open(path, 'rb') as f:
+                record['pdf_id'], error = oauth_drive.upload_to_drive_oauth(
+                    _drive.service(), f, file_name, folder_id_for(event)
+                )
+            if not record['pdf_id']:
+                record['error'] = error or "Upload failed"
+    except Exception as e:
+        record['error'] = str(e)[:200]
+
+    return record
+
+
+def load_progress(path):
+    """{event_id: last record} from a progress file"""
+    progress = {}
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # partially written last line
+                progress[record['event_id']] = record
+    return progress
+
+
+def select_events(events, args):
+    selected = []
+    for event in events:
+        if not event.get('Event ID'):
+            continue
+        if args.year and event.get('Academic Year') != args.year:
+            continue
+        if args.quarter and event.get('Quarter') != args.quarter:
+            continue
+        if args.status and event.get('Status') != args.status:
+            continue
+        if args.approval and event.get('Admin_Approval_Status') != args.approval:
+            continue
+        selected.append(event)
+    return selected
+
+
+def write_back(events_sheet, selected, progress):
+    """Write new Generated_PDF_IDs for the selected events in one batch update.
+
+    Rows may have been added or removed while the reports were rendering (or
+    since an earlier, resumed run), so the header row and Event ID column are
+    read again here and each event is written to the row that holds it now.
+    """
+    headers = events_sheet.row_values(1)
+    column = headers.index('Generated_PDF_ID') + 1
+    rows = {}
+    for row_number, event_id in enumerate(events_sheet.col_values(headers.index('Event ID') + 1)[1:], start=2):
+        rows.setdefault(event_id, row_number)
+    data = []
+    for event in selected:
+        record = progress.get(event['Event ID'])
+        if record and record.get('pdf_id') and record['pdf_id'] != event.get('Generated_PDF_ID'):
+            if event['Event ID'] not in rows:
+                print(f"[WARN] {event['Event ID']} is no longer in the sheet - {record['pdf_id']} not recorded")
+                continue
+            data.append({
+                'range': gspread.utils.rowcol_to_a1(rows[event['Event ID']], column),
+                'values': [[record['pdf_id']]],
+            })
+    if data:
+        events_sheet.batch_update(data, value_input_option='USER_ENTERED')
+    return len(data)
+
+
+def regenerate_reports(args):
+    print("Getting credentials...")
+    creds = get_credentials()
+    if not creds:
+        print("[ERROR] No credentials found!")
+        print("Please ensure you have either:")
+        print(f"  - {config.CREDENTIALS_FILE} (service account)")
+        print("  - token.pickle (OAuth token)")
+        return False
+    print("[OK] Credentials loaded")
+
+    # Read the Events sheet once
+    client = gspread.authorize(creds)
+    events_sheet = client.open_by_key(config.SPREADSHEET_ID).worksheet('Events')
+    values = events_sheet.get_all_values()
+    if not values:
+        print("[ERROR] Events sheet is empty!")
+        return False
+    headers = values[0]
+    if 'Generated_PDF_ID' not in headers:
+        print("[ERROR] Events sheet has no Generated_PDF_ID column - run update_headers.py first")
+        return False
+
+    events = [dict(zip(headers, row + [''] * (len(headers) - len(row)))) for row in values[1:]]
+
+    selected = select_events(events, args)
+    print(f"[OK] {len(selected)} of {len(events)} events selected")
+    if args.dry_run:
+        for event in selected:
+            print(f"  {event['Event ID']}: {event.get('Program Name', '')}")
+        return True
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    progress_path = args.progress or os.path.join(args.output_dir, 'progress.jsonl')
+    progress = load_progress(progress_path)
+    upload = not args.no_upload
+
+    def is_done(record):
+        return bool(record) and not record.get('error') and (record.get('pdf_id') or not upload)
+
+    pending = [event for event in selected if not is_done(progress.get(event['Event ID']))]
+    print(f"[OK] {len(selected) - len(pending)} already done (from {progress_path}), {len(pending)} to render")
+
+    if upload:
+        homeless = [event['Event ID'] for event in pending if not folder_id_for(event)]
+        if homeless:
+            print(f"[ERROR] {len(homeless)} events have no Drive Folder URL and config.DRIVE_FOLDER_ID is not set")
+            print("Set DRIVE_FOLDER_ID in config.py or run with --no-upload")
+            return False
+
+    completed = 0
+    failed = 0
+    with open(progress_path, 'a') as progress_file:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(render_report, event, args.output_dir, upload) for event in pending]
+            for future in as_completed(futures):
+                record = future.result()
+                progress[record['event_id']] = record
+                progress_file.write(json.dumps(record) + "\n")
+                progress_file.flush()
+
+                completed += 1
+                if record['error']:
+                    failed += 1
+                    print(f"[ERROR] {completed}/{len(pending)} {record['event_id']}: {record['error']}")
+                else:
+                    print(f"[OK] {completed}/{len(pending)} {record['event_id']} {record['pdf_id'] or record['path']}")
+                for warning in record.get('warnings', []):
+                    print(f"    {warning}")
+
+    if upload:
+        written = write_back(events_sheet, selected, progress)
+        print(f"[OK] Updated Generated_PDF_ID for {written} events")
+
+    print("\n" + "="*50)
+    print(f"[{'DONE' if not failed else 'DONE WITH ERRORS'}] {completed - failed} rendered, {failed} failed")
+    print("="*50)
+    return not failed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate IIC event PDF reports in bulk")
+    parser.add_argument('--year', help="Academic Year to select, e.g. 2025-26")
+    parser.add_argument('--quarter', help="Quarter to select, exactly as stored in the sheet")
+    parser.add_argument('--status', help="Event Status to select (Submitted/Draft)")
+    parser.add_argument('--approval', help="Admin_Approval_Status to select (Pending/Approved/Rejected)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes (default: CPU count)")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Where rendered PDFs are written")
+    parser.add_argument('--progress', help="Progress file (default: <output-dir>/progress.jsonl)")
+    parser.add_argument('--no-upload', action='store_true', help="Only render PDFs locally")
+    parser.add_argument('--dry-run', action='store_true', help="List the selected events and exit")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    print("="*50)
+    print("Batch Report Regeneration")
+    print("="*50)
+    print()
+    regenerate_reports(parse_args())
@@ -154,3 +154,93 @@ PROGRAM_OUTCOMES = [
     "PO10: Project Management and Finance",
     "PO11: Life-Long Learning"
 ]
+
+# Google Sheets Caching
+# How long (seconds) spreadsheet/worksheet handles are reused before reopening
+SHEETS_HANDLE_CACHE_TTL = 600
+# How long (seconds) the in-memory Events table snapshot is served before reloading
+EVENTS_CACHE_TTL = 60
+# How long (seconds) the in-memory Users directory is served before reloading
+USERS_CACHE_TTL = 300
+# Last Login stamps are buffered and written in one batched update this often (seconds)
+LAST_LOGIN_FLUSH_SECONDS = 30
+
+# Google Drive Uploads
+# Maximum number of files uploaded to Drive at the same time
+DRIVE_UPLOAD_WORKERS = 4
+
+# PDF Report Generation
+# Annexure photos/documents are downloaded concurrently before the report is built
+PDF_PREFETCH_WORKERS = 6
+PDF_PREFETCH_TIMEOUT = 60  # seconds each download may take before it is reported as failed
+# Report buffers are kept in memory up to this size, then spooled to a temp file
+PDF_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+# Google Drive Download Cache
+# Downloaded files are kept on local disk and revalidated against Drive's checksum
+# The directory must not be shared by several app processes (the index is not locked)
+DRIVE_CACHE_DIR = ".drive_cache"
+DRIVE_CACHE_MAX_MB = 500
+# Header logos are pre-scaled once per process to this resolution
+PDF_LOGO_DPI = 200
+# Uploaded photos are downscaled to this resolution and re-encoded before embedding
+PDF_PHOTO_DPI = 150
+PDF_PHOTO_JPEG_QUALITY = 80
+
+# Rendered Report Cache
+# Unchanged reports are served from here instead of being rebuilt
+REPORT_CACHE_DIR = ".report_cache"
+REPORT_CACHE_MAX_MB = 500
+
+# Background Report Jobs
+# PDF generation/merging runs on this many worker threads outside the UI
+REPORT_JOBS_DIR = ".report_jobs"
+REPORT_JOB_WORKERS = 2
+REPORT_JOB_POLL_SECONDS = 3  # how often the UI refreshes a job's status
+REPORT_JOB_RETENTION_HOURS = 24
+
+# PDF Merge Backend
+# "auto" merges with pikepdf when it is installed and falls back to PyPDF2
+PDF_MERGE_BACKEND = "auto"  # "auto", "pikepdf" or "pypdf2"
+PDF_MERGE_DEDUPE = True  # store identical images/fonts once in the merged file (pikepdf only)
+PDF_MERGE_COMPRESS = True  # compress streams and pack objects into object streams (pikepdf only)
+
+# Uploaded Document Pre-flight
+# Documents are checked and normalised on worker threads as soon as they are uploaded
+PREFLIGHT_WORKERS = 2
+PREFLIGHT_POLL_SECONDS = 1  # how often the form refreshes a running check
+PREFLIGHT_TIMEOUT = 60  # seconds a submission waits for unfinished checks
+UPLOAD_PDF_MAX_PAGES = 200
+UPLOAD_PDF_MAX_PAGE_POINTS = 1191  # longer page side; bigger pages (larger than A3) are scaled to A4
+
+# Shared HTTP Transport
+# Keep-alive connection pools shared by Sheets, Drive and other web requests
+HTTP_POOL_CONNECTIONS = 10  # hosts kept in the pool
+HTTP_POOL_MAXSIZE = 16  # open connections kept per host (at least the upload/prefetch worker count)
+HTTP_TIMEOUT = 60  # seconds
+
+# Google API Retries and Rate Limits
+# 429/5xx responses and dropped connections are retried with jittered exponential backoff
+API_RETRY_MAX_ATTEMPTS = 6
+API_RETRY_BASE_SECONDS = 1
+API_RETRY_MAX_DELAY_SECONDS = 32
+API_RETRY_DEADLINE_SECONDS = 120  # give up on a request after this long, including waits
+# Client-side request rates, kept under the per-user API quotas
+SHEETS_REQUESTS_PER_MINUTE = 60
+SHEETS_REQUEST_BURST = 10
+DRIVE_REQUESTS_PER_MINUTE = 600
+DRIVE_REQUEST_BURST = 50
+
+# Sheets Write Scheduler
+# All spreadsheet writes are queued and sent no faster than the write quota allows
+SHEETS_WRITES_PER_MINUTE = 60  # Sheets API write requests per minute per user
+SHEETS_WRITE_BURST = 5
+SHEETS_WRITE_BATCH_ROWS = 50  # queued rows of the same kind sent in one request
+
+# Event Journal
+# Event saves are committed to a local SQLite journal and copied to the sheet in the background
+EVENT_JOURNAL_DIR = ".event_journal"
+EVENT_JOURNAL_BATCH = 50  # events replicated per batch
+EVENT_JOURNAL_INTERVAL_SECONDS = 2  # saves arriving within this window are replicated together
+EVENT_JOURNAL_RETRY_SECONDS = 30  # wait before retrying a batch that failed
+EVENT_JOURNAL_RETENTION_DAYS = 30  # replicated entries are kept this long as an audit trail
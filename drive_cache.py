@@ -0,0 +1,169 @@
+"""
+Local disk cache for Google Drive downloads
+Stores file contents by SHA-256 so identical uploads share one blob on disk.
+Entries are keyed by Drive file ID and revalidated against the file's
+md5Checksum / modifiedTime, so a replaced file is never served stale.
+The index is held in memory and rewritten without a cross-process lock, so a
+cache directory must only be used by one process at a time.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class DriveFileCache:
+    """Size-bounded LRU cache of Drive file bytes on local disk.
+
+    Thread-safe within one process; give each process its own root.
+    """
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.index_path = os.path.join(root, self.INDEX_FILE)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        """Read the file ID index, dropping entries whose blob is gone"""
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {
+            file_id: entry for file_id, entry in index.items()
+            if os.path.exists(self._blob_path(entry['sha256']))
+        }
+
+    def _save_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest)
+
+    @staticmethod
+    def _matches(entry, meta):
+        """True if the cached entry is the same revision as the Drive metadata"""
+        if meta.get('md5Checksum'):
+            return entry.get('md5Checksum') == meta['md5Checksum']
+        if meta.get('modifiedTime'):
+            return entry.get('modifiedTime') == meta['modifiedTime']
+        return False
+
+    def get(self, file_id, meta):
+        """Return cached bytes for file_id if still current per meta, else None.
+
+        meta may be a function returning the metadata; it is only called when
+        file_id has an entry, so a plain miss costs no Drive request.
+        """
+        if callable(meta):
+            with self._lock:
+                if file_id not in self._index:
+                    self.misses += 1
+                    return None
+            meta = meta()
+        with self._lock:
+            entry = self._index.get(file_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            if not self._matches(entry, meta):
+                self.stale += 1
+                self.misses += 1
+                self._drop(file_id)
+                self._save_index()
+                return None
+            try:
+                with open(self._blob_path(entry['sha256']), 'rb') as f:
+                    data = f.read()
+            except OSError:
+                self.misses += 1
+                self._drop(file_id)
+                self._save_index()
+                return None
+            entry['last_access'] = time.time()
+            self.hits += 1
+            return data
+
+    def put(self, file_id, meta, data, info=None):
+        """Store data for file_id, evicting least recently used entries if needed.
+
+        info is an optional JSON-serialisable dict kept with the entry (see info()).
+        """
+        if not data or len(data) > self.max_bytes:
+            return
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            path = self._blob_path(digest)
+            if not os.path.exists(path):
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            self._drop(file_id)
+            self._index[file_id] = {
+                'sha256': digest,
+                'size': len(data),
+                'md5Checksum': meta.get('md5Checksum'),
+                'modifiedTime': meta.get('modifiedTime'),
+                'last_access': time.time(),
+                'info': info,
+            }
+            self._evict()
+            self._save_index()
+
+    def info(self, file_id):
+        """The info dict stored with file_id's current entry, or None"""
+        with self._lock:
+            entry = self._index.get(file_id)
+            return entry.get('info') if entry else None
+
+    def _drop(self, file_id):
+        """Remove an index entry and its blob if no other entry shares it"""
+        entry = self._index.pop(file_id, None)
+        if entry is None:
+            return
+        if any(e['sha256'] == entry['sha256'] for e in self._index.values()):
+            return
+        try:
+            os.remove(self._blob_path(entry['sha256']))
+        except OSError:
+            pass
+
+    def _evict(self):
+        blob_sizes = {e['sha256']: e['size'] for e in self._index.values()}
+        total = sum(blob_sizes.values())
+        by_age = sorted(self._index.items(), key=lambda item: item[1]['last_access'])
+        for file_id, entry in by_age:
+            if total <= self.max_bytes:
+                break
+            digest = entry['sha256']
+            self._drop(file_id)
+            if not any(e['sha256'] == digest for e in self._index.values()):
+                total -= blob_sizes[digest]
+
+    def stats(self):
+        """Hit/miss counters and current disk usage"""
+        with self._lock:
+            sizes = {e['sha256']: e['size'] for e in self._index.values()}
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'entries': len(self._index),
+                'bytes': sum(sizes.values()),
+            }
@@ -0,0 +1,132 @@
+"""
+Append-only journal of event saves in front of Google Sheets
+A save is acknowledged as soon as it is committed to a local SQLite database
+(WAL mode, synced on every commit), so a submission neither waits on Sheets
+nor is lost when Sheets fails after its documents were uploaded. A background
+replicator pushes the latest entry of each event into the Events sheet in
+batches; writes are keyed by Event ID, so replaying an entry is harmless.
+Entries still unreplicated when the process stops are replayed on start.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class EventJournal:
+    """Durable log of {Event ID: row} saves, with None recording a deletion.
+
+    replicate(batch) runs on the replicator thread with {event_id: row or
+    None} for the latest unreplicated entry of up to batch_size events. It
+    must be idempotent per Event ID; raising leaves the whole batch pending
+    and it is retried after retry_delay seconds.
+    """
+
+    DB_FILE = 'events.sqlite3'
+
+    def __init__(self, root, replicate, batch_size, interval, retry_delay, retention):
+        self.replicate = replicate
+        self.batch_size = batch_size
+        self.interval = interval
+        self.retry_delay = retry_delay
+        self.last_error = None
+        self._cond = threading.Condition(threading.RLock())
+        self._pending = {}  # event_id -> (seq, row) of its latest unreplicated entry
+        self._thread = None
+        os.makedirs(root, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, self.DB_FILE), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=FULL')
+        with self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'seq INTEGER PRIMARY KEY AUTOINCREMENT, event_id TEXT NOT NULL, '
+                'row TEXT, created REAL NOT NULL, replicated REAL)'
+            )
+            # Replicated entries are kept for a while as an audit trail
+            self._db.execute('DELETE FROM entries WHERE replicated < ?', (time.time() - retention,))
+        self._load()
+
+    def _load(self):
+        """Queue the entries a previous process did not get to replicate"""
+        cursor = self._db.execute('SELECT seq, event_id, row FROM entries WHERE replicated IS NULL ORDER BY seq')
+        for seq, event_id, row in cursor:
+            self._pending[event_id] = (seq, None if row is None else json.loads(row))
+        if self._pending:
+            self._start()
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='event-journal', daemon=True)
+            self._thread.start()
+
+    def append(self, event_id, row):
+        """Durably record a save of row (None to delete) and return its sequence number"""
+        data = None if row is None else json.dumps(row, default=str)
+        with self._cond:
+            with self._db:
+                seq = self._db.execute(
+                    'INSERT INTO entries (event_id, row, created) VALUES (?, ?, ?)',
+                    (event_id, data, time.time())
+                ).lastrowid
+            self._pending[event_id] = (seq, None if row is None else json.loads(data))
+            self._start()
+            self._cond.notify()
+        return seq
+
+    def update(self, event_id, fields):
+        """Fold fields into the event's unreplicated save, if it has one.
+
+        The merged row is appended as a new entry under the journal's lock, so
+        a concurrent save of the same event cannot be overwritten by an older
+        row. Returns False (and records nothing) when no save is pending.
+        """
+        with self._cond:
+            _, row = self._pending.get(event_id, (None, None))
+            if row is None:
+                return False
+            self.append(event_id, dict(row, **fields))
+            return True
+
+    def pending(self):
+        """{event_id: row or None} for saves not yet in the sheet (rows are copies)"""
+        with self._cond:
+            return {event_id: None if row is None else dict(row)
+                    for event_id, (_, row) in self._pending.items()}
+
+    def _mark_replicated(self, batch):
+        now = time.time()
+        with self._cond:
+            with self._db:
+                self._db.executemany(
+                    'UPDATE entries SET replicated = ? WHERE event_id = ? AND seq <= ? AND replicated IS NULL',
+                    [(now, event_id, seq) for event_id, (seq, _) in batch.items()]
+                )
+            for event_id, (seq, _) in batch.items():
+                # A newer save that arrived meanwhile stays pending
+                if self._pending.get(event_id, (None,))[0] == seq:
+                    del self._pending[event_id]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # Let a burst of saves go out together
+            time.sleep(self.interval)
+            with self._cond:
+                batch = dict(list(self._pending.items())[:self.batch_size])
+            try:
+                self.replicate({event_id: row for event_id, (_, row) in batch.items()})
+            except Exception as e:
+                logger.exception("Replicating journaled event saves failed")
+                self.last_error = str(e)[:200]
+                time.sleep(self.retry_delay)
+                continue
+            self.last_error = None
+            self._mark_replicated(batch)
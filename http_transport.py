@@ -0,0 +1,180 @@
+"""
+Shared, pooled HTTP transport for Google APIs and other web calls
+Sheets (gspread) and plain web requests (public Drive downloads, ImgBB)
+go through requests sessions with keep-alive connection pools, so the TLS
+handshake is paid once per connection rather than once per call. Drive
+uses googleapiclient, whose httplib2 transport is not thread-safe, so each
+thread gets one long-lived service and keeps its connections open between
+calls. Requests and newly opened connections are counted per channel.
+Sheets and Drive requests are rate limited and retried by api_retry.
+"""
+
+import threading
+
+import httplib2
+import requests
+from google.auth.transport.requests import AuthorizedSession
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import config
+from api_retry import IDEMPOTENT_METHODS, buckets, policy, retry_after_seconds
+
+
+class TransportStats:
+    """Request and new-connection counters per channel ('sheets', 'drive', 'web')"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, channel, requests_made=1, connections_opened=0):
+        with self._lock:
+            counts = self._counts.setdefault(channel, {'requests': 0, 'connections': 0})
+            counts['requests'] += requests_made
+            counts['connections'] += connections_opened
+
+    def snapshot(self):
+        """{channel: {'requests', 'connections', 'reused'}}"""
+        with self._lock:
+            return {
+                channel: dict(counts, reused=max(0, counts['requests'] - counts['connections']))
+                for channel, counts in self._counts.items()
+            }
+
+
+stats = TransportStats()
+
+
+def _counting_pool_classes(channel):
+    """urllib3 pool classes that record each new connection for channel"""
+    def counting(base):
+        class CountingPool(base):
+            def _new_conn(self):
+                stats.record(channel, 0, 1)
+                return super()._new_conn()
+        return CountingPool
+    return {'http': counting(HTTPConnectionPool), 'https': counting(HTTPSConnectionPool)}
+
+
+def _is_rate_limit_error(status, content):
+    """Google reports some quota errors as 403 with a rateLimitExceeded reason"""
+    return status == 403 and b'ateLimitExceeded' in (content or b'')
+
+
+def _classify_response(response):
+    status = response.status_code
+    if _is_rate_limit_error(status, response.content):
+        status = 429
+    return status, retry_after_seconds(response.headers.get('Retry-After'))
+
+
+def _classify_httplib2(result):
+    response, content = result
+    status = response.status
+    if _is_rate_limit_error(status, content):
+        status = 429
+    return status, retry_after_seconds(response.get('retry-after'))
+
+
+class _CountingAdapter(HTTPAdapter):
+    """Pooled requests adapter that records requests and new connections.
+
+    With an api ('sheets'), requests go through that API's rate limit and
+    the shared retry policy.
+    """
+
+    def __init__(self, channel, api=None):
+        self.channel = channel
+        self.api = api
+        super().__init__(pool_connections=config.HTTP_POOL_CONNECTIONS,
+                         pool_maxsize=config.HTTP_POOL_MAXSIZE)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _counting_pool_classes(self.channel)
+
+    def _send(self, request, **kwargs):
+        stats.record(self.channel)
+        return HTTPAdapter.send(self, request, **kwargs)
+
+    def send(self, request, **kwargs):
+        if self.api is None:
+            return self._send(request, **kwargs)
+        return policy.call(
+            self.api, buckets[self.api], lambda: self._send(request, **kwargs), _classify_response,
+            idempotent=request.method in IDEMPOTENT_METHODS, discard=lambda response: response.close()
+        )
+
+
+class _CountingHttp(httplib2.Http):
+    """httplib2.Http for Drive that records requests and new connections,
+    rate limited and retried by the shared retry policy"""
+
+    def _request_once(self, *args, **kwargs):
+        before = {id(connection) for connection in self.connections.values()}
+        try:
+            return httplib2.Http.request(self, *args, **kwargs)
+        finally:
+            opened = sum(1 for connection in self.connections.values() if id(connection) not in before)
+            stats.record('drive', 1, opened)
+
+    def request(self, uri, method="GET", *args, **kwargs):
+        return policy.call(
+            'drive', buckets['drive'], lambda: self._request_once(uri, method, *args, **kwargs),
+            _classify_httplib2, idempotent=method in IDEMPOTENT_METHODS
+        )
+
+
+def _pooled(session, channel, api=None):
+    for prefix in ('https://', 'http://'):
+        session.mount(prefix, _CountingAdapter(channel, api))
+    return session
+
+
+_web_lock = threading.Lock()
+_web_session = None
+
+
+def web_session():
+    """Process-wide pooled session for unauthenticated requests"""
+    global _web_session
+    with _web_lock:
+        if _web_session is None:
+            _web_session = _pooled(requests.Session(), 'web')
+        return _web_session
+
+
+class GoogleTransport:
+    """Authorized, pooled transports built from one set of credentials"""
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self.sheets_session = _pooled(AuthorizedSession(credentials), 'sheets', api='sheets')
+        self._local = threading.local()
+
+    def drive_service(self):
+        """Drive service for the calling thread, reused for the life of the thread"""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            http = AuthorizedHttp(self.credentials, http=_CountingHttp(timeout=config.HTTP_TIMEOUT))
+            service = build('drive', 'v3', http=http, cache_discovery=False)
+            self._local.service = service
+        return service
+
+
+_transport = None
+
+
+def init_transport(credentials):
+    """Create the process-wide GoogleTransport for credentials (see get_transport)"""
+    global _transport
+    _transport = GoogleTransport(credentials)
+    return _transport
+
+
+def get_transport():
+    """The GoogleTransport set up by init_transport, or None"""
+    return _transport
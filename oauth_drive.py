@@ -12,6 +12,7 @@ import os
 import pickle
 import base64
 import json
+import logging
 from datetime import datetime
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -27,6 +28,8 @@ SCOPES = [
     'https://www.googleapis.com/auth/spreadsheets'
 ]
 
+logger = logging.getLogger(__name__)
+
 
 def get_service_account_credentials():
     """
@@ -263,7 +266,11 @@ def create_drive_folder_oauth(drive_service, folder_name, parent_folder_id=None)
         return None
 
 def upload_to_drive_oauth(drive_service, file_data, file_name, folder_id):
-    """Upload file to Google Drive using OAuth2"""
+    """Upload file to Google Drive using OAuth2
+
+    Safe to call from worker threads. Returns (file_id, error): file_id is
+    None and error describes the failure if the upload did not go through.
+    """
     try:
         file_metadata = {
             'name': file_name,
@@ -303,8 +310,8 @@ def upload_to_drive_oauth(drive_service, file_data, file_name, folder_id):
         # This makes downloading easier and more reliable
         file_id = file.get('id')
         print(f"Uploaded {file_name} with ID: {file_id}")
-        return file_id
+        return file_id, None
 
     except Exception as e:
-        st.error(f"Upload error: {str(e)}")
-        return None
+        logger.exception("Uploading %s to Drive failed", file_name)
+        return None, f"Upload error: {str(e)}"
@@ -13,117 +13,325 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
 from reportlab.pdfgen import canvas
 import os
+import hashlib
+import json
+import shutil
+import tempfile
+import threading
+import time
 from io import BytesIO
-
-# For PDF reading (to extract pages from uploaded PDFs)
-try:
-    from PyPDF2 import PdfReader, PdfWriter
-    PDF_MERGE_AVAILABLE = True
-except ImportError:
-    PDF_MERGE_AVAILABLE = False
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from PIL import Image as PILImage, ImageOps
+import config
+
+# For merging uploaded PDFs into the report (pikepdf, or PyPDF2 as a fallback)
+from pdf_merge import PDF_MERGE_AVAILABLE, get_merger
+
+# Events sheet columns a report is rendered from
+REPORT_EVENT_FIELDS = [
+    'Program Name', 'Academic Year', 'Quarter', 'Start Date', 'End Date',
+    'Program Theme', 'Program Driven By', 'Activity Led By', 'Organizing Departments', 'Professional Society Club',
+    'SDG Goals', 'Program Outcomes', 'Program Type', 'Mode of Delivery',
+    'Student Participants', 'Faculty Participants', 'External Participants', 'Event Level', 'Duration (Hrs)',
+    'Expenditure Amount', 'Video URL', 'Objective', 'Benefits', 'Brief Report',
+    'Geotag_Photo1_ID', 'Geotag_Photo2_ID', 'Geotag_Photo3_ID',
+    'Normal_Photo1_ID', 'Normal_Photo2_ID', 'Normal_Photo3_ID',
+    'Attendance_Report_ID', 'Feedback_Analysis_ID', 'Event_Agenda_ID',
+    'Chief_Guest_Biodata_ID', 'KPI_Report_ID',
+]
+
+
+def report_event_data(event):
+    """The part of an Events row that IICReportGenerator renders"""
+    return {field: event.get(field, '') for field in REPORT_EVENT_FIELDS}
+
+
+# Process-wide report assets, shared by every IICReportGenerator in this process
+_asset_lock = threading.Lock()
+_logo_cache = {}  # (path, width, height) -> pre-scaled PNG bytes, or None if unreadable
+_report_styles = None
+
+
+def get_report_styles():
+    """Sample stylesheet plus the report's custom paragraph styles (built once)"""
+    global _report_styles
+    with _asset_lock:
+        if _report_styles is None:
+            styles = getSampleStyleSheet()
+            styles.add(ParagraphStyle(
+                name='InstTitle', fontSize=14, fontName='Helvetica-Bold',
+                alignment=TA_CENTER, spaceAfter=0, leading=16
+            ))
+            styles.add(ParagraphStyle(
+                name='InstSubtitle', fontSize=11, fontName='Helvetica-Bold',
+                alignment=TA_CENTER, textColor=colors.HexColor('#228B22'), spaceAfter=0
+            ))
+            styles.add(ParagraphStyle(
+                name='Accred', fontSize=7, fontName='Helvetica',
+                alignment=TA_CENTER, leading=9, spaceAfter=2
+            ))
+            styles.add(ParagraphStyle(
+                name='RepTitle', fontSize=16, fontName='Helvetica-Bold',
+                alignment=TA_CENTER, spaceAfter=12, spaceBefore=8
+            ))
+            styles.add(ParagraphStyle(
+                name='SecHead', fontSize=12, fontName='Helvetica-Bold',
+                alignment=TA_CENTER, backColor=colors.HexColor('#D8BFD8'),
+                spaceAfter=8, spaceBefore=8, leading=18, textColor=colors.HexColor('#4B0082')
+            ))
+            styles.add(ParagraphStyle(
+                name='TblLabel', fontSize=9, fontName='Helvetica-Bold', leading=11
+            ))
+            styles.add(ParagraphStyle(
+                name='TblValue', fontSize=9, fontName='Helvetica', leading=11
+            ))
+            styles.add(ParagraphStyle(
+                name='Body', fontSize=10, fontName='Helvetica',
+                alignment=TA_JUSTIFY, leading=13, spaceAfter=6
+            ))
+            styles.add(ParagraphStyle(
+                name='DocTitle', fontSize=14, fontName='Helvetica-Bold',
+                alignment=TA_CENTER, spaceAfter=20, spaceBefore=20
+            ))
+            _report_styles = styles
+        return _report_styles
+
+
+def get_logo(path, width, height):
+    """Logo as an Image flowable, decoded and scaled to width x height once per process.
+
+    Returns "" if the file cannot be read, which renders as an empty table cell.
+    """
+    key = (os.path.abspath(path), width, height)
+    with _asset_lock:
+        if key not in _logo_cache:
+            try:
+                size = (max(1, round(width / inch * config.PDF_LOGO_DPI)),
+                        max(1, round(height / inch * config.PDF_LOGO_DPI)))
+                with PILImage.open(path) as logo:
+                    logo.load()
+                    scaled = logo.resize(size, PILImage.LANCZOS)
+                buffer = BytesIO()
+                scaled.save(buffer, format='PNG', optimize=True)
+                _logo_cache[key] = buffer.getvalue()
+            except Exception:
+                _logo_cache[key] = None
+        data = _logo_cache[key]
+    if data is None:
+        return ""
+    return Image(BytesIO(data), width=width, height=height)
+
+
+def photo_flowable(data, max_width, max_height):
+    """Uploaded photo as an Image flowable fitted inside max_width x max_height.
+
+    The photo is rotated per its EXIF orientation, downscaled to
+    PDF_PHOTO_DPI for the space it occupies and re-encoded as JPEG, keeping
+    its aspect ratio. Falls back to the original bytes stretched to the box
+    if Pillow cannot read them.
+    """
+    try:
+        with PILImage.open(BytesIO(data)) as photo:
+            photo = ImageOps.exif_transpose(photo)
+            scale = min(max_width / photo.width, max_height / photo.height)
+            width, height = photo.width * scale, photo.height * scale
+            pixels = (max(1, round(width / inch * config.PDF_PHOTO_DPI)),
+                      max(1, round(height / inch * config.PDF_PHOTO_DPI)))
+            if pixels[0] < photo.width:
+                photo = photo.resize(pixels, PILImage.LANCZOS)
+            if photo.mode in ('RGBA', 'LA', 'P'):
+                photo = photo.convert('RGBA')
+                background = PILImage.new('RGB', photo.size, 'white')
+                background.paste(photo, mask=photo.split()[-1])
+                photo = background
+            elif photo.mode != 'RGB':
+                photo = photo.convert('RGB')
+            buffer = BytesIO()
+            photo.save(buffer, format='JPEG', quality=config.PDF_PHOTO_JPEG_QUALITY, optimize=True)
+        buffer.seek(0)
+        return Image(buffer, width=width, height=height)
+    except Exception:
+        return Image(BytesIO(data), width=max_width, height=max_height)
+
+
+class _PageMarker(Flowable):
+    """Zero-size flowable that records the page it lands on into starts[key]"""
+    def __init__(self, starts, key):
+        Flowable.__init__(self)
+        self.starts = starts
+        self.key = key
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        self.starts[self.key] = self.canv.getPageNumber() - 1
 
 
 class NumberedCanvas(canvas.Canvas):
-    """Custom canvas for page numbers"""
-    def __init__(self, *args, **kwargs):
-        canvas.Canvas.__init__(self, *args, **kwargs)
-        self._saved_page_states = []
+    """Custom canvas for page numbers.
 
+    The footer only needs the current page number, so it is drawn as each
+    page is finished instead of keeping every page's state until save().
+    """
     def showPage(self):
-        self._saved_page_states.append(dict(self.__dict__))
-        self._startPage()
-
-    def save(self):
-        num_pages = len(self._saved_page_states)
-        for state in self._saved_page_states:
-            self.__dict__.update(state)
-            self.draw_page_number(num_pages)
-            canvas.Canvas.showPage(self)
-        canvas.Canvas.save(self)
-
-    def draw_page_number(self, page_count):
+        self.draw_page_number()
+        canvas.Canvas.showPage(self)
+
+    def draw_page_number(self):
         self.setFont("Helvetica", 9)
         self.drawCentredString(A4[0]/2, 0.4*inch, f"Page {self._pageNumber}")
 
 
 class IICReportGenerator:
+    # Bump whenever the report layout changes so cached reports are rebuilt
+    TEMPLATE_VERSION = 1
+
+    # Photos embedded as annexure pages
+    PHOTO_FIELDS = [
+        ('Geotag_Photo1_ID', 'Geotagged Photo 1'),
+        ('Geotag_Photo2_ID', 'Geotagged Photo 2'),
+        ('Geotag_Photo3_ID', 'Geotagged Photo 3'),
+        ('Normal_Photo1_ID', 'Event Photo 1'),
+        ('Normal_Photo2_ID', 'Event Photo 2'),
+        ('Normal_Photo3_ID', 'Event Photo 3'),
+    ]
+
+    # Uploaded documents merged after the main report
+    DOCUMENT_FIELDS = [
+        ('Attendance_Report_ID', 'Attendance Report'),
+        ('Feedback_Analysis_ID', 'Feedback Analysis Report'),
+        ('Event_Agenda_ID', 'Event Agenda'),
+        ('Chief_Guest_Biodata_ID', 'Chief Guest Biodata'),
+        ('KPI_Report_ID', 'KPI Report'),
+    ]
+
     def __init__(self, event_data, logo_path=None, drive_manager=None):
         self.event_data = event_data
         self.logo_base_path = logo_path or "logos"
         self.drive_manager = drive_manager
-        self.styles = getSampleStyleSheet()
-        self._setup_styles()
+        self.styles = get_report_styles()
         self.page_width = A4[0] - 1*inch
         self.merge_status = []  # For debugging
+        self.degraded = False  # a photo or document was left out of the last render
+        self._prefetched = {}  # file_id -> (bytes or None, error)
+        self._header_elements = None
+        self._header_height = 0
+        self._fingerprint = None
+        self.from_cache = False
+
+    def fingerprint(self):
+        """Hash of everything the rendered report depends on.
+
+        Covers the template version, every event_data field and, where the
+        drive_manager can report it, the current revision of each referenced
+        file, so replacing an upload in place also changes the fingerprint.
+        """
+        if self._fingerprint is None:
+            payload = json.dumps({
+                'template': self.TEMPLATE_VERSION,
+                'event': self.event_data,
+                'files': self._file_revisions(),
+            }, sort_keys=True, default=str)
+            self._fingerprint = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        return self._fingerprint
+
+    def _file_revisions(self):
+        """{file_id: revision} for referenced files (empty if unsupported)"""
+        if not hasattr(self.drive_manager, 'file_revision'):
+            return {}
+        file_ids = self._referenced_file_ids()
+        if not file_ids:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(config.PDF_PREFETCH_WORKERS, len(file_ids))) as executor:
+            revisions = executor.map(self.drive_manager.file_revision, file_ids)
+            return dict(zip(file_ids, revisions))
+
+    def _referenced_file_ids(self):
+        """Unique, plausible file IDs from the photo and document fields"""
+        file_ids = []
+        for field, _ in self.PHOTO_FIELDS + self.DOCUMENT_FIELDS:
+            file_id = self.event_data.get(field, '')
+            if not file_id or file_id == 'null' or len(str(file_id).strip()) < 5:
+                continue
+            file_id = str(file_id).strip()
+            if file_id not in file_ids:
+                file_ids.append(file_id)
+        return file_ids
+
+    def generate_pdf(self, output_path, cache=None):
+        """Generate complete PDF with all content embedded.
+
+        output_path is a writable binary stream or a file path. The report is
+        written straight into it (streams are rewound) and it is returned.
+        With a report_cache.ReportCache, an unchanged report is served from
+        the cache instead of being rebuilt (from_cache is then True).
+        """
+        self.from_cache = False
+        if cache is None:
+            return self._render(output_path)
+
+        fingerprint = self.fingerprint()
+        cached = cache.open(fingerprint)
+        if cached:
+            with cached:
+                self.merge_status = ["Report unchanged since last build - served from cache"]
+                self.from_cache = True
+                return self._write_output(lambda out: shutil.copyfileobj(cached, out), output_path)
+
+        self._render(output_path)
+        if self.degraded:
+            # Likely a transient Drive failure - cached, it would be served until the event changes
+            self.merge_status.append("Report not cached - some photos or documents are missing")
+            return output_path
+        try:
+            if hasattr(output_path, 'read'):
+                start = output_path.tell()
+                cache.put(fingerprint, output_path)
+                output_path.seek(start)
+            else:
+                with open(output_path, 'rb') as f:
+                    cache.put(fingerprint, f)
+        except Exception as e:
+            self.merge_status.append(f"Report cache write failed: {str(e)[:50]}")
+        return output_path
+
+    def _problem(self, line):
+        """Record a status line for a photo/document the report had to leave out"""
+        self.merge_status.append(line)
+        self.degraded = True
 
-    def _setup_styles(self):
-        """Setup custom styles"""
-        self.styles.add(ParagraphStyle(
-            name='InstTitle', fontSize=14, fontName='Helvetica-Bold',
-            alignment=TA_CENTER, spaceAfter=0, leading=16
-        ))
-        self.styles.add(ParagraphStyle(
-            name='InstSubtitle', fontSize=11, fontName='Helvetica-Bold',
-            alignment=TA_CENTER, textColor=colors.HexColor('#228B22'), spaceAfter=0
-        ))
-        self.styles.add(ParagraphStyle(
-            name='Accred', fontSize=7, fontName='Helvetica',
-            alignment=TA_CENTER, leading=9, spaceAfter=2
-        ))
-        self.styles.add(ParagraphStyle(
-            name='RepTitle', fontSize=16, fontName='Helvetica-Bold',
-            alignment=TA_CENTER, spaceAfter=12, spaceBefore=8
-        ))
-        self.styles.add(ParagraphStyle(
-            name='SecHead', fontSize=12, fontName='Helvetica-Bold',
-            alignment=TA_CENTER, backColor=colors.HexColor('#D8BFD8'),
-            spaceAfter=8, spaceBefore=8, leading=18, textColor=colors.HexColor('#4B0082')
-        ))
-        self.styles.add(ParagraphStyle(
-            name='TblLabel', fontSize=9, fontName='Helvetica-Bold', leading=11
-        ))
-        self.styles.add(ParagraphStyle(
-            name='TblValue', fontSize=9, fontName='Helvetica', leading=11
-        ))
-        self.styles.add(ParagraphStyle(
-            name='Body', fontSize=10, fontName='Helvetica',
-            alignment=TA_JUSTIFY, leading=13, spaceAfter=6
-        ))
-        self.styles.add(ParagraphStyle(
-            name='DocTitle', fontSize=14, fontName='Helvetica-Bold',
-            alignment=TA_CENTER, spaceAfter=20, spaceBefore=20
-        ))
-
-    def generate_pdf(self, output_path):
-        """Generate complete PDF with all content embedded"""
+    def _render(self, output_path):
+        """Build the report into output_path (see generate_pdf).
+
+        Sets degraded when any photo or document could not be included.
+        """
         self.merge_status = []
+        self.degraded = False
         self.merge_status.append("Starting PDF generation...")
 
-        # Step 1: Build main report
-        main_buffer = BytesIO()
-        doc = SimpleDocTemplate(main_buffer, pagesize=A4,
-            rightMargin=0.5*inch, leftMargin=0.5*inch,
-            topMargin=0.3*inch, bottomMargin=0.6*inch)
+        # Download every photo and document up front, concurrently
+        self._prefetch_files()
+
+        # Step 1: Build main report (spills to disk if it gets large)
+        main_buffer = tempfile.SpooledTemporaryFile(max_size=config.PDF_SPOOL_MAX_BYTES)
+        doc = self._doc_template(main_buffer)
 
         story = []
 
         # Page 1: Event Details
-        story.extend(self._header())
         story.extend(self._details_table())
         story.append(PageBreak())
 
         # Page 2: Objectives and Benefits
-        story.extend(self._header())
         story.extend(self._objectives())
         story.append(PageBreak())
 
         # Page 3+: Brief Report (may span multiple pages)
-        story.extend(self._header())
         story.extend(self._brief_report())
         story.append(PageBreak())
 
         # Signatures Page
-        story.extend(self._header())
         story.extend(self._signatures())
         story.append(PageBreak())
 
@@ -132,53 +340,193 @@ class IICReportGenerator:
         story.extend(photo_elements)
 
         # Build main report first
-        doc.build(story, canvasmaker=NumberedCanvas)
+        doc.build(story, onFirstPage=self._draw_header, onLaterPages=self._draw_header,
+                  canvasmaker=NumberedCanvas)
         self.merge_status.append(f"Main report built successfully")
 
-        # Step 2: Now merge uploaded PDF documents
-        if PDF_MERGE_AVAILABLE and self.drive_manager:
-            self.merge_status.append("Starting document merge process...")
-            final_buffer = self._merge_uploaded_documents(main_buffer)
-            if final_buffer:
-                final_buffer.seek(0)
-                if isinstance(output_path, BytesIO):
-                    output_path.write(final_buffer.getvalue())
-                    output_path.seek(0)
-                    return output_path
-                return final_buffer
-        else:
-            if not PDF_MERGE_AVAILABLE:
-                self.merge_status.append("PyPDF2 not available - documents will not be merged")
-            if not self.drive_manager:
-                self.merge_status.append("No drive_manager - documents will not be merged")
-
-        # Return main buffer if merging failed or not available
-        main_buffer.seek(0)
-        if isinstance(output_path, BytesIO):
-            output_path.write(main_buffer.getvalue())
-            output_path.seek(0)
+        try:
+            # Step 2: Now merge uploaded PDF documents
+            if PDF_MERGE_AVAILABLE and self.drive_manager:
+                self.merge_status.append("Starting document merge process...")
+                merger = self._merge_uploaded_documents(main_buffer)
+                if merger:
+                    try:
+                        return self._write_output(merger.write, output_path)
+                    except Exception as e:
+                        self._problem(f"MERGE ERROR: {str(e)}")
+                    finally:
+                        merger.close()
+            else:
+                if not PDF_MERGE_AVAILABLE:
+                    self.merge_status.append("No PDF library (pikepdf/PyPDF2) available - documents will not be merged")
+                if not self.drive_manager:
+                    self.merge_status.append("No drive_manager - documents will not be merged")
+                if self._referenced_file_ids():
+                    self.degraded = True
+
+            # Write main report alone if merging failed or not available
+            main_buffer.seek(0)
+            return self._write_output(lambda out: shutil.copyfileobj(main_buffer, out), output_path)
+        finally:
+            main_buffer.close()
+
+    @classmethod
+    def generate_compendium(cls, events, output_path, title, logo_path=None, drive_manager=None, cache=None):
+        """Build one PDF holding the full report of every event in events.
+
+        The compendium opens with a contents page and has a bookmark per
+        event. Each event's report (main pages plus annexures) is rendered on
+        its own into a temporary file, so only one event's photos and
+        documents are in memory at a time; the finished sections are then
+        appended to a single merger. output_path is a stream or file path as
+        for generate_pdf. Returns (output_path, status lines).
+        """
+        status = []
+        files = []     # rendered section temp files, open until the merge is written
+        sections = []  # (event_data, merge source, page count)
+        merger = get_merger()
+        try:
+            for event_data in events:
+                report = cls(event_data, logo_path=logo_path, drive_manager=drive_manager)
+                section = tempfile.TemporaryFile()
+                files.append(section)
+                try:
+                    report.generate_pdf(section, cache=cache)
+                    source = merger.open(section)
+                    page_count = merger.page_count(source)
+                except Exception as e:
+                    status.append(f"{event_data.get('Program Name', 'Event')}: FAILED - {str(e)[:50]}")
+                    continue
+                sections.append((event_data, source, page_count))
+                failures = [line for line in report.merge_status if 'FAILED' in line or 'ERROR' in line]
+                status.append(f"{event_data.get('Program Name', 'Event')}: {page_count} pages"
+                              + (f" ({len(failures)} annexure problems)" if failures else ""))
+
+            # Section page numbers depend on how long the contents are
+            contents = cls({}, logo_path=logo_path)
+            contents_pages = 1
+            while True:
+                contents_source = merger.open(contents._contents_pages(title, sections, contents_pages))
+                if merger.page_count(contents_source) == contents_pages:
+                    break
+                contents_pages = merger.page_count(contents_source)
+
+            merger.append(contents_source)
+            merger.add_bookmark("Contents", 0)
+            for event_data, source, page_count in sections:
+                first_page = len(merger)
+                merger.append(source)
+                merger.add_bookmark(event_data.get('Program Name') or "Untitled Event", first_page)
+
+            status.append(f"TOTAL: {len(sections)} of {len(events)} events, {len(merger)} pages")
+            return cls._write_output(merger.write, output_path), status
+        finally:
+            merger.close()
+            for section in files:
+                section.close()
+
+    def _contents_pages(self, title, sections, contents_pages):
+        """Compendium cover and contents, with sections starting after contents_pages"""
+        story = [
+            Paragraph(title, self.styles['RepTitle']),
+            Paragraph("CONTENTS", self.styles['SecHead']),
+            Spacer(1, 0.1*inch),
+        ]
+
+        rows = [[Paragraph(label, self.styles['TblLabel'])
+                 for label in ("S.No", "Program Name", "Quarter", "Dates", "Page")]]
+        page = contents_pages + 1
+        for index, (event_data, _, page_count) in enumerate(sections, start=1):
+            dates = event_data.get('Start Date', '')
+            if event_data.get('End Date') and event_data.get('End Date') != dates:
+                dates = f"{dates} - {event_data.get('End Date')}"
+            rows.append([
+                Paragraph(str(index), self.styles['TblValue']),
+                Paragraph(str(event_data.get('Program Name', '')), self.styles['TblValue']),
+                Paragraph(str(event_data.get('Quarter', '')), self.styles['TblValue']),
+                Paragraph(str(dates), self.styles['TblValue']),
+                Paragraph(str(page), self.styles['TblValue']),
+            ])
+            page += page_count
+
+        table = Table(rows, colWidths=[0.5*inch, 3.5*inch, 1*inch, 1.8*inch, 0.7*inch], repeatRows=1)
+        table.setStyle(TableStyle([
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D8BFD8')),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]))
+        story.append(table)
+
+        buffer = BytesIO()
+        doc = self._doc_template(buffer)
+        doc.build(story, onFirstPage=self._draw_header, onLaterPages=self._draw_header,
+                  canvasmaker=NumberedCanvas)
+        buffer.seek(0)
+        return buffer
+
+    @staticmethod
+    def _write_output(write, output_path):
+        """Call write(stream) on output_path (a stream or file path) and return it"""
+        if hasattr(output_path, 'write'):
+            start = output_path.tell()
+            try:
+                write(output_path)
+            except Exception:
+                # Don't leave a half-written report behind for the fallback
+                output_path.seek(start)
+                output_path.truncate()
+                raise
+            output_path.seek(start)
             return output_path
-        return main_buffer
+
+        with open(output_path, 'wb') as f:
+            write(f)
+        return output_path
+
+    def _doc_template(self, buffer):
+        """A4 document whose top margin leaves room for the page header"""
+        self._header()
+        return SimpleDocTemplate(buffer, pagesize=A4,
+            rightMargin=0.5*inch, leftMargin=0.5*inch,
+            topMargin=0.3*inch + self._header_height, bottomMargin=0.6*inch)
+
+    def _draw_header(self, canv, doc):
+        """onPage callback: stamp the header form, drawing it once per canvas.
+
+        The header is rendered into a PDF form XObject on the first page of
+        each document and every later page just references it, so the logos
+        are embedded and decoded only once per file.
+        """
+        if not getattr(canv, '_iic_header_drawn', False):
+            canv.beginForm('IICHeader')
+            # Same position the header had as the first flowables of the frame
+            x = doc.leftMargin
+            y = doc.pagesize[1] - 0.3*inch - 6
+            for index, element in enumerate(self._header()):
+                if index:
+                    y -= element.getSpaceBefore()
+                _, height = element.wrap(self.page_width, doc.pagesize[1])
+                element.drawOn(canv, x, y - height)
+                y -= height + element.getSpaceAfter()
+            canv.endForm()
+            canv._iic_header_drawn = True
+        canv.doForm('IICHeader')
 
     def _header(self):
-        """Create properly aligned header"""
+        """Create properly aligned header (built once, drawn by _draw_header)"""
+        if self._header_elements is not None:
+            return self._header_elements
+
         elements = []
 
         logo_col_width = 0.8*inch
         center_width = self.page_width - (2 * logo_col_width)
 
         # Load logos
-        try:
-            snr = Image(os.path.join(self.logo_base_path, "snr_logo.png"),
+        snr = get_logo(os.path.join(self.logo_base_path, "snr_logo.png"),
                        width=0.65*inch, height=0.65*inch)
-        except:
-            snr = ""
-
-        try:
-            srit = Image(os.path.join(self.logo_base_path, "srit_logo.png"),
+        srit = get_logo(os.path.join(self.logo_base_path, "srit_logo.png"),
                         width=0.65*inch, height=0.65*inch)
-        except:
-            srit = ""
 
         # Title block
         title_data = [
@@ -222,12 +570,8 @@ Pachapalayam, Perur Chettipalayam, Coimbatore - 641 010. www.srit.org Phone - 04
             logo_files = ["hive.png", "sish.png", "mic.png", "aicte.png",
                          "iic_logo.png", "idea_lab.png", "ecell.png"]
             for lf in logo_files:
-                try:
-                    img = Image(os.path.join(self.logo_base_path, lf),
-                               width=logo_width, height=logo_height)
-                    logos.append(img)
-                except:
-                    logos.append("")
+                logos.append(get_logo(os.path.join(self.logo_base_path, lf),
+                                      width=logo_width, height=logo_height))
 
             logo_table = Table([logos], colWidths=[col_width]*7)
             logo_table.setStyle(TableStyle([
@@ -252,6 +596,14 @@ Pachapalayam, Perur Chettipalayam, Coimbatore - 641 010. www.srit.org Phone - 04
         elements.append(line)
         elements.append(Spacer(1, 0.1*inch))
 
+        height = 0
+        for index, element in enumerate(elements):
+            _, element_height = element.wrap(self.page_width, A4[1])
+            height += element_height + element.getSpaceAfter()
+            if index:
+                height += element.getSpaceBefore()
+        self._header_elements = elements
+        self._header_height = height
         return elements
 
     def _details_table(self):
@@ -362,6 +714,57 @@ Pachapalayam, Perur Chettipalayam, Coimbatore - 641 010. www.srit.org Phone - 04
         elements.append(sig)
         return elements
 
+    def _prefetch_files(self):
+        """Fetch all referenced photos/documents concurrently into memory.
+
+        The photo and merge phases then read from this map instead of doing
+        one Drive round trip each. A download that has not finished
+        PDF_PREFETCH_TIMEOUT seconds after it started is recorded as failed;
+        time spent queued behind other downloads does not count.
+        """
+        self._prefetched = {}
+        if not self.drive_manager:
+            return
+
+        file_ids = self._referenced_file_ids()
+        if not file_ids:
+            return
+
+        timeout = config.PDF_PREFETCH_TIMEOUT
+        workers = min(config.PDF_PREFETCH_WORKERS, len(file_ids))
+        started = {}  # file_id -> monotonic start time
+
+        def fetch(file_id):
+            started[file_id] = time.monotonic()
+            return self._fetch_file(file_id)
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = {executor.submit(fetch, file_id): file_id for file_id in file_ids}
+        pending = set(futures)
+        stuck = 0  # timed-out downloads still holding a worker
+        while pending:
+            deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+            wait_for = max(0, min(deadlines) - time.monotonic()) if deadlines else timeout
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                self._prefetched[futures[future]] = future.result()
+
+            now = time.monotonic()
+            for future in [f for f in pending if futures[f] in started and now - started[futures[f]] >= timeout]:
+                self._prefetched[futures[future]] = (None, f"Timed out after {timeout}s")
+                pending.discard(future)
+                stuck += 1
+            if stuck >= workers:
+                # Every worker is held by a stuck download - the rest would never start
+                for future in pending:
+                    self._prefetched[futures[future]] = (None, "Not started - downloads timed out")
+                break
+        # Don't block the report on stuck downloads
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        fetched = len([1 for data, _ in self._prefetched.values() if data])
+        self.merge_status.append(f"Prefetched {fetched}/{len(file_ids)} files")
+
     def _download_file_safely(self, file_id):
         """Download file from Drive with error handling"""
         if not self.drive_manager:
@@ -372,6 +775,12 @@ Pachapalayam, Perur Chettipalayam, Coimbatore - 641 010. www.srit.org Phone - 04
 
         file_id = str(file_id).strip()
 
+        if file_id in self._prefetched:
+            return self._prefetched[file_id]
+        return self._fetch_file(file_id)
+
+    def _fetch_file(self, file_id):
+        """Download one file (runs on prefetch worker threads)"""
         try:
             data = self.drive_manager.download_file(file_id)
             if data and len(data) > 100:
@@ -382,6 +791,15 @@ Pachapalayam, Perur Chettipalayam, Coimbatore - 641 010. www.srit.org Phone - 04
         except Exception as e:
             return None, str(e)[:100]
 
+    def _document_info(self, file_id):
+        """Upload pre-flight details ({'kind', 'pages'}) if the drive_manager has them"""
+        if not hasattr(self.drive_manager, 'document_info'):
+            return None
+        try:
+            return self.drive_manager.document_info(file_id)
+        except Exception:
+            return None
+
     def _is_pdf(self, data):
         """Check if data is a PDF"""
         return data and len(data) >= 5 and data[:5] == b'%PDF-'
@@ -402,19 +820,9 @@ Pachapalayam, Perur Chettipalayam, Coimbatore - 641 010. www.srit.org Phone - 04
         """Photo annexures with embedded images"""
         elements = []
 
-        photos = [
-            ('Geotag_Photo1_ID', 'Geotagged Photo 1'),
-            ('Geotag_Photo2_ID', 'Geotagged Photo 2'),
-            ('Geotag_Photo3_ID', 'Geotagged Photo 3'),
-            ('Normal_Photo1_ID', 'Event Photo 1'),
-            ('Normal_Photo2_ID', 'Event Photo 2'),
-            ('Normal_Photo3_ID', 'Event Photo 3'),
-        ]
-
-        for field, title in photos:
+        for field, title in self.PHOTO_FIELDS:
             file_id = self.event_data.get(field, '')
             if file_id and file_id != 'null' and file_id != '':
-                elements.extend(self._header())
                 elements.append(Paragraph(f"ANNEXURE: {title}", self.styles['SecHead']))
                 elements.append(Spacer(1, 0.3*inch))
 
@@ -423,15 +831,15 @@ Pachapalayam, Perur Chettipalayam, Coimbatore - 641 010. www.srit.org Phone - 04
                     try:
                         photo_bytes, error = self._download_file_safely(file_id)
                         if photo_bytes:
-                            img = Image(BytesIO(photo_bytes), width=5*inch, height=4*inch)
+                            img = photo_flowable(photo_bytes, 5*inch, 4*inch)
                             img.hAlign = 'CENTER'
                             elements.append(img)
                             img_embedded = True
                             self.merge_status.append(f"Photo {title}: Embedded successfully")
                         else:
-                            self.merge_status.append(f"Photo {title}: Failed - {error}")
+                            self._problem(f"Photo {title}: Failed - {error}")
                     except Exception as e:
-                        self.merge_status.append(f"Photo {title}: Error - {str(e)[:50]}")
+                        self._problem(f"Photo {title}: Error - {str(e)[:50]}")
 
                 if not img_embedded:
                     elements.append(Paragraph(f"<i>Photo could not be embedded</i>", self.styles['Body']))
@@ -440,87 +848,95 @@ Pachapalayam, Perur Chettipalayam, Coimbatore - 641 010. www.srit.org Phone - 04
 
         return elements
 
-    def _create_document_title_page(self, title):
-        """Create a title page for a document annexure"""
-        title_buffer = BytesIO()
-        doc = SimpleDocTemplate(title_buffer, pagesize=A4,
-            rightMargin=0.5*inch, leftMargin=0.5*inch,
-            topMargin=0.3*inch, bottomMargin=0.6*inch)
+    def _document_title_elements(self, title):
+        """Title page for a document annexure"""
+        return [
+            Spacer(1, 1.5*inch),
+            Paragraph(f"ANNEXURE", self.styles['SecHead']),
+            Spacer(1, 0.3*inch),
+            Paragraph(f"<b>{title}</b>", self.styles['DocTitle']),
+            Spacer(1, 0.5*inch),
+            Paragraph(
+                f"<i>The {title} document is attached on the following pages.</i>",
+                self.styles['Body']
+            ),
+        ]
 
-        story = []
-        story.extend(self._header())
-        story.append(Spacer(1, 1.5*inch))
-        story.append(Paragraph(f"ANNEXURE", self.styles['SecHead']))
-        story.append(Spacer(1, 0.3*inch))
-        story.append(Paragraph(f"<b>{title}</b>", self.styles['DocTitle']))
-        story.append(Spacer(1, 0.5*inch))
-        story.append(Paragraph(
-            f"<i>The {title} document is attached on the following pages.</i>",
-            self.styles['Body']
-        ))
-
-        doc.build(story)
-        title_buffer.seek(0)
-        return title_buffer
-
-    def _create_image_as_pdf_page(self, image_bytes, title):
-        """Convert an image to a PDF page with header"""
+    def _image_page_elements(self, image_bytes, title):
+        """An image document shown as an annexure page"""
+        elements = [
+            Paragraph(f"ANNEXURE: {title}", self.styles['SecHead']),
+            Spacer(1, 0.2*inch),
+        ]
         try:
-            img_buffer = BytesIO()
-            doc = SimpleDocTemplate(img_buffer, pagesize=A4,
-                rightMargin=0.5*inch, leftMargin=0.5*inch,
-                topMargin=0.3*inch, bottomMargin=0.6*inch)
+            # Try to embed image with proper sizing
+            img = photo_flowable(image_bytes, 6*inch, 7*inch)
+            img.hAlign = 'CENTER'
+            elements.append(img)
+        except Exception as e:
+            elements.append(Paragraph(f"<i>Image could not be embedded: {str(e)[:50]}</i>", self.styles['Body']))
+        return elements
 
-            story = []
-            story.extend(self._header())
-            story.append(Paragraph(f"ANNEXURE: {title}", self.styles['SecHead']))
-            story.append(Spacer(1, 0.2*inch))
+    def _build_annexure_pages(self, sections, merger):
+        """Build every annexure title/image page in one pass.
 
-            try:
-                # Try to embed image with proper sizing
-                img = Image(BytesIO(image_bytes), width=6*inch, height=7*inch)
-                img.hAlign = 'CENTER'
-                story.append(img)
-            except Exception as e:
-                story.append(Paragraph(f"<i>Image could not be embedded: {str(e)[:50]}</i>", self.styles['Body']))
-
-            doc.build(story)
-            img_buffer.seek(0)
-            return img_buffer
-        except Exception as e:
-            self.merge_status.append(f"Image conversion error: {str(e)[:50]}")
-            return None
+        sections is a list of (key, elements); each section starts on a new
+        page. Returns (merger source for the built pages, {key: (first, end)})
+        with zero-based, end-exclusive page ranges for splicing.
+        """
+        starts = {}
+        story = []
+        for index, (key, elements) in enumerate(sections):
+            if index:
+                story.append(PageBreak())
+            story.append(_PageMarker(starts, key))
+            story.extend(elements)
+
+        buffer = BytesIO()
+        doc = self._doc_template(buffer)
+        doc.build(story, onFirstPage=self._draw_header, onLaterPages=self._draw_header)
+        buffer.seek(0)
+        source = merger.open(buffer)
+        page_count = merger.page_count(source)
+
+        ranges = {}
+        ordered = [key for key, _ in sections]
+        for index, key in enumerate(ordered):
+            end = starts[ordered[index + 1]] if index + 1 < len(ordered) else page_count
+            ranges[key] = (starts[key], end)
+        return source, ranges
 
     def _merge_uploaded_documents(self, main_pdf_buffer):
-        """Merge uploaded PDF/image documents into the final report"""
+        """Merge uploaded PDF/image documents into the final report.
+
+        Returns a pdf_merge.PdfMerger whose pages still read from their
+        source streams, so the merged file is only serialised once, straight
+        to the output. The caller closes it.
+        """
         if not PDF_MERGE_AVAILABLE:
-            self.merge_status.append("ERROR: PyPDF2 not available")
+            self._problem("ERROR: No PDF library (pikepdf/PyPDF2) available")
             return None
 
+        merger = None
         try:
             main_pdf_buffer.seek(0)
-            writer = PdfWriter()
+            merger = get_merger()
+            self.merge_status.append(f"Merging with {merger.name}")
 
             # Add all pages from main report
-            main_reader = PdfReader(main_pdf_buffer)
-            main_pages = len(main_reader.pages)
+            main_source = merger.open(main_pdf_buffer)
+            main_pages = merger.page_count(main_source)
             self.merge_status.append(f"Main report has {main_pages} pages")
-
-            for page in main_reader.pages:
-                writer.add_page(page)
-
-            # Documents to merge
-            documents = [
-                ('Attendance_Report_ID', 'Attendance Report'),
-                ('Feedback_Analysis_ID', 'Feedback Analysis Report'),
-                ('Event_Agenda_ID', 'Event Agenda'),
-                ('Chief_Guest_Biodata_ID', 'Chief Guest Biodata'),
-                ('KPI_Report_ID', 'KPI Report'),
-            ]
+            merger.append(main_source)
 
             merged_count = 0
 
-            for field, title in documents:
+            # Work out what each document contributes, then build all the
+            # title/image pages together and splice them in afterwards
+            sections = []  # (field, story elements) for the annexure build
+            plan = []      # (field, title, merger source or None for an image)
+
+            for field, title in self.DOCUMENT_FIELDS:
                 file_id = self.event_data.get(field, '')
 
                 # Skip if no file ID
@@ -535,83 +951,85 @@ Pachapalayam, Perur Chettipalayam, Coimbatore - 641 010. www.srit.org Phone - 04
                 doc_bytes, error = self._download_file_safely(file_id)
 
                 if not doc_bytes:
-                    self.merge_status.append(f"{title}: DOWNLOAD FAILED - {error}")
+                    self._problem(f"{title}: DOWNLOAD FAILED - {error}")
                     continue
 
                 self.merge_status.append(f"{title}: Downloaded {len(doc_bytes)} bytes")
 
-                # Process based on file type
-                if self._is_pdf(doc_bytes):
-                    # It's a PDF - add title page then merge pages
-                    try:
-                        # Create and add title page
-                        title_pdf = self._create_document_title_page(title)
-                        title_reader = PdfReader(title_pdf)
-                        for page in title_reader.pages:
-                            writer.add_page(page)
-
-                        # Add document pages
-                        doc_reader = PdfReader(BytesIO(doc_bytes))
-                        doc_pages = len(doc_reader.pages)
-
-                        if doc_pages > 0:
-                            for page in doc_reader.pages:
-                                writer.add_page(page)
-                            merged_count += 1
-                            self.merge_status.append(f"{title}: MERGED ({doc_pages} pages)")
-                        else:
-                            self.merge_status.append(f"{title}: FAILED - PDF has 0 pages")
-                    except Exception as e:
-                        self.merge_status.append(f"{title}: PDF ERROR - {str(e)[:50]}")
-
-                elif self._is_image(doc_bytes):
-                    # It's an image - convert to PDF page
-                    try:
-                        img_pdf = self._create_image_as_pdf_page(doc_bytes, title)
-                        if img_pdf:
-                            img_reader = PdfReader(img_pdf)
-                            for page in img_reader.pages:
-                                writer.add_page(page)
-                            merged_count += 1
-                            self.merge_status.append(f"{title}: MERGED as image (1 page)")
-                        else:
-                            self.merge_status.append(f"{title}: FAILED - Image conversion failed")
-                    except Exception as e:
-                        self.merge_status.append(f"{title}: IMAGE ERROR - {str(e)[:50]}")
-
+                # Process based on file type. For a document that passed the
+                # pre-flight check at upload, its type and page count are
+                # known; the normalised PDF stored then is still opened here
+                # (cheaply - it has a clean cross-reference table), since
+                # parsed objects cannot outlive the upload request.
+                info = self._document_info(file_id)
+                if info:
+                    is_pdf = info.get('kind') == 'pdf'
+                    is_image = not is_pdf
                 else:
+                    is_pdf = self._is_pdf(doc_bytes)
+                    is_image = not is_pdf and self._is_image(doc_bytes)
+                if is_image:
+                    # It's an image - shown on its own annexure page
+                    sections.append((field, self._image_page_elements(doc_bytes, title)))
+                    plan.append((field, title, None))
+                    continue
+
+                if not is_pdf:
                     # Unknown format - try as PDF anyway
                     self.merge_status.append(f"{title}: Unknown format, trying as PDF...")
+                try:
+                    doc_source = merger.open(BytesIO(doc_bytes))
+                    doc_pages = info['pages'] if info else merger.page_count(doc_source)
+                except Exception as e:
+                    label = "PDF ERROR" if is_pdf else "PARSE ERROR"
+                    self._problem(f"{title}: {label} - {str(e)[:50]}")
+                    continue
+
+                if doc_pages == 0:
+                    reason = "PDF has 0 pages" if is_pdf else "Invalid format"
+                    self._problem(f"{title}: FAILED - {reason}")
+                    continue
+
+                sections.append((field, self._document_title_elements(title)))
+                plan.append((field, title, doc_source))
+
+            if sections:
+                try:
+                    annex_source, ranges = self._build_annexure_pages(sections, merger)
+                except Exception as e:
+                    self._problem(f"ANNEXURE PAGES ERROR: {str(e)[:50]}")
+                    annex_source, ranges = None, {}
+
+                for field, title, doc_source in plan:
+                    # Title or image page(s) from the shared annexure build
+                    if annex_source is not None:
+                        first, end = ranges[field]
+                        merger.append(annex_source, first, end)
+
+                    if doc_source is None:
+                        if annex_source is None:
+                            self._problem(f"{title}: FAILED - Image conversion failed")
+                            continue
+                        merged_count += 1
+                        self.merge_status.append(f"{title}: MERGED as image (1 page)")
+                        continue
+
                     try:
-                        title_pdf = self._create_document_title_page(title)
-                        title_reader = PdfReader(title_pdf)
-                        for page in title_reader.pages:
-                            writer.add_page(page)
-
-                        doc_reader = PdfReader(BytesIO(doc_bytes))
-                        doc_pages = len(doc_reader.pages)
-
-                        if doc_pages > 0:
-                            for page in doc_reader.pages:
-                                writer.add_page(page)
-                            merged_count += 1
-                            self.merge_status.append(f"{title}: MERGED ({doc_pages} pages)")
-                        else:
-                            self.merge_status.append(f"{title}: FAILED - Invalid format")
+                        merger.append(doc_source)
+                        merged_count += 1
+                        self.merge_status.append(f"{title}: MERGED ({merger.page_count(doc_source)} pages)")
                     except Exception as e:
-                        self.merge_status.append(f"{title}: PARSE ERROR - {str(e)[:50]}")
+                        self._problem(f"{title}: PDF ERROR - {str(e)[:50]}")
 
-            total_pages = len(writer.pages)
+            total_pages = len(merger)
             self.merge_status.append(f"TOTAL: {merged_count} documents merged, {total_pages} total pages")
 
-            # Write final PDF
-            output = BytesIO()
-            writer.write(output)
-            output.seek(0)
-            return output
+            return merger
 
         except Exception as e:
-            self.merge_status.append(f"MERGE ERROR: {str(e)}")
+            self._problem(f"MERGE ERROR: {str(e)}")
             import traceback
             traceback.print_exc()
+            if merger is not None:
+                merger.close()
             return None
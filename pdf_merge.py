@@ -0,0 +1,242 @@
+"""
+Pluggable PDF merge backends for report generation
+pikepdf (qpdf) copies pages straight from the source files without turning
+them into Python objects, and can share identical images/fonts and compress
+the merged output. PyPDF2 is used when pikepdf is not installed.
+"""
+
+import hashlib
+from abc import ABC, abstractmethod
+
+import config
+
+try:
+    import pikepdf
+    PIKEPDF_AVAILABLE = True
+except ImportError:
+    PIKEPDF_AVAILABLE = False
+
+try:
+    from PyPDF2 import PdfReader, PdfWriter
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+PDF_MERGE_AVAILABLE = PIKEPDF_AVAILABLE or PYPDF2_AVAILABLE
+
+
+class PdfMerger(ABC):
+    """One merged output PDF assembled from pages of source PDFs.
+
+    Sources are opened from seekable binary streams, which must stay open
+    until write() has been called. Use as a context manager, or call close().
+    """
+
+    name = None
+
+    def __init__(self, dedupe=False, compress=False):
+        self.dedupe = dedupe
+        self.compress = compress
+
+    @abstractmethod
+    def open(self, stream):
+        """Parse a source PDF (raises if it cannot be read)"""
+
+    @abstractmethod
+    def page_count(self, source):
+        """Number of pages in an opened source"""
+
+    @abstractmethod
+    def append(self, source, first=0, end=None):
+        """Append source pages first..end-1 (all pages by default)"""
+
+    @abstractmethod
+    def add_bookmark(self, title, page_index):
+        """Top-level outline entry pointing at an already appended page (zero-based)"""
+
+    @abstractmethod
+    def __len__(self):
+        """Number of pages appended so far"""
+
+    @abstractmethod
+    def write(self, stream):
+        """Serialise the merged PDF to a writable binary stream"""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PikePdfMerger(PdfMerger):
+    """Merges with pikepdf; stream data is copied lazily by qpdf at save time.
+
+    Since a damaged stream would otherwise only fail in write() - losing
+    every source at once - open() reads through each source's page objects
+    first, so a bad file is rejected on its own.
+    """
+
+    name = 'pikepdf'
+
+    def __init__(self, dedupe=False, compress=False):
+        super().__init__(dedupe, compress)
+        self._pdf = pikepdf.new()
+        self._sources = []
+        self._bookmarks = []
+
+    def open(self, stream):
+        source = pikepdf.open(stream)
+        try:
+            self._check_pages(source)
+        except Exception:
+            source.close()
+            raise
+        self._sources.append(source)
+        return source
+
+    @staticmethod
+    def _check_pages(source):
+        """Read every object (and raw stream data) reachable from the pages"""
+        seen = set()
+        stack = [page.obj for page in source.pages]
+        while stack:
+            obj = stack.pop()
+            if obj.is_indirect:
+                if obj.objgen in seen:
+                    continue
+                seen.add(obj.objgen)
+            if isinstance(obj, pikepdf.Stream):
+                obj.read_raw_bytes()
+            if isinstance(obj, pikepdf.Array):
+                children = list(obj)
+            elif isinstance(obj, (pikepdf.Dictionary, pikepdf.Stream)):
+                children = [obj[key] for key in obj.keys() if key not in ('/Parent', '/P')]
+            else:
+                continue
+            stack.extend(child for child in children
+                         if isinstance(child, (pikepdf.Array, pikepdf.Dictionary, pikepdf.Stream)))
+
+    def page_count(self, source):
+        return len(source.pages)
+
+    def append(self, source, first=0, end=None):
+        self._pdf.pages.extend(source.pages[first:end])
+
+    def add_bookmark(self, title, page_index):
+        self._bookmarks.append((title, page_index))
+
+    def __len__(self):
+        return len(self._pdf.pages)
+
+    def write(self, stream):
+        if self._bookmarks:
+            with self._pdf.open_outline() as outline:
+                for title, page_index in self._bookmarks:
+                    outline.root.append(pikepdf.OutlineItem(title, page_index))
+        if self.dedupe:
+            self._dedupe_resources()
+        self._pdf.save(
+            stream,
+            compress_streams=self.compress,
+            object_stream_mode=(pikepdf.ObjectStreamMode.generate if self.compress
+                                else pikepdf.ObjectStreamMode.preserve),
+        )
+
+    def close(self):
+        for source in self._sources:
+            source.close()
+        self._sources = []
+        self._pdf.close()
+
+    def _dedupe_resources(self):
+        """Point every page at a single copy of identical images, forms and fonts.
+
+        Each merged document (and each section of a compendium) brings its
+        own copy of the header logos and fonts; only objects still referenced
+        are written, so the duplicates drop out of the saved file.
+        """
+        canonical = {}  # objgen -> the object used in its place
+        by_content = {}
+        for page in self._pdf.pages:
+            self._dedupe_children(page.obj.get('/Resources'), canonical, by_content)
+
+    def _dedupe_children(self, container, canonical, by_content):
+        if container is None:
+            return
+        if isinstance(container, pikepdf.Array):
+            keys = range(len(container))
+        elif isinstance(container, (pikepdf.Dictionary, pikepdf.Stream)):
+            keys = list(container.keys())
+        else:
+            return
+        for key in keys:
+            if key in ('/Parent', '/P'):
+                continue
+            child = container[key]
+            if not isinstance(child, (pikepdf.Array, pikepdf.Dictionary, pikepdf.Stream)):
+                continue
+            if child.is_indirect:
+                container[key] = self._canonical(child, canonical, by_content)
+            else:
+                self._dedupe_children(child, canonical, by_content)
+
+    def _canonical(self, obj, canonical, by_content):
+        if obj.objgen in canonical:
+            return canonical[obj.objgen]
+        canonical[obj.objgen] = obj  # placeholder while its children are visited
+        self._dedupe_children(obj, canonical, by_content)
+        if isinstance(obj, pikepdf.Stream):
+            key = (obj.stream_dict.unparse(resolved=True),
+                   hashlib.sha256(obj.read_raw_bytes()).digest())
+        else:
+            key = (obj.unparse(resolved=True), None)
+        canonical[obj.objgen] = by_content.setdefault(key, obj)
+        return canonical[obj.objgen]
+
+
+class PyPDF2Merger(PdfMerger):
+    """Merges with PyPDF2 (deduplication and compression are not supported)"""
+
+    name = 'pypdf2'
+
+    def __init__(self, dedupe=False, compress=False):
+        super().__init__(dedupe, compress)
+        self._writer = PdfWriter()
+
+    def open(self, stream):
+        return PdfReader(stream)
+
+    def page_count(self, source):
+        return len(source.pages)
+
+    def append(self, source, first=0, end=None):
+        for index in range(first, len(source.pages) if end is None else end):
+            self._writer.add_page(source.pages[index])
+
+    def add_bookmark(self, title, page_index):
+        self._writer.add_outline_item(title, page_index)
+
+    def __len__(self):
+        return len(self._writer.pages)
+
+    def write(self, stream):
+        self._writer.write(stream)
+
+
+def get_merger(backend=None):
+    """New PdfMerger for backend (default config.PDF_MERGE_BACKEND).
+
+    "auto" and "pikepdf" use pikepdf when it is installed; otherwise, or for
+    "pypdf2", PyPDF2 is used.
+    """
+    backend = backend or config.PDF_MERGE_BACKEND
+    options = {'dedupe': config.PDF_MERGE_DEDUPE, 'compress': config.PDF_MERGE_COMPRESS}
+    if PIKEPDF_AVAILABLE and (backend != 'pypdf2' or not PYPDF2_AVAILABLE):
+        return PikePdfMerger(**options)
+    if PYPDF2_AVAILABLE:
+        return PyPDF2Merger(**options)
+    raise RuntimeError("No PDF merge backend available - install pikepdf or PyPDF2")
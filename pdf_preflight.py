@@ -0,0 +1,152 @@
+"""
+Pre-flight checks for uploaded documents
+Run as soon as a document is uploaded, so an encrypted, damaged or empty PDF
+is rejected on the form instead of failing later during the report merge.
+Accepted PDFs are normalised before they are stored: the cross-reference
+table is rewritten, encryption without a password is removed and oversized
+pages are scaled down to A4.
+"""
+
+from io import BytesIO
+
+from PIL import Image
+
+import config
+from pdf_merge import PIKEPDF_AVAILABLE, PYPDF2_AVAILABLE
+
+if PIKEPDF_AVAILABLE:
+    import pikepdf
+if PYPDF2_AVAILABLE:
+    from PyPDF2 import PdfReader, PdfWriter
+
+A4_POINTS = (595.28, 841.89)
+
+PROTECTED_ERROR = "PDF is password protected - please upload an unprotected copy"
+DAMAGED_ERROR = "PDF is damaged and could not be read"
+
+
+def preflight_document(data):
+    """Check (and normalise) one uploaded PDF or image.
+
+    Returns a dict with 'kind' ('pdf' or 'image'), 'pages', 'data' (the
+    bytes to store - normalised for PDFs), 'notes' (fixes that were applied)
+    and 'error' (why the file was rejected, else None).
+    """
+    result = {'kind': None, 'pages': 0, 'data': data, 'notes': [], 'error': None}
+
+    if data[:3] == b'\xff\xd8\xff' or data[:8] == b'\x89PNG\r\n\x1a\n':
+        result['kind'] = 'image'
+        try:
+            with Image.open(BytesIO(data)) as image:
+                image.verify()
+            result['pages'] = 1
+        except Exception:
+            result['error'] = "Image is damaged and could not be read"
+        return result
+
+    if b'%PDF' not in data[:1024]:
+        result['error'] = "File is not a PDF or image"
+        return result
+
+    result['kind'] = 'pdf'
+    if PIKEPDF_AVAILABLE:
+        _preflight_pikepdf(data, result)
+    elif PYPDF2_AVAILABLE:
+        _preflight_pypdf2(data, result)
+    else:
+        result['notes'].append("No PDF library available - not checked")
+    return result
+
+
+def _fit_scale(width, height):
+    """Scale factor that brings an oversized page down to A4, or None if it fits"""
+    if max(width, height) <= config.UPLOAD_PDF_MAX_PAGE_POINTS:
+        return None
+    target_width, target_height = A4_POINTS if height >= width else A4_POINTS[::-1]
+    return min(target_width / width, target_height / height)
+
+
+def _check_page_count(pages, result):
+    if pages == 0:
+        result['error'] = "PDF has no pages"
+    elif pages > config.UPLOAD_PDF_MAX_PAGES:
+        result['error'] = f"PDF has {pages} pages - the limit is {config.UPLOAD_PDF_MAX_PAGES}"
+    result['pages'] = pages
+    return not result['error']
+
+
+def _preflight_pikepdf(data, result):
+    try:
+        pdf = pikepdf.open(BytesIO(data))
+    except pikepdf.PasswordError:
+        result['error'] = PROTECTED_ERROR
+        return
+    except Exception:
+        result['error'] = DAMAGED_ERROR
+        return
+
+    with pdf:
+        if pdf.get_warnings():
+            result['notes'].append("Damaged PDF structure (cross-reference table) repaired")
+        if pdf.is_encrypted:
+            result['notes'].append("Encryption removed")
+        try:
+            if not _check_page_count(len(pdf.pages), result):
+                return
+            scaled = 0
+            for page in pdf.pages:
+                left, bottom, right, top = [float(value) for value in page.mediabox]
+                scale = _fit_scale(right - left, top - bottom)
+                if scale is None:
+                    continue
+                transform = f"q {scale:.6f} 0 0 {scale:.6f} {-left * scale:.4f} {-bottom * scale:.4f} cm "
+                page.contents_add(pikepdf.Stream(pdf, transform.encode()), prepend=True)
+                page.contents_add(pikepdf.Stream(pdf, b" Q"))
+                page.obj.MediaBox = [0, 0, (right - left) * scale, (top - bottom) * scale]
+                for box in ('/CropBox', '/BleedBox', '/TrimBox', '/ArtBox'):
+                    if box in page.obj:
+                        del page.obj[box]
+                scaled += 1
+            if scaled:
+                result['notes'].append(f"{scaled} oversized page(s) scaled to A4")
+
+            output = BytesIO()
+            pdf.save(output, compress_streams=True, object_stream_mode=pikepdf.ObjectStreamMode.generate)
+            result['data'] = output.getvalue()
+        except Exception:
+            result['error'] = DAMAGED_ERROR
+
+
+def _preflight_pypdf2(data, result):
+    try:
+        reader = PdfReader(BytesIO(data), strict=False)
+    except Exception:
+        # AES-encrypted files fail here without a crypto library installed
+        result['error'] = PROTECTED_ERROR if b'/Encrypt' in data else DAMAGED_ERROR
+        return
+
+    try:
+        if reader.is_encrypted:
+            if not reader.decrypt(''):
+                result['error'] = PROTECTED_ERROR
+                return
+            result['notes'].append("Encryption removed")
+        if not _check_page_count(len(reader.pages), result):
+            return
+
+        writer = PdfWriter()
+        scaled = 0
+        for page in reader.pages:
+            scale = _fit_scale(float(page.mediabox.width), float(page.mediabox.height))
+            if scale is not None:
+                page.scale_by(scale)
+                scaled += 1
+            writer.add_page(page)
+        if scaled:
+            result['notes'].append(f"{scaled} oversized page(s) scaled to A4")
+
+        output = BytesIO()
+        writer.write(output)
+        result['data'] = output.getvalue()
+    except Exception:
+        result['error'] = DAMAGED_ERROR
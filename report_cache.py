@@ -0,0 +1,122 @@
+"""
+Local disk cache for rendered event reports
+Keyed by IICReportGenerator.fingerprint(), so a report is only rebuilt when
+the event data, a referenced file or the report template changes. Also
+remembers which Drive file a rendered report was uploaded as.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+
+
+class ReportCache:
+    """Size-bounded LRU cache of rendered report PDFs on local disk"""
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(root, self.INDEX_FILE)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        for entry_key, entry in index.items():
+            if entry.get('size') and not os.path.exists(self._pdf_path(entry_key)):
+                entry['size'] = 0
+        return index
+
+    def _save_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _pdf_path(self, fingerprint):
+        return os.path.join(self.root, fingerprint + '.pdf')
+
+    def open(self, fingerprint):
+        """Open the cached PDF for fingerprint for reading, or return None"""
+        with self._lock:
+            entry = self._index.get(fingerprint)
+            if not entry or not entry.get('size'):
+                self.misses += 1
+                return None
+            try:
+                f = open(self._pdf_path(fingerprint), 'rb')
+            except OSError:
+                entry['size'] = 0
+                self.misses += 1
+                return None
+            entry['last_access'] = time.time()
+            self.hits += 1
+            return f
+
+    def put(self, fingerprint, stream):
+        """Store the PDF read from stream (from its current position)"""
+        with self._lock:
+            path = self._pdf_path(fingerprint)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                shutil.copyfileobj(stream, f)
+            size = os.path.getsize(tmp_path)
+            if size > self.max_bytes:
+                os.remove(tmp_path)
+                return
+            os.replace(tmp_path, path)
+            entry = self._index.setdefault(fingerprint, {})
+            entry['size'] = size
+            entry['last_access'] = time.time()
+            self._evict()
+            self._save_index()
+
+    def drive_id(self, fingerprint):
+        """Drive file ID this exact report was last uploaded as, if known"""
+        with self._lock:
+            return self._index.get(fingerprint, {}).get('drive_id')
+
+    def set_drive_id(self, fingerprint, drive_id):
+        with self._lock:
+            entry = self._index.setdefault(fingerprint, {'size': 0, 'last_access': time.time()})
+            entry['drive_id'] = drive_id
+            self._save_index()
+
+    def _evict(self):
+        total = sum(entry.get('size', 0) for entry in self._index.values())
+        by_age = sorted(self._index.items(), key=lambda item: item[1].get('last_access', 0))
+        for fingerprint, entry in by_age:
+            if total <= self.max_bytes:
+                break
+            if not entry.get('size'):
+                continue
+            try:
+                os.remove(self._pdf_path(fingerprint))
+            except OSError:
+                pass
+            total -= entry['size']
+            entry['size'] = 0
+            # Keep the small Drive ID mapping; forget the entry otherwise
+            if not entry.get('drive_id'):
+                del self._index[fingerprint]
+
+    def stats(self):
+        """Hit/miss counters and current disk usage"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'reports': len([e for e in self._index.values() if e.get('size')]),
+                'bytes': sum(e.get('size', 0) for e in self._index.values()),
+            }
@@ -0,0 +1,192 @@
+"""
+Background job queue for report generation
+Jobs run on a small thread pool outside the Streamlit script thread, so a
+slow Drive download never blocks a user's session. Each job's state is kept
+as a JSON file under the state directory; the UI polls it by job ID, and
+jobs left unfinished by a restart are picked up again.
+"""
+
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class ReportJobQueue:
+    """Persistent thread-pool queue of "render report for event X" jobs.
+
+    handler(job) does the work on a worker thread and returns a dict that is
+    stored as the job's result; an exception marks the job failed. At most
+    one job per (kind, event_id) runs at a time: a job submitted while
+    another is running waits for it to finish (its 'after' field).
+    """
+
+    def __init__(self, state_dir, handler, max_workers, retention=86400):
+        self.state_dir = state_dir
+        self.handler = handler
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._pruned_at = time.time()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report-job')
+        os.makedirs(state_dir, exist_ok=True)
+        self._load()
+
+    def _job_path(self, job_id):
+        return os.path.join(self.state_dir, job_id + '.json')
+
+    def result_path(self, job_id, extension='.pdf'):
+        """Where a job may write a result file"""
+        return os.path.join(self.state_dir, job_id + extension)
+
+    def _load(self):
+        """Read persisted jobs, drop expired ones and requeue interrupted ones"""
+        now = time.time()
+        for name in os.listdir(self.state_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.state_dir, name), 'r') as f:
+                    job = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if self._expired(job, now):
+                self._delete(job)
+                continue
+            self._jobs[job['id']] = job
+        # Requeue once everything is loaded, so follow-ups can see their predecessor
+        for job in self._jobs.values():
+            if job['status'] in (QUEUED, RUNNING):
+                job['status'] = QUEUED
+                self._save(job)
+        for job_id in list(self._jobs):
+            if self._jobs[job_id]['status'] == QUEUED:
+                self._executor.submit(self._run, job_id)
+
+    def _save(self, job):
+        path = self._job_path(job['id'])
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(job, f, default=str)
+        os.replace(tmp_path, path)
+
+    def _expired(self, job, now):
+        return job['status'] in (DONE, FAILED) and now - (job.get('finished') or now) > self.retention
+
+    def _prune(self):
+        """Drop finished jobs (and their result files) older than the retention period.
+
+        Called with the lock held; runs at most once an hour.
+        """
+        now = time.time()
+        if now - self._pruned_at < min(self.retention, 3600):
+            return
+        self._pruned_at = now
+        for job_id, job in list(self._jobs.items()):
+            if self._expired(job, now):
+                del self._jobs[job_id]
+                self._delete(job)
+
+    def _delete(self, job):
+        for path in (self._job_path(job['id']), (job.get('result') or {}).get('result_path')):
+            if path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _same_payload(a, b):
+        return json.dumps(a, sort_keys=True, default=str) == json.dumps(b, sort_keys=True, default=str)
+
+    def _waiting(self, job):
+        """True if the job it was queued behind has not finished yet"""
+        before = self._jobs.get(job.get('after'))
+        return before is not None and before['status'] in (QUEUED, RUNNING)
+
+    def submit(self, kind, event_id, payload):
+        """Queue a job for this event and kind, reusing a pending one where possible.
+
+        A queued job with the same payload is returned as is; a queued job with
+        a different payload takes over the new one. While a job is running, an
+        identical payload returns it and anything else is queued to run after it.
+        """
+        with self._lock:
+            self._prune()
+            pending = [job for job in self._jobs.values()
+                       if job['kind'] == kind and job['event_id'] == event_id and job['status'] in (QUEUED, RUNNING)]
+            queued = next((job for job in pending if job['status'] == QUEUED), None)
+            if queued is not None:
+                if not self._same_payload(queued['payload'], payload):
+                    queued['payload'] = payload
+                    self._save(queued)
+                return dict(queued)
+            running = next((job for job in pending if job['status'] == RUNNING), None)
+            if running is not None and self._same_payload(running['payload'], payload):
+                return dict(running)
+            job = {
+                'id': uuid.uuid4().hex,
+                'kind': kind,
+                'event_id': event_id,
+                'payload': payload,
+                'status': QUEUED,
+                'after': running['id'] if running else None,
+                'created': time.time(),
+                'started': None,
+                'finished': None,
+                'result': None,
+                'error': None,
+            }
+            self._jobs[job['id']] = job
+            self._save(job)
+        self._executor.submit(self._run, job['id'])
+        return dict(job)
+
+    def get(self, job_id):
+        """Snapshot of a job's state, or None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def latest(self, kind, event_id):
+        """Most recently created job for this event and kind, or None"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job['kind'] == kind and job['event_id'] == event_id]
+            if not jobs:
+                return None
+            return dict(max(jobs, key=lambda job: job['created']))
+
+    def _run(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] != QUEUED or self._waiting(job):
+                return
+            job['status'] = RUNNING
+            job['started'] = time.time()
+            self._save(job)
+            snapshot = dict(job)
+
+        try:
+            result, error, status = self.handler(snapshot), None, DONE
+        except Exception as e:
+            traceback.print_exc()
+            result, error, status = None, str(e)[:200], FAILED
+
+        with self._lock:
+            job['status'] = status
+            job['result'] = result
+            job['error'] = error
+            job['finished'] = time.time()
+            self._save(job)
+            followers = [other['id'] for other in self._jobs.values()
+                         if other.get('after') == job_id and other['status'] == QUEUED]
+        for follower_id in followers:
+            self._executor.submit(self._run, follower_id)
@@ -0,0 +1,133 @@
+"""
+Client-side scheduler for Google Sheets writes
+All spreadsheet writes go through one process-wide queue that a background
+thread drains no faster than the Sheets write quota allows, so a burst of
+submissions turns into short waits instead of 429 errors. Admin approvals
+use a priority lane that is always drained first. A write still waiting in
+the queue absorbs later writes to the same row, and queued writes of the
+same kind to the same worksheet are sent together as one request.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future
+
+from api_retry import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class _Write:
+    """One queued row write and the futures of every caller it stands for"""
+
+    def __init__(self, write, target, key, fields):
+        self.write = write
+        self.target = target
+        self.key = key
+        self.fields = dict(fields)
+        self.futures = []
+
+
+class SheetsWriteScheduler:
+    """Rate-limited, coalescing queue of row writes with a priority lane.
+
+    A write is write(target, batch), where batch maps row keys to field
+    dicts and the return value maps row keys to per-row results. Writes to
+    the same row (target and key) always go out in submission order: a
+    write is merged into the row's last queued write only when that used
+    the same write function (later field values win), and a priority write
+    takes the row's queued writes into the priority lane ahead of it. Up to
+    batch_size queued rows for the same write function and target are
+    passed to it in one call.
+    """
+
+    def __init__(self, rate, capacity, batch_size):
+        self.batch_size = batch_size
+        self._bucket = TokenBucket(rate, capacity)
+        self._cond = threading.Condition()
+        self._lanes = ({}, {})  # (priority, normal): _Write -> None, oldest first
+        self._rows = {}         # (target, key) -> queued _Writes for that row, oldest first
+        self._thread = None
+        self.stats = {'submitted': 0, 'coalesced': 0, 'requests': 0, 'failed': 0}
+
+    def submit(self, write, target, key, fields, priority=False):
+        """Queue fields for row key and return a Future for the row's result"""
+        future = Future()
+        with self._cond:
+            self.stats['submitted'] += 1
+            priority_lane, normal_lane = self._lanes
+            queued = self._rows.setdefault((target, key), [])
+            if queued and queued[-1].write is write:
+                pending = queued[-1]
+                pending.fields.update(fields)
+                self.stats['coalesced'] += 1
+            else:
+                pending = _Write(write, target, key, fields)
+                queued.append(pending)
+                (priority_lane if priority else normal_lane)[pending] = None
+            if priority:
+                # Promoted - an approval should not wait behind other rows, but
+                # must not overtake earlier writes to its own row either
+                for earlier in queued:
+                    if earlier in normal_lane:
+                        del normal_lane[earlier]
+                        priority_lane[earlier] = None
+                if pending in priority_lane:
+                    priority_lane[pending] = priority_lane.pop(pending)
+            pending.futures.append(future)
+            self._start()
+            self._cond.notify()
+        return future
+
+    def pending(self):
+        """Number of rows waiting to be written"""
+        with self._cond:
+            return sum(len(lane) for lane in self._lanes)
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='sheets-writer', daemon=True)
+            self._thread.start()
+
+    def _take_batch(self):
+        """Remove and return the oldest queued write (priority lane first) plus its batch mates.
+
+        Batch mates are only taken if nothing else is queued before them for
+        their own row.
+        """
+        lane = next(lane for lane in self._lanes if lane)
+        first = next(iter(lane))
+        batch = [write for write in lane
+                 if write.write is first.write and write.target is first.target
+                 and self._rows[(write.target, write.key)][0] is write][:self.batch_size]
+        for write in batch:
+            del lane[write]
+            queued = self._rows[(write.target, write.key)]
+            queued.pop(0)
+            if not queued:
+                del self._rows[(write.target, write.key)]
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not any(self._lanes):
+                    self._cond.wait()
+            self._bucket.acquire()
+            with self._cond:
+                batch = self._take_batch()
+                self.stats['requests'] += 1
+            first = batch[0]
+            try:
+                results = first.write(first.target, {write.key: write.fields for write in batch}) or {}
+            except Exception as e:
+                logger.exception("Sheets write failed")
+                with self._cond:
+                    self.stats['failed'] += 1
+                for write in batch:
+                    for future in write.futures:
+                        future.set_exception(e)
+                continue
+            for write in batch:
+                for future in write.futures:
+                    future.set_result(results.get(write.key))
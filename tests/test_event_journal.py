@@ -0,0 +1,121 @@
+"""Tests for the event journal: replication, replay after a restart and deletion tombstones"""
+
+import threading
+import time
+
+import pytest
+
+from event_journal import EventJournal
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+class Replica:
+    """replicate() callback that records batches, optionally failing the first few"""
+
+    def __init__(self, failures=0):
+        self.batches = []
+        self.failures = failures
+        self._lock = threading.Lock()
+
+    def __call__(self, batch):
+        with self._lock:
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError('boom')
+            self.batches.append(batch)
+
+    def merged(self):
+        """Latest replicated row of each event"""
+        with self._lock:
+            result = {}
+            for batch in self.batches:
+                result.update(batch)
+            return result
+
+
+def journal(root, replicate, interval=0.01, retry_delay=0.01):
+    return EventJournal(str(root), replicate, batch_size=50, interval=interval,
+                        retry_delay=retry_delay, retention=3600)
+
+
+def test_replicates_the_latest_save_of_each_event(tmp_path):
+    replica = Replica()
+    events = journal(tmp_path, replica, interval=0.2)
+    events.append('E1', {'Event ID': 'E1', 'Name': 'first'})
+    events.append('E1', {'Event ID': 'E1', 'Name': 'second'})
+    events.append('E2', {'Event ID': 'E2', 'Name': 'other'})
+
+    wait_for(lambda: not events.pending())
+    assert replica.batches == [{
+        'E1': {'Event ID': 'E1', 'Name': 'second'},
+        'E2': {'Event ID': 'E2', 'Name': 'other'},
+    }]
+
+
+def test_failed_replication_keeps_the_batch_pending(tmp_path):
+    replica = Replica(failures=2)
+    events = journal(tmp_path, replica)
+    events.append('E1', {'Event ID': 'E1'})
+
+    wait_for(lambda: not events.pending())
+    assert replica.merged() == {'E1': {'Event ID': 'E1'}}
+    assert events.last_error is None
+
+
+def test_unreplicated_saves_are_replayed_after_a_restart(tmp_path):
+    # The first process never gets to replicate: its batch is still waiting out the interval
+    stopped = journal(tmp_path, Replica(), interval=60)
+    stopped.append('E1', {'Event ID': 'E1', 'Name': 'draft'})
+    stopped.append('E2', {'Event ID': 'E2'})
+    stopped.append('E1', {'Event ID': 'E1', 'Name': 'final'})
+
+    replica = Replica()
+    restarted = journal(tmp_path, replica)
+    assert restarted.pending() == {'E1': {'Event ID': 'E1', 'Name': 'final'}, 'E2': {'Event ID': 'E2'}}
+    wait_for(lambda: not restarted.pending())
+    assert replica.merged() == {'E1': {'Event ID': 'E1', 'Name': 'final'}, 'E2': {'Event ID': 'E2'}}
+
+
+def test_replicated_saves_are_not_replayed(tmp_path):
+    replica = Replica()
+    events = journal(tmp_path, replica)
+    events.append('E1', {'Event ID': 'E1'})
+    wait_for(lambda: not events.pending())
+
+    assert journal(tmp_path, Replica(), interval=60).pending() == {}
+
+
+@pytest.mark.parametrize('saves, expected', [
+    ([{'Event ID': 'E1'}, None], None),
+    ([{'Event ID': 'E1'}, None, {'Event ID': 'E1', 'Name': 'again'}], {'Event ID': 'E1', 'Name': 'again'}),
+])
+def test_a_deletion_is_ordered_with_the_saves_around_it(tmp_path, saves, expected):
+    stopped = journal(tmp_path, Replica(), interval=60)
+    for row in saves:
+        stopped.append('E1', row)
+    assert stopped.pending() == {'E1': expected}
+
+    replica = Replica()
+    restarted = journal(tmp_path, replica)
+    assert restarted.pending() == {'E1': expected}
+    wait_for(lambda: not restarted.pending())
+    assert replica.merged() == {'E1': expected}
+
+
+def test_update_folds_fields_into_a_pending_save_only(tmp_path):
+    events = journal(tmp_path, Replica(), interval=60)
+    assert not events.update('E1', {'Signed_PDF_ID': 'S1'})
+
+    events.append('E1', {'Event ID': 'E1', 'Name': 'n'})
+    assert events.update('E1', {'Signed_PDF_ID': 'S1'})
+    assert events.pending() == {'E1': {'Event ID': 'E1', 'Name': 'n', 'Signed_PDF_ID': 'S1'}}
+
+    events.append('E2', None)
+    assert not events.update('E2', {'Signed_PDF_ID': 'S2'})
@@ -0,0 +1,99 @@
+"""Tests for the PDF merge backends"""
+
+from io import BytesIO
+
+import pytest
+from reportlab.pdfgen import canvas
+
+import pdf_merge
+
+PyPDF2 = pytest.importorskip('PyPDF2')
+
+BACKENDS = [
+    pytest.param(pdf_merge.PikePdfMerger, id='pikepdf',
+                 marks=pytest.mark.skipif(not pdf_merge.PIKEPDF_AVAILABLE, reason="pikepdf not installed")),
+    pytest.param(pdf_merge.PyPDF2Merger, id='pypdf2'),
+]
+
+
+def make_pdf(*widths):
+    """PDF with one page per width, so pages can be told apart by their size"""
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for width in widths:
+        pdf.setPageSize((width, 400))
+        pdf.drawString(20, 200, f"page {width}")
+        pdf.showPage()
+    pdf.save()
+    buffer.seek(0)
+    return buffer
+
+
+def page_widths(stream):
+    stream.seek(0)
+    return [round(float(page.mediabox.width)) for page in PyPDF2.PdfReader(stream).pages]
+
+
+def test_merger_interface_is_abstract():
+    with pytest.raises(TypeError):
+        pdf_merge.PdfMerger()
+
+
+@pytest.mark.parametrize('merger_class', BACKENDS)
+def test_merges_page_ranges_in_order(merger_class):
+    first, second = make_pdf(200, 210, 220), make_pdf(300, 310)
+    output = BytesIO()
+    with merger_class() as merger:
+        a = merger.open(first)
+        b = merger.open(second)
+        assert merger.page_count(a) == 3 and merger.page_count(b) == 2
+        merger.append(b)
+        merger.add_bookmark("Second", 0)
+        merger.append(a, 1, 3)
+        merger.add_bookmark("First", 2)
+        assert len(merger) == 4
+        merger.write(output)
+
+    assert page_widths(output) == [300, 310, 210, 220]
+    output.seek(0)
+    assert [item.title for item in PyPDF2.PdfReader(output).outline] == ["Second", "First"]
+
+
+@pytest.mark.parametrize('merger_class', BACKENDS)
+def test_unreadable_source_is_rejected_on_its_own(merger_class):
+    output = BytesIO()
+    with merger_class() as merger:
+        with pytest.raises(Exception):
+            merger.open(BytesIO(b"%PDF-1.4 this is not really a pdf"))
+        merger.append(merger.open(make_pdf(200)))
+        merger.write(output)
+
+    assert page_widths(output) == [200]
+
+
+@pytest.mark.skipif(not pdf_merge.PIKEPDF_AVAILABLE, reason="pikepdf not installed")
+def test_pikepdf_drops_a_source_whose_page_data_cannot_be_read(monkeypatch):
+    def unreadable(source):
+        raise pdf_merge.pikepdf.PdfError("damaged stream")
+
+    output = BytesIO()
+    with pdf_merge.PikePdfMerger() as merger:
+        good = merger.open(make_pdf(200))
+        monkeypatch.setattr(pdf_merge.PikePdfMerger, '_check_pages', staticmethod(unreadable))
+        with pytest.raises(pdf_merge.pikepdf.PdfError):
+            merger.open(make_pdf(300))
+        monkeypatch.undo()
+        assert merger._sources == [good]
+        merger.append(good)
+        merger.write(output)
+
+    assert page_widths(output) == [200]
+
+
+@pytest.mark.parametrize('backend, expected', [
+    ('pypdf2', pdf_merge.PyPDF2Merger),
+    pytest.param('pikepdf', pdf_merge.PikePdfMerger,
+                 marks=pytest.mark.skipif(not pdf_merge.PIKEPDF_AVAILABLE, reason="pikepdf not installed")),
+])
+def test_get_merger_picks_the_requested_backend(backend, expected):
+    assert type(pdf_merge.get_merger(backend)) is expected
@@ -0,0 +1,109 @@
+"""Tests for the report job queue: submit deduplication, follow-up jobs and restart recovery"""
+
+import threading
+import time
+
+import report_jobs
+from report_jobs import DONE, FAILED, QUEUED, RUNNING, ReportJobQueue
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+class Handler:
+    """Job handler that records payloads; each job waits until release() is called"""
+
+    def __init__(self):
+        self.payloads = []
+        self.running = threading.Event()
+        self._release = threading.Event()
+
+    def __call__(self, job):
+        self.payloads.append(job['payload'])
+        self.running.set()
+        self._release.wait(5)
+        if job['payload'].get('fail'):
+            raise ValueError('render failed')
+        return {'rendered': job['payload']}
+
+    def release(self):
+        self._release.set()
+
+
+def test_identical_submission_reuses_the_pending_job(tmp_path):
+    handler = Handler()
+    jobs = ReportJobQueue(str(tmp_path), handler, max_workers=2)
+    first = jobs.submit('upload', 'E1', {'v': 1})
+    handler.running.wait(5)
+
+    assert jobs.submit('upload', 'E1', {'v': 1})['id'] == first['id']
+    assert jobs.submit('upload', 'E2', {'v': 1})['id'] != first['id']
+    assert jobs.submit('download', 'E1', {'v': 1})['id'] != first['id']
+    handler.release()
+
+
+def test_changed_payload_while_running_queues_a_follow_up(tmp_path):
+    handler = Handler()
+    jobs = ReportJobQueue(str(tmp_path), handler, max_workers=4)
+    running = jobs.submit('upload', 'E1', {'v': 1})
+    handler.running.wait(5)
+
+    follow_up = jobs.submit('upload', 'E1', {'v': 2})
+    assert follow_up['id'] != running['id'] and follow_up['after'] == running['id']
+    # A later edit replaces the queued follow-up's payload rather than adding another job
+    assert jobs.submit('upload', 'E1', {'v': 3})['id'] == follow_up['id']
+    assert jobs.latest('upload', 'E1')['id'] == follow_up['id']
+
+    time.sleep(0.1)
+    assert handler.payloads == [{'v': 1}]
+    handler.release()
+    wait_for(lambda: jobs.get(follow_up['id'])['status'] == DONE)
+    assert handler.payloads == [{'v': 1}, {'v': 3}]
+    assert jobs.get(follow_up['id'])['result'] == {'rendered': {'v': 3}}
+
+
+def test_failed_job_records_the_error(tmp_path):
+    handler = Handler()
+    handler.release()
+    jobs = ReportJobQueue(str(tmp_path), handler, max_workers=1)
+    job = jobs.submit('upload', 'E1', {'fail': True})
+
+    wait_for(lambda: jobs.get(job['id'])['status'] == FAILED)
+    assert jobs.get(job['id'])['error'] == 'render failed'
+
+
+def test_interrupted_jobs_run_again_after_a_restart(tmp_path):
+    # Stand in for a process that stopped with one job running and a follow-up queued
+    stuck = Handler()
+    jobs = ReportJobQueue(str(tmp_path), stuck, max_workers=2)
+    first = jobs.submit('upload', 'E1', {'v': 1})
+    stuck.running.wait(5)
+    second = jobs.submit('upload', 'E1', {'v': 2})
+    assert jobs.get(first['id'])['status'] == RUNNING and jobs.get(second['id'])['status'] == QUEUED
+
+    handler = Handler()
+    handler.release()
+    restarted = ReportJobQueue(str(tmp_path), handler, max_workers=2)
+    wait_for(lambda: restarted.get(second['id'])['status'] == DONE)
+    assert restarted.get(first['id'])['status'] == DONE
+    assert handler.payloads == [{'v': 1}, {'v': 2}]
+    stuck.release()
+
+
+def test_finished_jobs_are_pruned_after_the_retention_period(tmp_path, monkeypatch):
+    handler = Handler()
+    handler.release()
+    jobs = ReportJobQueue(str(tmp_path), handler, max_workers=1, retention=60)
+    old = jobs.submit('upload', 'E1', {'v': 1})
+    wait_for(lambda: jobs.get(old['id'])['status'] == DONE)
+
+    later = time.time() + 120
+    monkeypatch.setattr(report_jobs.time, 'time', lambda: later)
+    jobs.submit('upload', 'E2', {'v': 1})
+    assert jobs.get(old['id']) is None
+    assert not (tmp_path / (old['id'] + '.json')).exists()
@@ -0,0 +1,113 @@
+"""Tests for the Sheets write scheduler: coalescing, per-row ordering and the priority lane"""
+
+import threading
+
+import pytest
+
+from sheets_writer import SheetsWriteScheduler
+
+
+class Recorder:
+    """Write functions that record their calls; the first call waits for release()"""
+
+    def __init__(self):
+        self.calls = []
+        self._started = threading.Event()
+        self._release = threading.Event()
+        # The scheduler tells writes apart by identity, like the app's static write functions
+        self.rows = lambda target, batch: self._record('rows', target, batch)
+        self.cells = lambda target, batch: self._record('cells', target, batch)
+
+    def _record(self, name, target, batch):
+        self.calls.append((name, target, {key: dict(fields) for key, fields in batch.items()}))
+        if len(self.calls) == 1:
+            self._started.set()
+            self._release.wait(5)
+        return {key: name for key in batch}
+
+    def hold(self, scheduler):
+        """Occupy the writer thread so later submissions stay queued"""
+        future = scheduler.submit(self.rows, 'other', 'blocker', {})
+        assert self._started.wait(5)
+        return future
+
+    def release(self):
+        self._release.set()
+
+
+@pytest.fixture
+def scheduler():
+    return SheetsWriteScheduler(rate=1000, capacity=1000, batch_size=10)
+
+
+def test_coalesces_queued_writes_to_the_same_row(scheduler):
+    recorder = Recorder()
+    recorder.hold(scheduler)
+    first = scheduler.submit(recorder.rows, 'events', 'E1', {'a': 1, 'b': 1})
+    second = scheduler.submit(recorder.rows, 'events', 'E1', {'a': 2})
+    recorder.release()
+
+    assert first.result(5) == second.result(5) == 'rows'
+    assert recorder.calls[1:] == [('rows', 'events', {'E1': {'a': 2, 'b': 1}})]
+    assert scheduler.stats['coalesced'] == 1
+
+
+def test_batches_rows_for_the_same_write_and_target(scheduler):
+    recorder = Recorder()
+    recorder.hold(scheduler)
+    futures = [scheduler.submit(recorder.rows, 'events', f'E{i}', {'a': i}) for i in range(3)]
+    other = scheduler.submit(recorder.rows, 'users', 'U1', {'a': 9})
+    recorder.release()
+
+    for future in futures + [other]:
+        future.result(5)
+    assert recorder.calls[1:] == [
+        ('rows', 'events', {'E0': {'a': 0}, 'E1': {'a': 1}, 'E2': {'a': 2}}),
+        ('rows', 'users', {'U1': {'a': 9}}),
+    ]
+
+
+def test_different_writes_to_a_row_keep_submission_order(scheduler):
+    recorder = Recorder()
+    recorder.hold(scheduler)
+    futures = [
+        scheduler.submit(recorder.rows, 'events', 'E1', {'a': 1}),
+        scheduler.submit(recorder.cells, 'events', 'E1', {'b': 2}),
+        scheduler.submit(recorder.rows, 'events', 'E1', {'a': 3}),
+    ]
+    recorder.release()
+
+    assert [future.result(5) for future in futures] == ['rows', 'cells', 'rows']
+    assert recorder.calls[1:] == [
+        ('rows', 'events', {'E1': {'a': 1}}),
+        ('cells', 'events', {'E1': {'b': 2}}),
+        ('rows', 'events', {'E1': {'a': 3}}),
+    ]
+
+
+def test_priority_writes_go_first_but_not_ahead_of_their_own_row(scheduler):
+    recorder = Recorder()
+    recorder.hold(scheduler)
+    normal = scheduler.submit(recorder.rows, 'events', 'E1', {'a': 1})
+    earlier = scheduler.submit(recorder.rows, 'events', 'E2', {'a': 1})
+    approval = scheduler.submit(recorder.cells, 'events', 'E2', {'status': 'Approved'}, priority=True)
+    urgent = scheduler.submit(recorder.cells, 'events', 'E3', {'status': 'Rejected'}, priority=True)
+    recorder.release()
+
+    for future in (normal, earlier, approval, urgent):
+        future.result(5)
+    assert recorder.calls[1:] == [
+        ('rows', 'events', {'E2': {'a': 1}}),
+        ('cells', 'events', {'E2': {'status': 'Approved'}, 'E3': {'status': 'Rejected'}}),
+        ('rows', 'events', {'E1': {'a': 1}}),
+    ]
+
+
+def test_failed_write_fails_every_caller_it_stood_for(scheduler):
+    def broken(target, batch):
+        raise ConnectionError('boom')
+
+    futures = [scheduler.submit(broken, 'events', f'E{i}', {'a': i}) for i in range(2)]
+    for future in futures:
+        with pytest.raises(ConnectionError):
+            future.result(5)